@@ -0,0 +1,195 @@
+# app/cli.py
+"""
+Command line entry point for maintenance tasks.
+
+Run from the backend directory:
+    python -m app.cli export users --gzip -o users.ndjson.gz
+    python -m app.cli export follows --cursor <follower_id>:<followed_id>
+    python -m app.cli create-admin
+    python -m app.cli migrate
+    python -m app.cli check-plans
+    python -m app.cli serve --port 8000
+"""
+import argparse
+import getpass
+import sys
+import uuid
+from collections.abc import Callable
+from typing import TYPE_CHECKING, BinaryIO
+
+from sqlmodel import Session
+
+from .core.export import (
+    gzip_chunks,
+    iter_follows,
+    iter_users,
+    ndjson_chunks,
+    parse_follow_cursor,
+)
+
+if TYPE_CHECKING:
+    import uvicorn
+
+
+def export(args: argparse.Namespace) -> int:
+    from .db import get_engine
+
+    out: BinaryIO = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        with Session(get_engine()) as session:
+            if args.table == "users":
+                cursor = uuid.UUID(args.cursor) if args.cursor else None
+                records = iter_users(session, cursor)
+            else:
+                follow_cursor = parse_follow_cursor(args.cursor) if args.cursor else None
+                records = iter_follows(session, follow_cursor)
+
+            chunks = ndjson_chunks(records)
+            if args.gzip:
+                chunks = gzip_chunks(chunks)
+
+            for chunk in chunks:
+                out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+
+    return 0
+
+
+def create_admin(args: argparse.Namespace) -> int:
+    from .db import create_admin as create_admin_user
+    from .db import ensure_schema, get_engine
+
+    password = args.password or getpass.getpass("Admin password: ")
+    if not password:
+        print("A password is required", file=sys.stderr)
+        return 1
+
+    engine = get_engine()
+    ensure_schema(engine)
+    admin_user = create_admin_user(engine, password)
+    if admin_user is None:
+        print("Admin user already exists", file=sys.stderr)
+        return 1
+
+    print(f"Admin user created with ID: {admin_user.id}")
+    return 0
+
+
+def migrate(args: argparse.Namespace) -> int:
+    from . import migrations
+    from .db import get_engine
+
+    engine = get_engine()
+    if args.status:
+        done = migrations.applied(engine)
+        for migration in migrations.discover():
+            state = "applied" if migration.revision in done else "pending"
+            print(f"{migration.revision}  {state:<8} {migration.description}")
+        return 0
+
+    for migration in migrations.upgrade(engine):
+        print(f"Applied {migration.revision}: {migration.description}")
+    return 0
+
+
+def check_plans(args: argparse.Namespace) -> int:
+    from .core.plans import check_plans as run_checks
+    from .db import get_engine
+
+    checks = run_checks(get_engine())
+    for check in checks:
+        print(f"{'SEQ SCAN' if check.seq_scan else 'ok':<8}  {check.query.name}")
+        if check.seq_scan or args.verbose:
+            for line in check.plan:
+                print(f"          {line}")
+    return 1 if any(check.seq_scan for check in checks) else 0
+
+
+def ws_max_size() -> int:
+    """
+    Largest WebSocket message uvicorn should accept, in bytes.
+
+    uvicorn buffers a whole message before the relay loop can check its
+    length, and its default limit is 16MB, so it is cut down to the longest
+    relay frame, at up to 4 bytes a character in UTF-8.
+    """
+    from .config import settings
+
+    return settings.relay_max_frame_size * 4
+
+
+def server_config(args: argparse.Namespace) -> "uvicorn.Config":
+    import uvicorn
+
+    from .config import settings
+
+    return uvicorn.Config(
+        "app.main:app",
+        host=args.host,
+        port=args.port or settings.app_port,
+        reload=args.reload,
+        ws_max_size=ws_max_size(),
+    )
+
+
+def serve(args: argparse.Namespace) -> int:
+    from .core.drain import DrainingServer
+
+    config = server_config(args)
+    # Drains on SIGTERM, while the channel sockets are still open
+    server = DrainingServer(config)
+    if config.should_reload:
+        from uvicorn.supervisors import ChangeReload
+
+        ChangeReload(config, target=server.run, sockets=[config.bind_socket()]).run()
+    else:
+        server.run()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="Morse-Me maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="Stream a table as NDJSON")
+    export_parser.add_argument("table", choices=["users", "follows"])
+    export_parser.add_argument("--cursor", help="Resume after this cursor")
+    export_parser.add_argument("--gzip", action="store_true", help="Gzip-compress the output")
+    export_parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    export_parser.set_defaults(func=export)
+
+    admin_parser = commands.add_parser("create-admin", help="Create the admin account")
+    admin_parser.add_argument("--password", help="Admin password (default: prompt)")
+    admin_parser.set_defaults(func=create_admin)
+
+    migrate_parser = commands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.add_argument("--status", action="store_true", help="List migrations instead of applying them")
+    migrate_parser.set_defaults(func=migrate)
+
+    plans_parser = commands.add_parser(
+        "check-plans", help="EXPLAIN the hot queries and fail on sequential scans"
+    )
+    plans_parser.add_argument("-v", "--verbose", action="store_true", help="Print every plan")
+    plans_parser.set_defaults(func=check_plans)
+
+    serve_parser = commands.add_parser(
+        "serve", help="Run the app under uvicorn with its WebSocket limits, draining on SIGTERM"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=None, help="Default: BACKEND_APP_PORT")
+    serve_parser.add_argument("--reload", action="store_true", help="Restart on code changes")
+    serve_parser.set_defaults(func=serve)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    command: Callable[[argparse.Namespace], int] = args.func
+    return command(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
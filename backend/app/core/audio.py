@@ -0,0 +1,230 @@
+# app/core/audio.py
+"""
+Morse audio rendering to 16-bit mono PCM and WAV.
+
+Audio is never synthesized per sample at request time. Each distinct set of
+tone parameters gets a ToneSet of pre-rendered buffers (dit, dah and the
+three kinds of silence), built once and cached, and output is produced by
+joining those buffers. Whole phrases are cached as well, so common practice
+texts are rendered once; that cache is bounded by bytes, not entries, since
+one phrase at a slow speed and a high sample rate can take megabytes.
+"""
+import math
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterator
+from functools import lru_cache
+from typing import NamedTuple
+
+from ..config import settings
+from . import morse
+
+SAMPLE_WIDTH = 2  # Bytes per sample, signed 16-bit little endian
+MAX_AMPLITUDE = 32767
+
+
+class ToneParams(NamedTuple):
+    wpm: float = 20.0
+    farnsworth_wpm: float | None = None  # Overall speed; stretches gaps only
+    frequency: float = 600.0
+    ramp_ms: float = 5.0  # Raised-cosine attack and release, avoids key clicks
+    volume: float = 0.8
+    sample_rate: int = 8000
+
+
+class ToneSet(NamedTuple):
+    """Pre-rendered PCM buffers for one set of tone parameters"""
+    dit: bytes
+    dah: bytes
+    element_gap: bytes
+    letter_gap: bytes
+    word_gap: bytes
+
+
+def gap_units(params: ToneParams) -> tuple[float, float]:
+    """
+    Letter and word gaps in units of the character speed.
+
+    With Farnsworth timing, characters are sent at `wpm` and the extra time
+    needed to slow down to `farnsworth_wpm` is spread over the gaps (ARRL
+    formula: 19 units of gap per PARIS word, 3 between letters and 7 between
+    words).
+    """
+    letter, word = float(morse.LETTER_GAP), float(morse.WORD_GAP)
+    if params.farnsworth_wpm and params.farnsworth_wpm < params.wpm:
+        c, s = params.wpm, params.farnsworth_wpm
+        delay_ms = (60 * c - 37.2 * s) / (s * c) * 1000
+        unit = morse.unit_from_wpm(c)
+        letter, word = 3 * delay_ms / 19 / unit, 7 * delay_ms / 19 / unit
+    return letter, word
+
+
+def _silence(duration_ms: float, sample_rate: int) -> bytes:
+    return bytes(int(sample_rate * duration_ms / 1000) * SAMPLE_WIDTH)
+
+
+def _tone(duration_ms: float, params: ToneParams) -> bytes:
+    count = int(params.sample_rate * duration_ms / 1000)
+    ramp = min(int(params.sample_rate * params.ramp_ms / 1000), count // 2)
+    step = 2 * math.pi * params.frequency / params.sample_rate
+    peak = MAX_AMPLITUDE * params.volume
+
+    samples = array("h", (int(peak * math.sin(step * i)) for i in range(count)))
+    for i in range(ramp):
+        gain = 0.5 - 0.5 * math.cos(math.pi * i / ramp)
+        samples[i] = int(samples[i] * gain)
+        samples[count - 1 - i] = int(samples[count - 1 - i] * gain)
+
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+@lru_cache(maxsize=64)
+def tone_set(params: ToneParams) -> ToneSet:
+    """Render (once) the building blocks for `params`"""
+    unit = morse.unit_from_wpm(params.wpm)
+    letter, word = gap_units(params)
+    return ToneSet(
+        dit=_tone(morse.DIT * unit, params),
+        dah=_tone(morse.DAH * unit, params),
+        element_gap=_silence(morse.ELEMENT_GAP * unit, params.sample_rate),
+        letter_gap=_silence(letter * unit, params.sample_rate),
+        word_gap=_silence(word * unit, params.sample_rate),
+    )
+
+
+def _word_buffers(code: str, tones: ToneSet) -> list[bytes]:
+    """Buffers for one encoded word ('.-- --- .-.' style)"""
+    parts: list[bytes] = []
+    for c, letter in enumerate(code.split(" ")):
+        if c:
+            parts.append(tones.letter_gap)
+        for e, element in enumerate(letter):
+            if e:
+                parts.append(tones.element_gap)
+            parts.append(tones.dit if element == "." else tones.dah)
+    return parts
+
+
+def iter_pcm(text: str, params: ToneParams) -> Iterator[bytes]:
+    """Yield the PCM for `text` one word at a time"""
+    tones = tone_set(params)
+    for w, code in enumerate(morse.encode(text).split(morse.WORD_SEPARATOR)):
+        if not code:
+            continue
+        parts = _word_buffers(code, tones)
+        if w:
+            parts.insert(0, tones.word_gap)
+        yield b"".join(parts)
+
+
+def pcm_length(text: str, params: ToneParams) -> int:
+    """Size in bytes of the PCM for `text`, without rendering it"""
+    tones = tone_set(params)
+    size = 0
+    for w, code in enumerate(morse.encode(text).split(morse.WORD_SEPARATOR)):
+        if not code:
+            continue
+        if w:
+            size += len(tones.word_gap)
+        letters = code.split(" ")
+        size += len(tones.letter_gap) * (len(letters) - 1)
+        for letter in letters:
+            dahs = letter.count("-")
+            size += (
+                len(tones.dah) * dahs
+                + len(tones.dit) * (len(letter) - dahs)
+                + len(tones.element_gap) * (len(letter) - 1)
+            )
+    return size
+
+
+def duration(pcm_size: int, params: ToneParams) -> float:
+    """Seconds of audio in `pcm_size` bytes of PCM"""
+    return pcm_size / SAMPLE_WIDTH / params.sample_rate
+
+
+class PhraseCache:
+    """LRU cache of rendered phrases, evicting until the PCM fits in `max_bytes`"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple[str, ToneParams], bytes] = OrderedDict()
+        self._lock = threading.Lock()  # Sync routes render from threadpool threads
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: tuple[str, ToneParams]) -> bytes | None:
+        with self._lock:
+            pcm = self._entries.get(key)
+            if pcm is not None:
+                self._entries.move_to_end(key)
+            return pcm
+
+    def put(self, key: tuple[str, ToneParams], pcm: bytes) -> None:
+        if len(pcm) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = pcm
+            self.size += len(pcm)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+phrases = PhraseCache(settings.audio_cache_max_bytes)
+
+
+def render_pcm(text: str, params: ToneParams) -> bytes:
+    """Rendered PCM for a whole phrase, cached by text and parameters"""
+    pcm = phrases.get((text, params))
+    if pcm is None:
+        pcm = b"".join(iter_pcm(text, params))
+        phrases.put((text, params), pcm)
+    return pcm
+
+
+def wav_header(data_size: int, sample_rate: int) -> bytes:
+    """44-byte RIFF header for mono 16-bit PCM of `data_size` bytes"""
+    byte_rate = sample_rate * SAMPLE_WIDTH
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, byte_rate, SAMPLE_WIDTH, SAMPLE_WIDTH * 8,
+        b"data", data_size,
+    )
+
+
+def iter_audio(text: str, params: ToneParams, wav: bool = True) -> Iterator[bytes]:
+    """
+    Stream audio for `text`, as WAV or raw PCM.
+
+    Short phrases come from the phrase cache; longer texts, and phrases too
+    big to cache, are streamed word by word without being held in memory,
+    which works for WAV too because the data size is known up front.
+    """
+    size = pcm_length(text, params)
+    if len(text) <= settings.audio_cache_max_chars and size <= phrases.max_bytes:
+        pcm = render_pcm(text, params)
+        if wav:
+            yield wav_header(len(pcm), params.sample_rate)
+        yield pcm
+        return
+
+    if wav:
+        yield wav_header(size, params.sample_rate)
+    yield from iter_pcm(text, params)
@@ -10,6 +10,7 @@ from starlette.websockets import WebSocket
 
 from ..db import get_db_session
 from ..models import LoginRequest, TokenResponse, User, UserPublic
+from .metrics import BCRYPT_LATENCY
 from .security import create_access_token, decode_token
 
 # Create router for auth endpoints
@@ -22,10 +23,11 @@ security = HTTPBearer()
 # Helper functions
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return bcrypt.checkpw(
-        plain_password.encode('utf-8'),
-        hashed_password.encode('utf-8')
-    )
+    with BCRYPT_LATENCY.time(("verify",)):
+        return bcrypt.checkpw(
+            plain_password.encode('utf-8'),
+            hashed_password.encode('utf-8')
+        )
 
 
 # Dependency to get current user
@@ -68,6 +70,17 @@ async def get_current_user(
     return user
 
 
+async def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Get the current user, requiring the default admin account"""
+    if current_user.callsign != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+
+    return current_user
+
+
 async def get_current_user_from_ws(
         websocket: WebSocket,
         session: Session = Depends(get_db_session),
@@ -105,11 +118,11 @@ async def get_current_user_from_ws(
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="User not found")
         return None
 
-    # Update last_seen timestamp
+    # Update last_seen timestamp. No refresh afterwards: it would open a new
+    # transaction that holds a pooled connection for the socket's lifetime
     user.last_seen = datetime.datetime.utcnow()
     session.add(user)
     session.commit()
-    session.refresh(user)  # Important: refresh to get updated data
 
     return user
 
@@ -0,0 +1,275 @@
+# app/core/bot.py
+"""
+In-process practice partner.
+
+A MorseBot is a MorseConnection whose socket is a BotSocket: frames the
+channel sends it land in an asyncio queue instead of going over the network.
+The bot listens to the "decoded" events the channel broadcasts for its
+partner, and once the partner finishes an over it keys a canned QSO reply at
+the partner's estimated speed, through the same relay path a human uses.
+Each bot is a single asyncio task, so thousands fit on one worker.
+"""
+import asyncio
+import json
+import logging
+import random
+import uuid
+from typing import Any, cast
+
+from fastapi import WebSocket
+
+from ..models import User, UserPublic
+from . import morse
+from .channel import Channel
+from .connection import MorseConnection
+from .connection_manager import ChannelFull, manager
+
+logger = logging.getLogger("uvicorn.error")
+
+DEFAULT_WPM = 15.0
+MIN_WPM, MAX_WPM = 5.0, 30.0
+
+# Reply when the partner goes quiet for this many word gaps without ending the over
+IDLE_WORD_GAPS = 4
+
+# Prosigns and words that hand the turn over
+OVER_ENDINGS = ("K", "KN", "BK", "SK", "AR", "?")
+
+# The bot signs off after this many overs in one QSO
+MAX_OVERS = 3
+
+NAMES = ("BOB", "ANN", "JIM", "SUE", "TOM", "EVA", "MAX", "LIZ")
+QTHS = ("BERLIN", "BOSTON", "OSLO", "DENVER", "LYON", "KYOTO", "PERTH")
+
+# Running bots, so they can be cancelled on shutdown
+_tasks: set[asyncio.Task[None]] = set()
+
+
+class BotSocket:
+    """Stands in for a WebSocket; the bot reads what the channel sends it from `inbox`"""
+
+    def __init__(self) -> None:
+        self.inbox: asyncio.Queue[dict[str, Any] | str] = asyncio.Queue()
+
+    async def send_json(self, data: dict[str, Any]) -> None:
+        self.inbox.put_nowait(data)
+
+    async def send_text(self, data: str) -> None:
+        self.inbox.put_nowait(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        pass
+
+
+class MorseBot(MorseConnection):
+    def __init__(
+            self,
+            channel: Channel,
+            callsign: str | None = None,
+            wpm: float | None = None,
+            calls_cq: bool = False,
+            repeat: bool = False,
+            speedup: float = 1.0,
+            rng: random.Random | None = None,
+    ) -> None:
+        """
+        `calls_cq` makes the bot open with a CQ instead of waiting, and with
+        `repeat` it calls again after every finished QSO. `speedup` divides
+        every pause, for tests and benchmarks.
+        """
+        self.rng = rng or random.Random()
+        callsign = callsign or f"BOT{self.rng.randint(100, 999)}"
+        socket = BotSocket()
+        super().__init__(cast(WebSocket, socket), User(id=uuid.uuid4(), callsign=callsign, hashed_password=""))
+        self.inbox = socket.inbox  # What the channel has sent the bot
+        self.channel = channel
+        self.fixed_wpm = wpm
+        self.calls_cq = calls_cq
+        self.repeat = repeat
+        self.speedup = speedup
+        self.name = self.rng.choice(NAMES)
+        self.qth = self.rng.choice(QTHS)
+        self.heard = ""  # Partner's decoded text in the current over
+        self.overs = 0  # Overs sent in the current QSO
+        self.signed_off = False  # Sent SK and waiting for the partner's
+        self.partner_wpm: float | None = None
+        self.sent = 0  # Frames keyed
+
+    @property
+    def partner(self) -> MorseConnection | None:
+        return self.channel.get_other_connection(self)
+
+    @property
+    def wpm(self) -> float:
+        if self.fixed_wpm:
+            return self.fixed_wpm
+        if self.partner_wpm:
+            return min(MAX_WPM, max(MIN_WPM, self.partner_wpm))
+        return DEFAULT_WPM
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds / self.speedup)
+
+    async def key(self, text: str) -> None:
+        """Key `text` through the channel like the frontend does, one frame per element"""
+        unit = morse.unit_from_wpm(self.wpm) / 1000
+        for w, word in enumerate(text.split()):
+            if w:
+                await self.send(" ")  # A second space marks the end of the word
+            for c, char in enumerate(word):
+                for e, element in enumerate(morse.MORSE_CODE.get(char, "")):
+                    if self.partner is None:
+                        return  # Nobody left to key to
+                    gap = morse.ELEMENT_GAP if e else morse.LETTER_GAP if c else morse.WORD_GAP if w else 0
+                    mark = morse.DIT if element == "." else morse.DAH
+                    # Frames go out on key release, like the frontend sends them
+                    await self.sleep((gap + mark) * unit)
+                    await self.send("•" if element == "." else "-", mark * unit * 1000)
+                await self.send(" ")
+        await self.send(" ")
+
+    async def send(self, signal: str, duration: float | None = None) -> None:
+        frame: dict[str, Any] = {"type": "morse", "signal": signal}
+        if duration is not None:
+            frame["duration"] = round(duration, 1)
+        await self.channel.relay_message(json.dumps(frame), self)
+        self.sent += 1
+
+    def reply(self, words: list[str]) -> str:
+        """Canned answer to what the partner sent"""
+        partner = self.partner_callsign
+        me = self.user.callsign
+        if "CQ" in words:
+            return f"{partner} DE {me} {me} K"
+        if "NAME" in words or "RST" in words or "QTH" in words:
+            return (
+                f"{partner} DE {me} R TNX FER RPT UR RST 599 599 "
+                f"NAME {self.name} {self.name} QTH {self.qth} HW? {partner} DE {me} K"
+            )
+        if any(word in ("PSE", "AGN", "?") for word in words):
+            return f"{partner} DE {me} QRS PSE {partner} DE {me} K"
+        return f"{partner} DE {me} R R GM UR RST 579 NAME {self.name} QTH {self.qth} HW? K"
+
+    @property
+    def partner_callsign(self) -> str:
+        partner = self.partner
+        return partner.user.callsign.upper() if partner else "OM"
+
+    def sign_off(self) -> str:
+        return f"TNX FER QSO {self.partner_callsign} 73 DE {self.user.callsign} SK"
+
+    def cq(self) -> str:
+        return f"CQ CQ DE {self.user.callsign} {self.user.callsign} K"
+
+    async def run(self) -> None:
+        """Answer the partner until they leave"""
+        if self.calls_cq:
+            await self.key(self.cq())
+
+        # asyncio.wait rather than wait_for: wait_for can swallow a cancel that
+        # races with its timeout, and the bot would then never stop
+        getter: asyncio.Future[dict[str, Any] | str] | None = None
+        try:
+            while True:
+                idle = IDLE_WORD_GAPS * morse.WORD_GAP * morse.unit_from_wpm(self.partner_wpm or DEFAULT_WPM) / 1000
+                if getter is None:
+                    getter = asyncio.ensure_future(self.inbox.get())
+                done, _ = await asyncio.wait({getter}, timeout=idle / self.speedup)
+                if not done:
+                    if self.heard.strip():
+                        await self.answer()
+                    continue
+
+                message, getter = getter.result(), None
+                if await self.handle(message):
+                    return
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+    async def handle(self, message: dict[str, Any] | str) -> bool:
+        """Act on one frame from the channel; True once the partner has left"""
+        if not isinstance(message, dict):
+            return False
+        event = message.get("event")
+        if event == "user_left":
+            return True
+        if event != "decoded" or message.get("user_id") == str(self.user.id):
+            return False
+
+        self.heard += message["text"]
+        if message.get("wpm"):
+            self.partner_wpm = message["wpm"]
+        words = self.heard.split()
+        if self.heard.endswith(" ") and words and words[-1] in OVER_ENDINGS:
+            await self.answer()
+        return False
+
+    async def answer(self) -> None:
+        words = self.heard.split()
+        self.heard = ""
+
+        if "SK" in words or "73" in words:
+            # The partner is signing off, or answering our sign-off
+            if not self.signed_off:
+                await self.key(self.sign_off())
+            self.overs, self.signed_off = 0, False
+            if self.calls_cq and self.repeat:
+                await self.key(self.cq())
+            return
+
+        if self.overs >= MAX_OVERS:
+            self.signed_off = True
+            await self.key(self.sign_off())
+            return
+
+        self.overs += 1
+        await self.key(self.reply(words))
+
+
+async def _run_bot(bot: MorseBot) -> None:
+    try:
+        await bot.run()
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error("Bot %s failed: %s: %s", bot.user.callsign, type(e).__name__, e)
+    finally:
+        manager.disconnect(bot, bot.channel.channel_id)
+        if bot.channel.user_count:
+            await bot.channel.broadcast({"event": "user_left", "user": _public(bot)})
+
+
+def _public(bot: MorseBot) -> dict[str, Any]:
+    return UserPublic(**bot.user.model_dump()).model_dump(mode="json")
+
+
+async def start_bot(channel_id: str, **kwargs: Any) -> MorseBot | None:
+    """
+    Put a bot into the channel and announce it; it runs until its partner leaves.
+
+    None if the channel closed or a human took the empty slot first; the
+    caller's partner is then that human instead.
+    """
+    channel = manager.channels.get(channel_id)
+    if channel is None or channel.is_full:
+        return None
+    bot = MorseBot(channel, **kwargs)
+    try:
+        manager.connect(bot, channel_id)
+    except ChannelFull:
+        return None
+    await channel.broadcast({"event": "user_joined", "user": _public(bot), "channel_id": channel_id})
+
+    task = asyncio.create_task(_run_bot(bot))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return bot
+
+
+async def stop_bots() -> None:
+    """Cancel all running bots"""
+    tasks = list(_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
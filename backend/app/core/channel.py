@@ -1,6 +1,7 @@
 # app/core/channel.py
 import json
 import logging
+import time
 from datetime import datetime
 from typing import Union, List
 
@@ -10,6 +11,10 @@ from pydantic.dataclasses import dataclass
 
 from ..models import ChannelPublic, UserPublic, User
 from .connection import MorseConnection
+from .metrics import RELAY_FRAMES, RELAY_LATENCY, RELAY_SEND_FAILURES
+from .recording import Recording
+from .relay_log import relay_log
+from .tracing import tracer
 
 logger = logging.getLogger('uvicorn.error')
 
@@ -18,7 +23,7 @@ class Channel:
     channel_id: str = Field(pattern=r'^\d{6}$')  # Validates 6-digit string
     created_at: datetime = Field(default_factory=datetime.utcnow)
     user_connections: List[MorseConnection] = Field(default_factory=list, max_length=2)
-
+    recording: Recording | None = None
 
     def __contains__(self, user_or_connection: Union[User, MorseConnection]) -> bool:
         if isinstance(user_or_connection, User):
@@ -44,12 +49,25 @@ class Channel:
     def add_user(self, connection: MorseConnection):
         if len(self.user_connections) >= 2:
             raise ValueError("Channel is already full")
+        # The lowest slot not taken; it stays the same when the other user leaves
+        taken = {user_connection.slot for user_connection in self.user_connections}
+        connection.slot = 0 if 0 not in taken else 1
         self.user_connections.append(connection)
+        if self.recording is not None:
+            self.recording.join(connection.slot, connection.user)
 
     def remove_user(self, connection: MorseConnection):
         if connection in self.user_connections:
+            if self.recording is not None:
+                self.recording.leave(connection.slot, connection.user)
             self.user_connections.remove(connection)
 
+    def start_recording(self, recording: Recording) -> None:
+        """Record the rest of this session, starting with who is already here"""
+        self.recording = recording
+        for connection in self.user_connections:
+            recording.join(connection.slot, connection.user)
+
     def get_other_connection(self, connection: MorseConnection) -> MorseConnection | None:
         if not self.is_full:
             return None
@@ -62,6 +80,8 @@ class Channel:
     async def broadcast(self, message: dict):
         """Broadcast a message to all users in the channel"""
         for user_connection in self.user_connections:
+            if user_connection.suspended:
+                continue  # Its socket is gone until it resumes
             try:
                 await user_connection.websocket.send_json(message)
             except ClosedResourceError as _:
@@ -69,26 +89,64 @@ class Channel:
             except Exception as e:
                 logger.error(f"Failed to send message to {user_connection.user.callsign}: {type(e).__name__}: {e}")
 
-    async def relay_message(self, message: str, sender: MorseConnection):
-        """Relay a message from one user to another"""
+    async def relay_message(self, message: str, sender: MorseConnection, received_at: float | None = None):
+        """
+        Relay a message from one user to another.
+
+        `received_at` is the time.monotonic() stamp taken when the frame was read
+        off the sender's socket, so latency covers the whole stay in the server.
+        """
+        if received_at is None:
+            received_at = time.monotonic()
         dest_user_connection = self.get_other_connection(sender)
 
         if not dest_user_connection:
-            logger.debug(f"No other user to relay message to in channel {self.channel_id}")
+            relay_log.frame("frame dropped, no other user", self.channel_id, sender.user.callsign, len(message))
             return
 
+        if dest_user_connection.ring is not None:
+            dest_user_connection.ring.push(message)
+
         try:
             # Parse the message if it's JSON, otherwise send as text
             try:
                 parsed_message = json.loads(message)
-                await dest_user_connection.websocket.send_json(parsed_message)
-                logger.debug(f"Relayed JSON message in channel {self.channel_id}")
             except json.JSONDecodeError:
+                parsed_message = None
+            if dest_user_connection.suspended:
+                # Held in its ring until it resumes
+                relay_log.frame("frame held for resume", self.channel_id, sender.user.callsign, len(message))
+            elif parsed_message is not None:
+                await dest_user_connection.websocket.send_json(parsed_message)
+            else:
                 # If it's not JSON, send as text
                 await dest_user_connection.websocket.send_text(message)
-                logger.debug(f"Relayed text message in channel {self.channel_id}")
+            sent_at = time.monotonic()
+            RELAY_FRAMES.inc()
+            RELAY_LATENCY.observe(sent_at - received_at)
+            if tracer.enabled and tracer.should_sample():
+                tracer.record(self.channel_id, received_at, sent_at)
+            if self.recording is not None:
+                self.recording.frame(sender.slot, message, received_at)
         except Exception as e:
-            logger.error(f"Failed to relay message to {dest_user_connection.user.callsign}: {type(e).__name__}: {e}")
+            RELAY_SEND_FAILURES.inc()
+            logger.error(
+                "Failed to relay message to %s: %s: %s",
+                dest_user_connection.user.callsign, type(e).__name__, e
+            )
+            return
+
+        # Decode after the frame is on its way so it adds nothing to relay latency
+        if isinstance(parsed_message, dict) and parsed_message.get("type") == "morse":
+            decoded = sender.timing.observe(parsed_message.get("signal"), parsed_message.get("duration"), received_at)
+            if decoded:
+                wpm = sender.timing.wpm
+                await self.broadcast({
+                    "event": "decoded",
+                    "user_id": str(sender.user.id),
+                    "text": decoded,
+                    "wpm": round(wpm, 1) if wpm else None,
+                })
 
     def to_public(self) -> ChannelPublic:
         """Convert to public representation"""
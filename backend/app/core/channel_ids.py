@@ -0,0 +1,119 @@
+# app/core/channel_ids.py
+"""
+Random channel IDs without retries.
+
+The free IDs are kept as a Fisher-Yates shuffle that is drawn lazily: a
+virtual array of every ID in the range, whose first `free` slots hold the
+IDs still free. Allocating swaps a random free slot with the last free one
+and shrinks the free part; releasing swaps the ID back to the boundary and
+grows it. Both steps are O(1) however full the range is, where drawing
+random numbers until one misses takes 1 / (1 - occupancy) tries on average.
+
+Only slots holding some other slot's ID are stored. Any free ID whose own
+slot is in the free part is kept in it, so only the slots of IDs in use can
+be out of place, and the state stays within twice the IDs in use instead of
+drifting towards a full shuffle of the range as IDs come and go.
+"""
+import random
+
+
+class ChannelIdsExhausted(Exception):
+    pass
+
+
+class ChannelIdAllocator:
+    """Hands out unused IDs in [low, high] in random order"""
+
+    def __init__(self, low: int = 100000, high: int = 999999, rng: random.Random | None = None) -> None:
+        self.low = low
+        self.size = high - low + 1
+        self.free = self.size  # Slots [0, free) hold the free IDs
+        self._rng = rng or random.Random()
+        # Out of place slots only; any other slot i holds ID low + i
+        self._slot_ids: dict[int, int] = {}  # slot -> offset of the ID in it
+        self._id_slots: dict[int, int] = {}  # offset -> slot
+
+    def __len__(self) -> int:
+        """IDs in use"""
+        return self.size - self.free
+
+    def __contains__(self, channel_id: str) -> bool:
+        offset = self._offset(channel_id)
+        return offset is not None and self._slot_of(offset) >= self.free
+
+    def allocate(self) -> str:
+        """Take a random free ID; it stays taken until released"""
+        if self.free == 0:
+            raise ChannelIdsExhausted("No channel IDs left")
+        offset = self._id_at(self._rng.randrange(self.free))
+        self._take(offset)
+        return str(self.low + offset)
+
+    def claim(self, channel_id: str) -> bool:
+        """Take a given ID; False if it is out of range or already taken"""
+        offset = self._offset(channel_id)
+        if offset is None or self._slot_of(offset) >= self.free:
+            return False
+        self._take(offset)
+        return True
+
+    def release(self, channel_id: str) -> bool:
+        """Give an ID back; False if it was not taken"""
+        offset = self._offset(channel_id)
+        if offset is None:
+            return False
+        slot = self._slot_of(offset)
+        if slot < self.free:
+            return False
+
+        boundary = self.free
+        self._swap(slot, boundary)
+        self.free += 1
+        # The released ID goes to its own slot if that is free space...
+        if offset < boundary:
+            self._swap(boundary, offset)
+        # ...and the boundary slot is free space now, so its own ID moves in if free
+        owner = self._slot_of(boundary)
+        if owner < self.free:
+            self._swap(owner, boundary)
+        return True
+
+    def clear(self) -> None:
+        self.free = self.size
+        self._slot_ids.clear()
+        self._id_slots.clear()
+
+    def _take(self, offset: int) -> None:
+        """Move a free ID to the last free slot and shrink the free part past it"""
+        # The ID in the last free slot is at home or belongs to a slot in use,
+        # so it may go anywhere in the free part
+        self._swap(self._slot_of(offset), self.free - 1)
+        self.free -= 1
+
+    def _offset(self, channel_id: str) -> int | None:
+        if not channel_id.isdigit():
+            return None
+        offset = int(channel_id) - self.low
+        return offset if 0 <= offset < self.size else None
+
+    def _id_at(self, slot: int) -> int:
+        return self._slot_ids.get(slot, slot)
+
+    def _slot_of(self, offset: int) -> int:
+        return self._id_slots.get(offset, offset)
+
+    def _swap(self, a: int, b: int) -> None:
+        if a == b:
+            return
+        id_a, id_b = self._id_at(a), self._id_at(b)
+        self._place(id_b, a)
+        self._place(id_a, b)
+
+    def _place(self, offset: int, slot: int) -> None:
+        # IDs back in their own slot are dropped, so the maps stay small
+        if offset == slot:
+            self._slot_ids.pop(slot, None)
+            self._id_slots.pop(offset, None)
+        else:
+            self._slot_ids[slot] = offset
+            self._id_slots[offset] = slot
@@ -1,15 +1,29 @@
 # core/connection.py
+import time
+from typing import TYPE_CHECKING
+
 from fastapi import WebSocket
 from ..models import User
+from .ratelimit import connection_bucket
+from .timing import TimingAnalyzer
+
+if TYPE_CHECKING:
+    from .resume import FrameRing
 
 class MorseConnection:
     """A wrapper class that holds the WebSocket and the associated User."""
     def __init__(self, websocket: WebSocket, user: User):
         self.websocket = websocket
         self.user = user
+        self.timing = TimingAnalyzer()
+        self.bucket = connection_bucket()
+        self.last_seen = time.monotonic()  # Last frame received, for the heartbeat
+        self.slot = 0  # Position in its channel, fixed when it joins
+        # Set for resumable connections, see core.resume
+        self.resume_token: str | None = None
+        self.ring: FrameRing | None = None  # Frames relayed to this connection
+        self.suspended = False  # Dropped, slot held for a resume
 
-    # We can define equality to make it easier to find and remove connections
-    def __eq__(self, other):
-        if isinstance(other, MorseConnection):
-            return self.websocket == other.websocket
-        return False
\ No newline at end of file
+    # Equality and hashing are by identity (object's defaults): a resumed
+    # connection moves to a new websocket but must stay the same key in the
+    # heartbeat wheel and the other sets and dicts holding it
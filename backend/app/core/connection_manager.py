@@ -1,13 +1,24 @@
 # app/core/connection_manager.py
 import random
 import uuid
-from typing import Union
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import TYPE_CHECKING, NamedTuple, TypeVar, Union
 
 from pydantic import ValidationError
 
+from ..config import settings
 from ..models import ChannelPublic, User
 from .channel import Channel
+from .channel_ids import ChannelIdAllocator
 from .connection import MorseConnection
+from .metrics import CallbackGauge, registry
+from .relay_log import relay_log
+from .tracing import tracer
+
+if TYPE_CHECKING:
+    from .sharded_manager import ShardedConnectionManager
 
 
 class ChannelFull(Exception):
@@ -18,20 +29,80 @@ class UserAlreadyActive(Exception):
     pass
 
 
+class ChannelReserved(Exception):
+    pass
+
+
+UserId = TypeVar("UserId", uuid.UUID, str)
+
+
+class Reservation(NamedTuple):
+    user_ids: frozenset[str]  # The only users let in
+    owner: str | None  # Whoever reserved it; a release naming another owner is ignored
+
+
+@dataclass(frozen=True)
+class ActiveUsers:
+    """Who was in a channel as of `version`; a new version means someone joined or left"""
+    version: int
+    channels: Mapping[str, str]  # user_id -> channel_id, read-only
+
+
+def channel_closed(channel: Channel) -> None:
+    """Let go of what an emptied channel leaves behind"""
+    if channel.recording is not None:
+        channel.recording.close()
+    tracer.discard(channel.channel_id)
+    relay_log.discard(channel.channel_id)
+
+
 class ConnectionManager:
     def __init__(self) -> None:
         self.channels: dict[str, Channel] = {}
         # Track which channel each user is in for faster lookups
         self._user_channels: dict[str, str] = {}  # user_id -> channel_id
+        # Connected users, kept up to date by connect and disconnect
+        self._active: dict[str, MorseConnection] = {}  # user_id -> connection
+        self.version = 0  # Bumped whenever a user joins or leaves a channel
+        self._snapshot = ActiveUsers(0, MappingProxyType({}))
+        # Channels set aside for an invite, and the users who may join them
+        self._reserved: dict[str, Reservation] = {}  # channel_id -> reservation
+        # IDs of open and reserved channels, and ones handed out to be opened
+        self._ids = ChannelIdAllocator()
 
     @property
     def active_users(self) -> list[User]:
         """Returns a list of all currently connected users."""
-        users_by_id: dict[uuid.UUID, User] = {}
-        for channel in self.channels.values():
-            for user in channel.users:
-                users_by_id[user.id] = user
-        return list(users_by_id.values())
+        return [connection.user for connection in self._active.values()]
+
+    def filter_active(self, user_ids: Iterable[UserId]) -> dict[UserId, Channel]:
+        """The given users who are in a channel, with their channel; O(len(user_ids))"""
+        active = {}
+        for user_id in user_ids:
+            channel_id = self._user_channels.get(str(user_id))
+            if channel_id is not None and (channel := self.channels.get(channel_id)) is not None:
+                active[user_id] = channel
+        return active
+
+    def snapshot(self) -> ActiveUsers:
+        """
+        Who is in which channel, for consumers that poll.
+
+        Rebuilt at most once per version, so polling between changes is free;
+        compare `version` with the last one seen to skip unchanged snapshots.
+        """
+        if self._snapshot.version != self.version:
+            self._snapshot = ActiveUsers(self.version, MappingProxyType(dict(self._user_channels)))
+        return self._snapshot
+
+    def clear(self) -> None:
+        """Forget every channel, user and reservation"""
+        self.channels.clear()
+        self._user_channels.clear()
+        self._active.clear()
+        self._reserved.clear()
+        self._ids.clear()
+        self.version += 1
 
     def get_user_channel(self, user_id: Union[uuid.UUID, str]) -> Channel | None:
         """Get the channel a user is currently in"""
@@ -61,11 +132,17 @@ class ConnectionManager:
 
         # Check if user is already active
         if self.is_user_active(connection.user.id):
+            self._release_unused(channel_id)
             raise UserAlreadyActive(f"User {connection.user.callsign} is already in a channel")
 
+        reservation = self._reserved.get(channel_id)
+        if reservation is not None and str(connection.user.id) not in reservation.user_ids:
+            raise ChannelReserved("Channel is reserved")
+
         # Create new channel only if it doesn't exist
         if channel_id not in self.channels:
             self.channels[channel_id] = Channel(channel_id=channel_id)
+            self._ids.claim(channel_id)  # Already taken if it came from create_random_channel
 
         channel = self.channels[channel_id]
 
@@ -76,27 +153,69 @@ class ConnectionManager:
         # Add user to channel and track it
         channel.add_user(connection)
         self._user_channels[str(connection.user.id)] = channel_id
+        self._active[str(connection.user.id)] = connection
+        self.version += 1
 
         return channel
 
-    def disconnect(self, connection: MorseConnection, channel_id: str):
-        """Handles a user disconnecting."""
-        if channel_id in self.channels:
-            channel = self.channels[channel_id]
-            channel.remove_user(connection)
+    def disconnect(self, connection: MorseConnection, channel_id: str) -> bool:
+        """
+        Handles a user disconnecting.
+
+        Returns False if the connection had already been removed, e.g. reaped
+        by the heartbeat, so callers do not announce the same departure twice
+        or untrack a user who has since reconnected.
+        """
+        channel = self.channels.get(channel_id)
+        if channel is None or connection not in channel:
+            return False
+
+        channel.remove_user(connection)
+
+        # Remove user tracking
+        self._user_channels.pop(str(connection.user.id), None)
+        self._active.pop(str(connection.user.id), None)
+        self.version += 1
+
+        # Delete empty channels
+        if channel.user_count == 0:
+            del self.channels[channel_id]
+            self._reserved.pop(channel_id, None)
+            self._ids.release(channel_id)
+            channel_closed(channel)
+        return True
+
+    def reserve(self, channel_id: str, user_ids: list[uuid.UUID | str], owner: str | None = None) -> None:
+        """Only let these users into the channel, until it closes or is released"""
+        self._reserved[channel_id] = Reservation(frozenset(str(user_id) for user_id in user_ids), owner)
+
+    def release(self, channel_id: str, owner: str | None = None) -> None:
+        """
+        Drop the reservation of a channel nobody has opened. With `owner`,
+        only a reservation that owner still holds: once the channel has come
+        and gone, its ID may be reserved again by someone else.
+        """
+        if owner is not None:
+            reservation = self._reserved.get(channel_id)
+            if reservation is None or reservation.owner != owner:
+                return
+        if channel_id not in self.channels:
+            self._reserved.pop(channel_id, None)
+            self._ids.release(channel_id)
 
-            # Remove user tracking
-            self._user_channels.pop(str(connection.user.id), None)
+    def _release_unused(self, channel_id: str) -> None:
+        """Give back an ID from create_random_channel that will not be opened"""
+        if channel_id not in self.channels and channel_id not in self._reserved:
+            self._ids.release(channel_id)
 
-            # Delete empty channels
-            if channel.user_count == 0:
-                del self.channels[channel_id]
+    def is_reserved(self, channel_id: str) -> bool:
+        return channel_id in self._reserved
 
     def find_random_waiting_channel(self) -> str | None:
         """Find a random channel with exactly one user waiting"""
         waiting_channels = [
             channel_id for channel_id, channel in self.channels.items()
-            if channel.user_count == 1
+            if channel.user_count == 1 and channel_id not in self._reserved
         ]
 
         if waiting_channels:
@@ -104,12 +223,14 @@ class ConnectionManager:
         return None
 
     def create_random_channel(self) -> str:
-        """Create a new channel with a random 6-digit ID"""
-        # Generate a unique 6-digit channel ID
-        while True:
-            channel_id = str(random.randint(100000, 999999))
-            if channel_id not in self.channels:
-                return channel_id
+        """
+        Pick a random unused 6-digit ID for a new channel.
+
+        The ID is taken from the allocator straight away, so nothing else is
+        handed it before the channel opens: connect to it or reserve it
+        without awaiting in between.
+        """
+        return self._ids.allocate()
 
     async def broadcast_to_channel(self, message: dict, channel_id: str):
         """Sends a message to both users in a channel."""
@@ -132,5 +253,32 @@ class ConnectionManager:
         return [channel.to_public() for channel in self.channels.values()]
 
 
+def create_manager(shards: int) -> "ConnectionManager | ShardedConnectionManager":
+    """The plain manager for one event loop, or a sharded one to be used from several threads"""
+    if shards > 1:
+        from .sharded_manager import ShardedConnectionManager
+        return ShardedConnectionManager(shards)
+    return ConnectionManager()
+
+
 # Single instance for the app
-manager = ConnectionManager()
+manager = create_manager(settings.connection_shards)
+
+
+def _active_connections() -> dict[tuple[str, ...], float]:
+    return {(): sum(channel.user_count for channel in manager.channels.values())}
+
+
+def _channels_by_occupancy() -> dict[tuple[str, ...], float]:
+    counts: dict[tuple[str, ...], float] = {("1",): 0.0, ("2",): 0.0}
+    for channel in manager.channels.values():
+        counts[(str(channel.user_count),)] = counts.get((str(channel.user_count),), 0.0) + 1
+    return counts
+
+
+registry.register(CallbackGauge(
+    "morse_active_connections", "Open channel WebSocket connections", _active_connections
+))
+registry.register(CallbackGauge(
+    "morse_channels", "Open channels by number of users", _channels_by_occupancy, ("users",)
+))
@@ -0,0 +1,154 @@
+# app/core/drain.py
+"""
+Graceful drain before shutdown.
+
+Once draining, the channel routes turn new joins away and /health reports
+503, so the load balancer sends new clients to other instances. Connected
+clients are told to move with a `server_draining` event, channel by channel
+in waves spread over `drain_stagger` seconds, so they do not all reconnect
+elsewhere in the same instant. The drain then waits for them to leave; at
+the deadline it lets the relays still running finish and closes whoever is
+left with 1012 (service restart).
+
+A drain starts from POST /admin/drain, or from SIGTERM when the app runs
+under DrainingServer (`python -m app.cli serve`). Plain uvicorn closes every
+WebSocket as soon as it is told to stop, before the app hears about it, so
+there the deploy's pre-stop hook has to call POST /admin/drain and wait out
+the deadline.
+"""
+import asyncio
+import logging
+import math
+import socket
+import time
+from collections.abc import Callable
+
+import uvicorn
+from fastapi import status
+
+from ..config import settings
+from .connection import MorseConnection
+from .connection_manager import manager
+from .metrics import DRAIN_CLOSED, CallbackGauge, registry
+from .resume import resumer
+
+logger = logging.getLogger("uvicorn.error")
+
+WAVE_INTERVAL = 0.5  # Seconds between notification waves
+POLL_INTERVAL = 0.05  # Seconds between checks while waiting
+
+
+class Drainer:
+    """Drain state for this worker, and the task carrying out a drain"""
+
+    def __init__(self, stagger: float, flush_timeout: float) -> None:
+        self.stagger = stagger
+        self.flush_timeout = flush_timeout
+        self.draining = False
+        self.deadline: float | None = None  # time.monotonic() by which everyone is gone
+        self.inflight = 0  # Relays running right now, maintained by the relay loop
+        self._task: asyncio.Task[None] | None = None
+
+    def remaining(self) -> float | None:
+        """Seconds left until the deadline, if draining"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def start(self, deadline: float) -> asyncio.Task[None]:
+        """Start draining, with everyone gone `deadline` seconds from now; an ongoing drain keeps its deadline"""
+        if self._task is None:
+            self.draining = True
+            self.deadline = time.monotonic() + deadline
+            self._task = asyncio.create_task(self._drain())
+        return self._task
+
+    def reset(self) -> None:
+        """Forget a finished drain; a new run of the app starts out accepting joins"""
+        self.draining = False
+        self.deadline = None
+        self._task = None
+
+    async def cancel(self) -> None:
+        """Stop a drain under way and accept joins again"""
+        task = self._task
+        self.reset()
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def drain(self, deadline: float) -> None:
+        """Drain and wait until it is over"""
+        await asyncio.shield(self.start(deadline))
+
+    async def _drain(self) -> None:
+        logger.info(f"Draining {connection_count()} channel connections within {self.remaining():.1f}s")
+        # Nobody can resume on this worker any more
+        resumer.expire_all()
+
+        # Leave at least half of the time for clients to move
+        await self._notify(min(self.stagger, (self.remaining() or 0.0) / 2))
+        await self._wait_until(lambda: connection_count() == 0, self.remaining() or 0.0)
+
+        await self._wait_until(lambda: self.inflight == 0, self.flush_timeout)
+        leftover = [connection for channel in manager.channels.values() for connection in channel.user_connections]
+        if leftover:
+            logger.info(f"Drain deadline reached, closing {len(leftover)} connections")
+            DRAIN_CLOSED.inc(len(leftover))
+            await _close_all(leftover)
+        logger.info("Drain complete")
+
+    async def _notify(self, stagger: float) -> None:
+        """Send `server_draining` to every channel, partners together, in waves over `stagger` seconds"""
+        # New joins are refused, so this snapshot only gets smaller. Oldest
+        # channels go first; a sharded manager iterates in shard order instead
+        channels = sorted(manager.channels.values(), key=lambda channel: channel.created_at)
+        waves = max(1, min(len(channels), math.floor(stagger / WAVE_INTERVAL)))
+        per_wave = math.ceil(len(channels) / waves) if channels else 0
+        for start in range(0, len(channels), per_wave or 1):
+            if start:
+                await asyncio.sleep(stagger / waves)
+            for channel in channels[start:start + per_wave]:
+                await channel.broadcast({"event": "server_draining", "deadline": self.remaining()})
+
+    @staticmethod
+    async def _wait_until(condition: Callable[[], bool], timeout: float) -> None:
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+class DrainingServer(uvicorn.Server):
+    """uvicorn server that drains channel connections before its own shutdown closes them"""
+
+    async def shutdown(self, sockets: list[socket.socket] | None = None) -> None:
+        # A second Ctrl+C (force_exit) skips the rest of the drain
+        task = drainer.start(settings.drain_deadline)
+        while not task.done() and not self.force_exit:
+            await asyncio.wait({task}, timeout=0.1)
+        await super().shutdown(sockets)
+
+
+def connection_count() -> int:
+    return sum(channel.user_count for channel in manager.channels.values())
+
+
+async def _close_all(connections: list[MorseConnection]) -> None:
+    """Close the sockets concurrently; the relay loops clean up after them"""
+    async def close(connection: MorseConnection) -> None:
+        try:
+            await connection.websocket.close(code=status.WS_1012_SERVICE_RESTART, reason="Server draining")
+        except Exception:
+            pass  # Already gone
+
+    _, pending = await asyncio.wait([asyncio.ensure_future(close(connection)) for connection in connections], timeout=1.0)
+    for task in pending:
+        task.cancel()
+
+
+# Single instance for the app
+drainer = Drainer(settings.drain_stagger, settings.drain_flush_timeout)
+
+registry.register(CallbackGauge(
+    "morse_draining", "1 while this worker is draining", lambda: {(): float(drainer.draining)}
+))
@@ -0,0 +1,127 @@
+# app/core/export.py
+import json
+import uuid
+import zlib
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, or_
+from sqlmodel import Session, col, select
+
+from ..models import Follow, User
+
+# Rows fetched per round trip. Memory use is bounded by this, not by table size.
+EXPORT_BATCH_SIZE = 1000
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def parse_follow_cursor(cursor: str) -> tuple[uuid.UUID, uuid.UUID]:
+    """Parse a follow cursor of the form '<follower_id>:<followed_id>'"""
+    follower_id, _, followed_id = cursor.partition(":")
+    return uuid.UUID(follower_id), uuid.UUID(followed_id)
+
+
+def iter_users(
+        session: Session,
+        cursor: uuid.UUID | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield users ordered by id, starting after `cursor`.
+
+    Uses keyset pagination so every batch is an index range scan and an
+    interrupted export can resume from the last id it received.
+    """
+    columns = (User.id, User.callsign, User.created_at, User.last_seen)
+
+    while True:
+        query = select(*columns).order_by(col(User.id)).limit(batch_size)
+        if cursor is not None:
+            query = query.where(col(User.id) > cursor)
+
+        rows = session.exec(query).all()
+        for user_id, callsign, created_at, last_seen in rows:
+            yield {
+                "id": user_id,
+                "callsign": callsign,
+                "created_at": created_at,
+                "last_seen": last_seen,
+            }
+
+        if len(rows) < batch_size:
+            return
+        cursor = rows[-1][0]
+
+
+def iter_follows(
+        session: Session,
+        cursor: tuple[uuid.UUID, uuid.UUID] | None = None,
+        batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[dict[str, Any]]:
+    """
+    Yield follow edges ordered by (follower_id, followed_id), starting after `cursor`.
+
+    The resume cursor of an edge is '<follower_id>:<followed_id>'.
+    """
+    columns = (Follow.follower_id, Follow.followed_id, Follow.created_at)
+
+    while True:
+        query = (
+            select(*columns)
+            .order_by(col(Follow.follower_id), col(Follow.followed_id))
+            .limit(batch_size)
+        )
+        if cursor is not None:
+            follower_id, followed_id = cursor
+            query = query.where(
+                or_(
+                    col(Follow.follower_id) > follower_id,
+                    and_(col(Follow.follower_id) == follower_id, col(Follow.followed_id) > followed_id),
+                )
+            )
+
+        rows = session.exec(query).all()
+        for follower_id, followed_id, created_at in rows:
+            yield {
+                "follower_id": follower_id,
+                "followed_id": followed_id,
+                "created_at": created_at,
+            }
+
+        if len(rows) < batch_size:
+            return
+        cursor = (rows[-1][0], rows[-1][1])
+
+
+def ndjson_chunks(
+        records: Iterable[dict[str, Any]],
+        lines_per_chunk: int = EXPORT_BATCH_SIZE
+) -> Iterator[bytes]:
+    """Encode records as newline-delimited JSON, grouped into chunks"""
+    lines: list[str] = []
+    for record in records:
+        lines.append(json.dumps(record, default=_json_default))
+        if len(lines) >= lines_per_chunk:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines.clear()
+
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Gzip-compress a byte stream incrementally"""
+    compressor = zlib.compressobj(wbits=31)  # 16 + 15: gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
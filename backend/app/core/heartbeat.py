@@ -0,0 +1,191 @@
+# app/core/heartbeat.py
+"""
+Heartbeat and idle reaping for channel sockets.
+
+A half-open connection never raises in the relay loop, so without this a user
+whose network dropped stays in their channel and cannot join another one.
+
+Every monitored connection sits in one slot of a timer wheel, and a single
+task advances the wheel once per tick, looking only at the connections in the
+current slot. A connection that has been quiet is sent a ping, which the
+client answers with a pong frame; one that has been idle for the timeout is
+reaped through ConnectionManager.disconnect. Incoming frames only stamp
+`last_seen`, so the relay path never touches the wheel.
+"""
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Hashable
+from typing import Generic, TypeVar
+
+from fastapi import status
+
+from ..config import settings
+from ..models import UserPublic
+from .connection import MorseConnection
+from .connection_manager import manager
+from .metrics import HEARTBEAT_REAPED, HEARTBEAT_TICK
+
+logger = logging.getLogger("uvicorn.error")
+
+PING = {"event": "ping"}
+# Exactly what the frontend sends back, so the relay loop can spot it without parsing
+PONG = '{"type":"pong"}'
+
+T = TypeVar("T", bound=Hashable)
+
+
+class TimerWheel(Generic[T]):
+    """
+    Hashed timer wheel with one slot per tick.
+
+    Scheduling and cancelling are O(1), and advancing only visits the items
+    due in that tick, however many are scheduled in total.
+    """
+
+    def __init__(self, slots: int) -> None:
+        self.slots: list[set[T]] = [set() for _ in range(slots)]
+        self.cursor = 0
+        self._slot_of: dict[T, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, item: T) -> bool:
+        return item in self._slot_of
+
+    def schedule(self, item: T, ticks: int) -> None:
+        """Make `item` due `ticks` ticks from now (1 to one full turn)"""
+        self.cancel(item)
+        ticks = min(max(ticks, 1), len(self.slots))
+        slot = (self.cursor + ticks) % len(self.slots)
+        self.slots[slot].add(item)
+        self._slot_of[item] = slot
+
+    def cancel(self, item: T) -> None:
+        slot = self._slot_of.pop(item, None)
+        if slot is not None:
+            self.slots[slot].discard(item)
+
+    def advance(self) -> set[T]:
+        """Move one tick forward and return the items that are now due"""
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        due = self.slots[self.cursor]
+        self.slots[self.cursor] = set()
+        for item in due:
+            del self._slot_of[item]
+        return due
+
+
+class Heartbeat:
+    """
+    Pings quiet connections and reaps idle ones.
+
+    Each connection is checked once per `interval`, so a dead one is reaped
+    between `timeout` and `timeout + interval` after its last frame.
+    """
+
+    def __init__(self, interval: float, timeout: float, tick: float) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.tick = tick
+        self.interval_ticks = max(1, math.ceil(interval / tick))
+        self.wheel: TimerWheel[MorseConnection] = TimerWheel(self.interval_ticks)
+        self._channels: dict[MorseConnection, str] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def add(self, connection: MorseConnection, channel_id: str) -> None:
+        """Start monitoring a connection that just joined `channel_id`"""
+        connection.last_seen = time.monotonic()
+        self._channels[connection] = channel_id
+        self.wheel.schedule(connection, self.interval_ticks)
+
+    def remove(self, connection: MorseConnection) -> None:
+        self._channels.pop(connection, None)
+        self.wheel.cancel(connection)
+
+    async def run_tick(self, now: float | None = None) -> int:
+        """Check the connections due this tick; returns how many were looked at"""
+        now = time.monotonic() if now is None else now
+        due = self.wheel.advance()
+        quiet: list[MorseConnection] = []
+        for connection in due:
+            idle = now - connection.last_seen
+            if idle >= self.timeout:
+                await self.reap(connection)
+                continue
+            self.wheel.schedule(connection, self.interval_ticks)
+            if idle >= self.interval / 2:
+                quiet.append(connection)
+
+        if quiet:
+            await self._send_all([connection.websocket.send_json(PING) for connection in quiet])
+        return len(due)
+
+    async def _send_all(self, sends: list[Awaitable[None]]) -> None:
+        """
+        Run socket sends concurrently, giving up on any still stuck after a tick,
+        so one stalled socket cannot hold up the rest.
+
+        asyncio.wait rather than wait_for, which can swallow a cancel that races
+        with its timeout and keep stop() waiting.
+        """
+        tasks = [asyncio.ensure_future(_ignore_errors(send)) for send in sends]
+        _, pending = await asyncio.wait(tasks, timeout=self.tick)
+        for task in pending:
+            task.cancel()
+
+    async def reap(self, connection: MorseConnection) -> None:
+        """Drop an idle connection from its channel and close it"""
+        channel_id = self._channels.pop(connection, None)
+        self.wheel.cancel(connection)
+        if channel_id is None:
+            return
+
+        HEARTBEAT_REAPED.inc()
+        logger.info(f"Reaping idle connection of {connection.user.callsign} in channel {channel_id}")
+        channel = manager.channels.get(channel_id)
+        if manager.disconnect(connection, channel_id) and channel is not None and channel.user_count > 0:
+            user_public_dict = UserPublic(**connection.user.model_dump()).model_dump(mode="json")
+            # Bounded like the pings, so a stalled partner cannot hold up the tick
+            await self._send_all([channel.broadcast({"event": "user_left", "user": user_public_dict})])
+
+        await self._send_all([connection.websocket.close(code=status.WS_1001_GOING_AWAY, reason="Idle timeout")])
+
+    async def _run(self) -> None:
+        next_tick = time.monotonic()
+        while True:
+            # Keep to the schedule however long a tick took
+            next_tick += self.tick
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            started = time.perf_counter()
+            try:
+                await self.run_tick()
+            except Exception as e:
+                logger.error(f"Heartbeat tick failed: {type(e).__name__}: {e}")
+            HEARTBEAT_TICK.observe(time.perf_counter() - started)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def _ignore_errors(send: Awaitable[None]) -> None:
+    try:
+        await send
+    except Exception:
+        pass  # Dead sockets are reaped once they reach the timeout
+
+
+# Single instance for the app
+heartbeat = Heartbeat(settings.heartbeat_interval, settings.heartbeat_timeout, settings.heartbeat_tick)
@@ -0,0 +1,207 @@
+# app/core/invites.py
+"""
+Direct invites: call a followed user into a channel reserved for the two of
+you, without agreeing on a channel ID first.
+
+Pending invites are indexed by id, by caller (one outgoing call at a time)
+and by callee, so every lookup is a dict access. Expiry runs off a heap of
+deadlines with lazy deletion: answering an invite only drops it from the
+indexes, and its stale heap entry is skipped when it comes up, so each
+expiry costs O(log n) however many invites are pending.
+
+An accepted invite stays in the heap for one more TTL, to give back its
+channel reservation if neither side ever opens the channel.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import secrets
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Literal
+
+from ..config import settings
+from ..models import User
+from .metrics import INVITES
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class InviteError(Exception):
+    pass
+
+
+@dataclass(eq=False)
+class Invite:
+    id: str
+    caller: User
+    callee_id: str
+    channel_id: str
+    deadline: float  # time.monotonic()
+    state: Literal["pending", "accepted"] = "pending"
+    _entry: int = field(default=0, repr=False)  # Sequence number of its live heap entry
+
+    @property
+    def caller_id(self) -> str:
+        return str(self.caller.id)
+
+    def expires_in(self, now: float | None = None) -> float:
+        return max(0.0, self.deadline - (time.monotonic() if now is None else now))
+
+
+OnExpire = Callable[[Invite], Awaitable[None]]
+
+
+class InviteBook:
+    """Pending and recently accepted invites"""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._by_id: dict[str, Invite] = {}
+        self._by_caller: dict[str, Invite] = {}  # Pending only
+        self._by_callee: dict[str, dict[str, Invite]] = {}  # Pending only: callee_id -> invite_id -> invite
+        self._heap: list[tuple[float, int, str]] = []  # (deadline, entry, invite_id)
+        self._entries = itertools.count(1)
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, invite_id: str) -> Invite | None:
+        return self._by_id.get(invite_id)
+
+    def outgoing(self, caller_id: uuid.UUID | str) -> Invite | None:
+        return self._by_caller.get(str(caller_id))
+
+    def incoming(self, callee_id: uuid.UUID | str) -> list[Invite]:
+        return list(self._by_callee.get(str(callee_id), {}).values())
+
+    def clear(self) -> None:
+        self._by_id.clear()
+        self._by_caller.clear()
+        self._by_callee.clear()
+        self._heap.clear()
+
+    def create(self, caller: User, callee_id: uuid.UUID | str, channel_id: str, now: float | None = None) -> Invite:
+        if str(caller.id) in self._by_caller:
+            raise InviteError("You are already calling someone")
+
+        now = time.monotonic() if now is None else now
+        invite = Invite(secrets.token_urlsafe(12), caller, str(callee_id), channel_id, now + self.ttl)
+        self._by_id[invite.id] = invite
+        self._by_caller[invite.caller_id] = invite
+        self._by_callee.setdefault(invite.callee_id, {})[invite.id] = invite
+        self._schedule(invite)
+        return invite
+
+    def accept(self, invite: Invite, now: float | None = None) -> None:
+        """Answer an invite; it is kept one more TTL for its reservation"""
+        self._unindex(invite)
+        invite.state = "accepted"
+        invite.deadline = (time.monotonic() if now is None else now) + self.ttl
+        self._schedule(invite)
+
+    def discard(self, invite: Invite) -> None:
+        """Forget an invite; its heap entry goes stale"""
+        self._unindex(invite)
+        self._by_id.pop(invite.id, None)
+        self._compact()
+
+    def expire(self, now: float | None = None) -> list[Invite]:
+        """Remove and return the invites past their deadline"""
+        now = time.monotonic() if now is None else now
+        expired = []
+        while self._heap and self._heap[0][0] <= now:
+            _, entry, invite_id = heapq.heappop(self._heap)
+            invite = self._by_id.get(invite_id)
+            if invite is None or invite._entry != entry:
+                continue  # Answered, or rescheduled since
+            self._unindex(invite)
+            del self._by_id[invite_id]
+            expired.append(invite)
+        return expired
+
+    def next_deadline(self) -> float | None:
+        return self._heap[0][0] if self._heap else None
+
+    def _schedule(self, invite: Invite) -> None:
+        invite._entry = next(self._entries)
+        if not self._heap or invite.deadline < self._heap[0][0]:
+            self._wake.set()  # The expiry task sleeps until the old earliest deadline
+        heapq.heappush(self._heap, (invite.deadline, invite._entry, invite.id))
+
+    def _unindex(self, invite: Invite) -> None:
+        if self._by_caller.get(invite.caller_id) is invite:
+            del self._by_caller[invite.caller_id]
+        incoming = self._by_callee.get(invite.callee_id)
+        if incoming is not None:
+            incoming.pop(invite.id, None)
+            if not incoming:
+                del self._by_callee[invite.callee_id]
+
+    def _compact(self) -> None:
+        """Drop stale heap entries once they outnumber the live ones"""
+        if len(self._heap) > 2 * len(self._by_id) + 64:
+            self._heap = [
+                item for item in self._heap
+                if (invite := self._by_id.get(item[2])) is not None and invite._entry == item[1]
+            ]
+            heapq.heapify(self._heap)
+
+    async def _run(self, on_expire: OnExpire) -> None:
+        while True:
+            deadline = self.next_deadline()
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            self._wake.clear()
+            # asyncio.wait rather than wait_for, which can swallow a cancel
+            waiter = asyncio.ensure_future(self._wake.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=timeout)
+            finally:
+                waiter.cancel()
+
+            for invite in self.expire():
+                try:
+                    await on_expire(invite)
+                except Exception as e:
+                    logger.error(f"Expiring invite {invite.id} failed: {type(e).__name__}: {e}")
+
+    def start(self, on_expire: OnExpire) -> None:
+        if self._task is None or self._task.done():
+            # The event belongs to the loop the app runs on
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(on_expire))
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+async def expire_invite(invite: Invite) -> None:
+    """Tell both sides a pending invite ran out, and free an unused channel"""
+    # Imported here: the channel layer imports this module's siblings
+    from .connection_manager import manager
+    from .presence import presence
+
+    # The channel may have opened and closed since, and its ID gone to another invite
+    manager.release(invite.channel_id, owner=invite.id)
+    if invite.state != "pending":
+        return
+
+    INVITES.inc(labels=("expired",))
+    message = {"event": "invite_expired", "invite_id": invite.id, "channel_id": invite.channel_id}
+    await presence.send(invite.caller_id, message)
+    await presence.send(invite.callee_id, message)
+    channel = manager.channels.get(invite.channel_id)
+    if channel is not None:
+        await channel.broadcast(message)
+
+
+# Single instance for the app
+invites = InviteBook(settings.invite_ttl)
@@ -0,0 +1,270 @@
+# app/core/metrics.py
+"""
+In-process metrics registry rendered in the Prometheus text format.
+
+Every uvicorn worker keeps its own registry and Prometheus aggregates across
+workers. Within a worker, metrics are also updated from threads (the bcrypt
+pool, sync routes running in the threadpool, SQLAlchemy events), and an
+update is a read-modify-write, so each metric guards its values with its own
+lock. The lock is uncontended on the relay path, which runs on the event loop.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+LabelValues = tuple[str, ...]
+
+# Latency buckets in seconds, from sub-millisecond relays to slow DB queries
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonically increasing value, optionally split by labels"""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, labels: LabelValues = ()) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, labels: LabelValues = ()) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class CallbackGauge:
+    """Gauge whose values are computed on scrape, so it costs nothing between scrapes"""
+    kind = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            help: str,
+            callback: Callable[[], dict[LabelValues, float]],
+            labelnames: tuple[str, ...] = ()
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._callback = callback
+
+    def samples(self) -> Iterator[str]:
+        for labels, value in self._callback().items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds"""
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            help: str,
+            labelnames: tuple[str, ...] = (),
+            buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count, sum]
+        self._series: dict[LabelValues, list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        bucket = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0.0] * (len(self.buckets) + 2)
+            series[bucket] += 1
+            series[-1] += value
+
+    def count(self, labels: LabelValues = ()) -> int:
+        with self._lock:
+            series = self._series.get(labels)
+            return int(sum(series[:-1])) if series else 0
+
+    @contextmanager
+    def time(self, labels: LabelValues = ()) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            snapshot = [(labels, list(series)) for labels, series in self._series.items()]
+        for labels, series in snapshot:
+            cumulative = 0.0
+            for bound, bucket_count in zip(self.buckets, series[:len(self.buckets)], strict=True):
+                cumulative += bucket_count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            cumulative += series[len(self.buckets)]
+            le = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            yield f"{self.name}_bucket{le} {cumulative}"
+            plain = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{plain} {series[-1]}"
+            yield f"{self.name}_count{plain} {cumulative}"
+
+
+Metric = Counter | CallbackGauge | Histogram
+M = TypeVar("M", Counter, CallbackGauge, Histogram)
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+
+    def register(self, metric: M) -> M:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+RELAY_FRAMES = registry.register(Counter(
+    "morse_relay_frames_total", "Frames relayed between channel users"
+))
+RELAY_SEND_FAILURES = registry.register(Counter(
+    "morse_relay_send_failures_total", "Frames that could not be sent to the other user"
+))
+RELAY_REJECTED = registry.register(Counter(
+    "morse_relay_rejected_frames_total", "Frames refused by flood protection", ("reason",)
+))
+RELAY_FLOOD_DISCONNECTS = registry.register(Counter(
+    "morse_relay_flood_disconnects_total", "Connections closed by flood protection"
+))
+HEARTBEAT_REAPED = registry.register(Counter(
+    "morse_heartbeat_reaped_total", "Connections dropped after the idle timeout"
+))
+HEARTBEAT_TICK = registry.register(Histogram(
+    "morse_heartbeat_tick_seconds", "Time spent on one heartbeat tick"
+))
+SESSION_RESUMES = registry.register(Counter(
+    "morse_session_resumes_total", "Dropped resumable connections, by whether they came back in time",
+    ("outcome",),
+))
+DRAIN_CLOSED = registry.register(Counter(
+    "morse_drain_closed_total", "Channel connections still open at the drain deadline and closed by the server"
+))
+INVITES = registry.register(Counter(
+    "morse_invites_total", "Answered and unanswered invites, by outcome", ("outcome",)
+))
+HTTP_RATE_LIMITED = registry.register(Counter(
+    "morse_http_rate_limited_total", "Requests rejected by the login and registration limits",
+    ("route", "key"),
+))
+RELAY_LATENCY = registry.register(Histogram(
+    "morse_relay_latency_seconds", "Time from receiving a frame to sending it on"
+))
+DB_QUERIES = registry.register(Counter(
+    "morse_db_queries_total", "Database queries executed", ("route",)
+))
+DB_QUERY_LATENCY = registry.register(Histogram(
+    "morse_db_query_seconds", "Database query latency", ("route",)
+))
+BCRYPT_LATENCY = registry.register(Histogram(
+    "morse_bcrypt_seconds", "Time spent hashing or verifying passwords", ("operation",)
+))
+
+
+# DB instrumentation. Queries are attributed to the route template that ran them;
+# the template is only known once routing is done, so queries are buffered per
+# request and flushed by MetricsMiddleware.
+_request_queries: ContextVar[list[float] | None] = ContextVar("request_queries", default=None)
+
+UNROUTED = "unrouted"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(
+        conn: Connection, _cursor: Any, _statement: str, _parameters: Any, _context: Any, _executemany: bool
+) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(
+        conn: Connection, _cursor: Any, _statement: str, _parameters: Any, _context: Any, _executemany: bool
+) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    queries = _request_queries.get()
+    if queries is not None:
+        queries.append(elapsed)
+    else:
+        DB_QUERIES.inc(labels=(UNROUTED,))
+        DB_QUERY_LATENCY.observe(elapsed, (UNROUTED,))
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context: ExceptionContext) -> None:
+    # after_cursor_execute is skipped for failed queries
+    if context.connection is not None and context.connection.info.get("query_start"):
+        context.connection.info["query_start"].pop()
+
+
+class MetricsMiddleware:
+    """Attributes database queries made while serving a request to its route"""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        queries: list[float] = []
+        token = _request_queries.set(queries)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_queries.reset(token)
+            if queries:
+                route = scope.get("route")
+                labels = (getattr(route, "path", UNROUTED),)
+                DB_QUERIES.inc(len(queries), labels)
+                for elapsed in queries:
+                    DB_QUERY_LATENCY.observe(elapsed, labels)
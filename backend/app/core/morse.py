@@ -0,0 +1,142 @@
+# app/core/morse.py
+"""
+Morse code encoding and decoding.
+
+All lookups go through tables built once at import. Timing sequences are
+decoded a whole buffer at a time: durations are thresholded against cut
+points derived from the unit length, mapped straight to code tokens and
+joined, then handed to the table decoder.
+"""
+from collections.abc import Sequence
+
+MORSE_CODE: dict[str, str] = {
+    "A": ".-", "B": "-...", "C": "-.-.", "D": "-..", "E": ".", "F": "..-.",
+    "G": "--.", "H": "....", "I": "..", "J": ".---", "K": "-.-", "L": ".-..",
+    "M": "--", "N": "-.", "O": "---", "P": ".--.", "Q": "--.-", "R": ".-.",
+    "S": "...", "T": "-", "U": "..-", "V": "...-", "W": ".--", "X": "-..-",
+    "Y": "-.--", "Z": "--..",
+    "0": "-----", "1": ".----", "2": "..---", "3": "...--", "4": "....-",
+    "5": ".....", "6": "-....", "7": "--...", "8": "---..", "9": "----.",
+    ".": ".-.-.-", ",": "--..--", "?": "..--..", "'": ".----.", "!": "-.-.--",
+    "/": "-..-.", "(": "-.--.", ")": "-.--.-", "&": ".-...", ":": "---...",
+    ";": "-.-.-.", "=": "-...-", "+": ".-.-.", "-": "-....-", "_": "..--.-",
+    '"': ".-..-.", "$": "...-..-", "@": ".--.-.",
+}
+
+# Marks and spaces are measured in dit units
+DIT, DAH = 1, 3
+ELEMENT_GAP, LETTER_GAP, WORD_GAP = 1, 3, 7
+
+WORD_SEPARATOR = " / "
+UNKNOWN_CHAR = "*"  # Decoded in place of unknown code groups
+
+_DECODE: dict[str, str] = {code: char for char, code in MORSE_CODE.items()}
+
+# Lower- and upper-case letters both encode
+_ENCODE: dict[str, str] = {**MORSE_CODE, **{char.lower(): code for char, code in MORSE_CODE.items()}}
+
+# Clients send typographic dots (the frontend uses "•")
+_NORMALIZE = str.maketrans({"•": ".", "·": ".", "∙": ".", "–": "-", "—": "-", "_": "-"})
+
+
+def encode(text: str) -> str:
+    """Encode text as Morse; letters are separated by spaces and words by ' / '"""
+    words = []
+    for word in text.split():
+        codes = [_ENCODE[char] for char in word if char in _ENCODE]
+        if codes:
+            words.append(" ".join(codes))
+    return WORD_SEPARATOR.join(words)
+
+
+def decode(morse: str) -> str:
+    """Decode Morse written with '.', '-', spaces between letters and '/' between words"""
+    morse = morse.translate(_NORMALIZE)
+    return " ".join(
+        "".join(_DECODE.get(code, UNKNOWN_CHAR) for code in word.split())
+        for word in morse.split("/")
+        if word.strip()
+    )
+
+
+def decode_char(code: str) -> str:
+    return _DECODE.get(code, UNKNOWN_CHAR)
+
+
+def unit_from_wpm(wpm: float) -> float:
+    """Dit length in milliseconds for a speed in words per minute (PARIS standard)"""
+    return 1200.0 / wpm
+
+
+def wpm_from_unit(unit_ms: float) -> float:
+    return 1200.0 / unit_ms
+
+
+def estimate_unit(durations: Sequence[float]) -> float:
+    """
+    Estimate the dit length from a buffer of signed durations.
+
+    Marks are split into dits and dahs at the geometric mean of the shortest
+    and longest mark. When all marks look alike (ratio under 2:1), the buffer
+    is assumed to be all dits unless the space between elements says otherwise.
+    """
+    marks = sorted(d for d in durations if d > 0)
+    if not marks:
+        raise ValueError("Timing buffer has no key-down durations")
+
+    shortest, longest = marks[0], marks[-1]
+    if longest >= 2 * shortest:
+        cut = (shortest * longest) ** 0.5
+        dits = [d for d in marks if d < cut]
+        dahs = [d / DAH for d in marks if d >= cut]
+        # Dahs are scaled down to units so both groups estimate the same length
+        return (sum(dits) + sum(dahs)) / (len(dits) + len(dahs))
+
+    spaces = [-d for d in durations if d < 0]
+    if spaces and min(spaces) * 2 < shortest:
+        return min(spaces)  # Element gaps are one unit, so marks are dahs
+    return sum(marks) / len(marks)
+
+
+def timings_to_morse(durations: Sequence[float], unit: float | None = None) -> str:
+    """
+    Convert signed durations to Morse notation.
+
+    Positive values are key-down (mark) durations and negative values are
+    key-up (space) durations, in milliseconds.
+    """
+    if unit is None:
+        unit = estimate_unit(durations)
+
+    # Cut points halfway between the nominal lengths, in log space
+    dah_cut = unit * (DIT * DAH) ** 0.5
+    letter_cut = unit * (ELEMENT_GAP * LETTER_GAP) ** 0.5
+    word_cut = unit * (LETTER_GAP * WORD_GAP) ** 0.5
+
+    return "".join([
+        ("." if d < dah_cut else "-") if d > 0
+        else ("" if -d < letter_cut else " " if -d < word_cut else WORD_SEPARATOR)
+        for d in durations
+    ])
+
+
+def decode_timings(durations: Sequence[float], unit: float | None = None) -> str:
+    """Decode a buffer of signed key-down/key-up durations to text"""
+    return decode(timings_to_morse(durations, unit))
+
+
+def text_to_timings(text: str, unit: float) -> list[float]:
+    """Signed durations for keying `text` perfectly at `unit` milliseconds per dit"""
+    durations: list[float] = []
+    for w, word in enumerate(text.split()):
+        if w:
+            durations.append(-WORD_GAP * unit)
+        codes = [_ENCODE[char] for char in word if char in _ENCODE]
+        for c, code in enumerate(codes):
+            if c:
+                durations.append(-LETTER_GAP * unit)
+            for e, element in enumerate(code):
+                if e:
+                    durations.append(-ELEMENT_GAP * unit)
+                durations.append((DIT if element == "." else DAH) * unit)
+    return durations
@@ -0,0 +1,96 @@
+# app/core/plans.py
+"""
+Query plan checks for the hot lookups.
+
+Each query is built the way the routes build it, and EXPLAINed against the
+live database. A sequential scan of its table means the index meant for it
+is missing. PostgreSQL plans with sequential scans disabled, since on a
+small table it would pick one even with the right index in place.
+"""
+import uuid
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import Select
+from sqlmodel import col, select
+
+from ..models import Follow, User
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    table: str
+    build: Callable[[], Select[Any]]
+    # Walks an index in order and stops at a LIMIT, so scanning that index is the plan we want
+    ordered: bool = False
+    dialects: tuple[str, ...] = ()  # Only checked on these; empty for all
+
+
+@dataclass(frozen=True)
+class PlanCheck:
+    query: HotQuery
+    plan: list[str]
+    seq_scan: bool
+
+
+HOT_QUERIES = (
+    HotQuery(
+        "followers", "follow",
+        lambda: select(Follow.follower_id).where(Follow.followed_id == uuid.uuid4()),
+    ),
+    HotQuery(
+        "online users", "user",
+        lambda: select(User.id).where(User.last_seen > datetime.utcnow() - timedelta(minutes=10)),
+    ),
+    HotQuery(
+        "recently seen callsigns", "user",
+        lambda: select(User.callsign).order_by(col(User.last_seen).desc()).limit(50),
+        ordered=True,
+    ),
+    HotQuery(
+        # Other databases have no index for infix matches
+        "callsign search", "user",
+        lambda: select(User.id).where(col(User.callsign).contains("AB")),
+        dialects=("postgresql",),
+    ),
+)
+
+
+def explain(connection: Connection, statement: Select[Any]) -> list[str]:
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        return [row[0] for row in connection.exec_driver_sql(f"EXPLAIN {sql}")]
+    if connection.dialect.name == "sqlite":
+        return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    raise ValueError(f"No plan check for {connection.dialect.name}")
+
+
+def is_seq_scan(plan: list[str], query: HotQuery, dialect: str) -> bool:
+    for line in plan:
+        if dialect == "postgresql" and "Seq Scan on" in line and query.table in line.split("Seq Scan on", 1)[1]:
+            return True
+        # SQLite looks rows up with "SEARCH user USING INDEX ...", and reads
+        # all of them with "SCAN user", even when it reads them through an
+        # index ("SCAN follow USING COVERING INDEX sqlite_autoindex_follow_1")
+        if dialect == "sqlite" and line.startswith(f"SCAN {query.table}"):
+            if not (query.ordered and "USING INDEX" in line):
+                return True
+    return False
+
+
+def check_plans(engine: Engine) -> list[PlanCheck]:
+    """EXPLAIN every hot query that applies to this database"""
+    dialect = engine.dialect.name
+    checks = []
+    for query in HOT_QUERIES:
+        if query.dialects and dialect not in query.dialects:
+            continue
+        with engine.begin() as connection:
+            plan = explain(connection, query.build())
+        checks.append(PlanCheck(query, plan, is_seq_scan(plan, query, dialect)))
+    return checks
@@ -0,0 +1,155 @@
+# app/core/practice.py
+"""
+Koch-method practice drills.
+
+A Koch lesson n teaches the first n + 1 characters of KOCH_ORDER. Everything
+a lesson needs (its character pool, the words and callsigns it can spell) is
+computed once per character set and cached, so generating a drill is only a
+handful of random choices. Drill pages are derived from a seed, which makes
+them reproducible without storing anything per learner.
+"""
+import random
+import time
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Literal, NamedTuple
+
+from sqlmodel import Session, col, select
+
+from ..models import User
+from . import morse
+
+# Order used by LCWO and most Koch trainers
+KOCH_ORDER = "KMURESNAPTLWI.JZ=FOY,VG5/Q92H38B?47C1D60X"
+MAX_LESSON = len(KOCH_ORDER) - 1
+
+DrillKind = Literal["groups", "words", "callsigns", "mixed"]
+
+# The newest character is drawn this many times as often as the others
+NEW_CHAR_WEIGHT = 3
+
+COMMON_WORDS = (
+    "A", "ABOUT", "ALL", "AM", "AN", "AND", "ANT", "ARE", "AS", "AT", "BE", "BEEN", "BUT", "BY",
+    "CALL", "CAN", "COPY", "CQ", "DE", "DO", "DX", "EAT", "ES", "FB", "FER", "FOR", "FROM", "GA",
+    "GE", "GM", "GN", "GOOD", "HAVE", "HE", "HER", "HR", "HW", "I", "IF", "IN", "IS", "IT", "KEY",
+    "MAN", "ME", "MY", "NAME", "NEW", "NO", "NOT", "NOW", "OF", "OK", "OLD", "OM", "ON", "ONE", "OR",
+    "OUT", "PSE", "QRM", "QRN", "QRS", "QRZ", "QSL", "QSO", "QTH", "R", "RIG", "RST", "SEE", "SO",
+    "SRI", "SUN", "TEST", "THE", "TIME", "TNX", "TO", "TU", "UP", "UR", "WAS", "WE", "WILL", "WITH",
+    "WX", "YES", "YOU", "5NN", "599", "73", "88",
+)
+
+# Callsigns are re-read from the database at most this often
+CALLSIGN_REFRESH_SECONDS = 300.0
+MAX_CALLSIGNS = 5000
+
+
+class Lesson(NamedTuple):
+    number: int
+    chars: str
+    new_char: str
+    pool: str  # Characters weighted towards the newest one
+    words: tuple[str, ...]
+
+
+def _spellable(candidates: Iterable[str], chars: str) -> tuple[str, ...]:
+    allowed = set(chars)
+    return tuple(word for word in candidates if set(word) <= allowed)
+
+
+@lru_cache(maxsize=MAX_LESSON)
+def get_lesson(number: int) -> Lesson:
+    """Precomputed corpus for Koch lesson `number` (1 to MAX_LESSON)"""
+    if not 1 <= number <= MAX_LESSON:
+        raise ValueError(f"Lesson must be between 1 and {MAX_LESSON}")
+
+    chars = KOCH_ORDER[:number + 1]
+    new_char = chars[-1]
+    return Lesson(
+        number=number,
+        chars=chars,
+        new_char=new_char,
+        pool=chars + new_char * (NEW_CHAR_WEIGHT - 1),
+        words=_spellable(COMMON_WORDS, chars),
+    )
+
+
+class CallsignCorpus:
+    """Uppercased callsigns of registered users, reloaded periodically"""
+
+    def __init__(self, refresh_seconds: float = CALLSIGN_REFRESH_SECONDS) -> None:
+        self.refresh_seconds = refresh_seconds
+        self._callsigns: tuple[str, ...] = ()
+        self._loaded_at: float | None = None
+        self._by_chars: dict[str, tuple[str, ...]] = {}
+
+    def _refresh(self, session: Session) -> None:
+        rows = session.exec(
+            select(User.callsign).order_by(col(User.last_seen).desc()).limit(MAX_CALLSIGNS)
+        ).all()
+        # Only callsigns that can be keyed are useful for practice
+        self._callsigns = tuple(c.upper() for c in rows if all(ch in morse.MORSE_CODE for ch in c.upper()))
+        self._by_chars = {}
+        self._loaded_at = time.monotonic()
+
+    def for_lesson(self, session: Session, lesson: Lesson) -> tuple[str, ...]:
+        """Callsigns spellable with the lesson's characters"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            self._refresh(session)
+
+        spellable = self._by_chars.get(lesson.chars)
+        if spellable is None:
+            spellable = self._by_chars[lesson.chars] = _spellable(self._callsigns, lesson.chars)
+        return spellable
+
+    def clear(self) -> None:
+        self._loaded_at = None
+        self._by_chars = {}
+
+
+def group(rng: random.Random, lesson: Lesson, size: int) -> str:
+    return "".join(rng.choices(lesson.pool, k=size))
+
+
+def drill(
+        rng: random.Random,
+        lesson: Lesson,
+        kind: DrillKind,
+        length: int,
+        group_size: int = 5,
+        callsigns: tuple[str, ...] = (),
+) -> str:
+    """
+    One drill of `length` items.
+
+    Words and callsigns fall back to random groups when the lesson cannot
+    spell any yet.
+    """
+    items: list[str] = []
+    for _ in range(length):
+        item_kind = rng.choice(("groups", "words", "callsigns")) if kind == "mixed" else kind
+        if item_kind == "words" and lesson.words:
+            items.append(rng.choice(lesson.words))
+        elif item_kind == "callsigns" and callsigns:
+            items.append(rng.choice(callsigns))
+        else:
+            items.append(group(rng, lesson, group_size))
+    return " ".join(items)
+
+
+def drill_batch(
+        lesson: Lesson,
+        kind: DrillKind,
+        seed: int,
+        page: int,
+        page_size: int,
+        length: int,
+        group_size: int = 5,
+        callsigns: tuple[str, ...] = (),
+) -> list[str]:
+    """Page `page` of the drill sequence for `seed`; the same arguments give the same drills"""
+    rng = random.Random(f"{seed}:{lesson.number}:{kind}:{page}")
+    return [drill(rng, lesson, kind, length, group_size, callsigns) for _ in range(page_size)]
+
+
+# Single instance for the app
+callsigns = CallsignCorpus()
@@ -0,0 +1,65 @@
+# app/core/presence.py
+"""
+Presence sockets: one per open app tab, outside of any channel, so the
+server can reach a user who is not in a channel (an incoming invite).
+
+A user has at most `max_sockets` of them, and sends give up after
+`send_timeout`, so a stalled tab cannot hold up the request that calls them.
+"""
+import asyncio
+import uuid
+from typing import Any
+
+from fastapi import WebSocket
+
+from ..config import settings
+
+
+class PresenceHub:
+    """Open presence sockets by user"""
+
+    def __init__(self, max_sockets: int, send_timeout: float) -> None:
+        self.max_sockets = max_sockets
+        self.send_timeout = send_timeout
+        # user_id -> sockets, oldest first (a dict keeps the order a set would not)
+        self._sockets: dict[str, dict[WebSocket, None]] = {}
+
+    def add(self, user_id: uuid.UUID | str, websocket: WebSocket) -> WebSocket | None:
+        """Register a socket; returns the user's oldest one if it has to make room"""
+        sockets = self._sockets.setdefault(str(user_id), {})
+        sockets[websocket] = None
+        if len(sockets) > self.max_sockets:
+            oldest = next(iter(sockets))
+            del sockets[oldest]
+            return oldest
+        return None
+
+    def remove(self, user_id: uuid.UUID | str, websocket: WebSocket) -> None:
+        sockets = self._sockets.get(str(user_id))
+        if sockets is None:
+            return
+        sockets.pop(websocket, None)
+        if not sockets:
+            del self._sockets[str(user_id)]
+
+    def is_present(self, user_id: uuid.UUID | str) -> bool:
+        return str(user_id) in self._sockets
+
+    def clear(self) -> None:
+        self._sockets.clear()
+
+    async def send(self, user_id: uuid.UUID | str, message: dict[str, Any]) -> bool:
+        """Send to every socket of the user; returns False if none took it within `send_timeout`"""
+        sockets = list(self._sockets.get(str(user_id), ()))
+        if not sockets:
+            return False
+        tasks = [asyncio.ensure_future(websocket.send_json(message)) for websocket in sockets]
+        # asyncio.wait rather than wait_for, which can swallow a cancel
+        done, pending = await asyncio.wait(tasks, timeout=self.send_timeout)
+        for task in pending:
+            task.cancel()
+        return any(not task.cancelled() and task.exception() is None for task in done)
+
+
+# Single instance for the app
+presence = PresenceHub(settings.presence_max_sockets, settings.presence_send_timeout)
@@ -0,0 +1,221 @@
+# app/core/ratelimit.py
+"""
+Rate limiting.
+
+Token buckets guard the relay loop: every frame is checked against its
+connection's bucket and then the global bucket. A check is a few float
+operations on preallocated slots, with no allocation, so it is cheap enough
+to run on every frame.
+
+Sliding-window counters guard the HTTP endpoints that do bcrypt work, keyed
+by client IP and by callsign.
+"""
+import json
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from .metrics import HTTP_RATE_LIMITED
+
+
+class TokenBucket:
+    """Allows `rate` events per second on average and up to `burst` at once"""
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated: float | None = None
+
+    def allow(self, now: float) -> bool:
+        """Take one token at `now` (time.monotonic()); False if the bucket is empty"""
+        if self.updated is not None:
+            tokens = self.tokens + (now - self.updated) * self.rate
+            self.tokens = tokens if tokens < self.burst else self.burst
+        self.updated = now
+
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+def connection_bucket() -> TokenBucket:
+    return TokenBucket(settings.relay_rate, settings.relay_burst)
+
+
+# Shared by every connection in this worker
+global_bucket = TokenBucket(settings.relay_global_rate, settings.relay_global_burst)
+
+
+# Endpoints doing a bcrypt hash or check per request
+LIMITED_PATHS = frozenset({"/auth/login", "/users/"})
+
+# Bodies larger than this are passed on without looking for a callsign
+MAX_INSPECTED_BODY = 4096
+
+
+class RateLimitStore(ABC):
+    """
+    Sliding-window counters shared by the rate-limit middleware.
+
+    The in-memory store below only sees its own worker; with several workers,
+    pass RateLimitMiddleware a store backed by something they share.
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: float, now: float) -> bool:
+        """Count one request for `key` at `now` (unix seconds); False if over `limit` per `window`"""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Forget every counter"""
+
+
+class MemoryStore(RateLimitStore):
+    """
+    Per-worker store holding at most `max_keys` counters.
+
+    Each key keeps the count of the current and the previous fixed window; the
+    previous count is weighted by how much of it still overlaps the sliding
+    window. Keys are kept in least-recently-used order and the oldest are
+    evicted once the store is full, so a spray of spoofed callsigns cannot
+    grow it without bound.
+    """
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        # key -> [window index, current count, previous count]
+        self._counters: OrderedDict[str, list[int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    async def hit(self, key: str, limit: int, window: float, now: float) -> bool:
+        index = int(now // window)
+        counter = self._counters.get(key)
+        if counter is None:
+            counter = [index, 0, 0]
+            self._counters[key] = counter
+            if len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        else:
+            self._counters.move_to_end(key)
+            if index != counter[0]:
+                counter[2] = counter[1] if index - counter[0] == 1 else 0
+                counter[0], counter[1] = index, 0
+
+        overlap = 1.0 - (now - index * window) / window
+        if counter[2] * overlap + counter[1] >= limit:
+            return False
+        counter[1] += 1
+        return True
+
+    async def clear(self) -> None:
+        self._counters.clear()
+
+
+class RateLimitMiddleware:
+    """
+    Limits how often the bcrypt-backed endpoints (login and registration) can
+    be called, per client IP and per callsign.
+
+    It runs before routing, so a rejected request never reaches the database
+    or bcrypt. The per-IP limit is checked first; only then are up to
+    MAX_INSPECTED_BODY bytes of the JSON body read to find the callsign, and
+    handed on to the route unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, store: RateLimitStore) -> None:
+        self.app = app
+        self.store = store
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in LIMITED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        now = time.time()
+        window = settings.auth_rate_limit_window
+
+        # The IP check needs no body, so a flood from one client is turned away unread
+        client = scope.get("client")
+        if client and not await self.store.hit(f"ip:{path}:{client[0]}", settings.auth_rate_limit_ip, window, now):
+            await self._reject(scope, receive, send, "ip")
+            return
+
+        body, receive = await _buffer_body(receive, MAX_INSPECTED_BODY)
+        callsign = _callsign(body)
+        if callsign and not await self.store.hit(
+                f"callsign:{path}:{callsign}", settings.auth_rate_limit_callsign, window, now):
+            await self._reject(scope, receive, send, "callsign")
+            return
+
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, key: str) -> None:
+        HTTP_RATE_LIMITED.inc(labels=(scope["path"], key))
+        response = JSONResponse(
+            {"detail": "Too many requests"},
+            status_code=429,
+            headers={"Retry-After": str(math.ceil(settings.auth_rate_limit_window))},
+        )
+        await response(scope, receive, send)
+
+
+async def _buffer_body(receive: Receive, limit: int) -> tuple[bytes, Receive]:
+    """
+    Read the request body, if it is at most `limit` bytes, and return it with
+    a receive that replays what was read. A longer body is left mostly unread
+    and b"" is returned in its place.
+    """
+    messages: list[Message] = []
+    size = 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            # Client went away; let the app see the disconnect
+            return b"", _replay(messages, receive)
+        size += len(message.get("body", b""))
+        if size > limit:
+            return b"", _replay(messages, receive)
+        if not message.get("more_body", False):
+            break
+
+    body = b"".join(message.get("body", b"") for message in messages)
+    return body, _replay([{"type": "http.request", "body": body, "more_body": False}], receive)
+
+
+def _replay(messages: list[Message], receive: Receive) -> Receive:
+    async def replay() -> Message:
+        if messages:
+            return messages.pop(0)
+        return await receive()
+    return replay
+
+
+def _callsign(body: bytes) -> str | None:
+    if not body:
+        return None
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    callsign = data.get("callsign") if isinstance(data, dict) else None
+    if not isinstance(callsign, str) or not callsign.strip():
+        return None
+    return callsign.strip().upper()
+
+
+# Shared by the login and registration limits in this worker
+auth_store = MemoryStore(settings.auth_rate_limit_max_keys)
@@ -0,0 +1,376 @@
+# app/core/recording.py
+"""
+Opt-in channel session recording.
+
+A recording is an append-only binary log:
+
+    header:  b"MREC", version (u8), start time (f64, unix seconds)
+    records: delta ms since the previous record (u32), kind (u8),
+             slot of the sender in the channel (u8), payload length (u16),
+             payload (UTF-8)
+
+Next to it a small JSON sidecar holds the metadata used for listing and
+access checks. The recorder keeps that metadata indexed in memory, reading
+the sidecars once, and deletes recordings older than the retention period.
+The relay path only packs a record and puts it on a queue, and only touches
+the in-memory index; a writer thread batches everything queued within
+`recording_flush_interval` into one write per file, and also runs the
+retention sweeps. Reads go through mmap, so replaying a long session
+does not load it into memory.
+"""
+import json
+import logging
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import uuid
+from collections.abc import Callable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from ..config import settings
+from ..models import User
+
+logger = logging.getLogger("uvicorn.error")
+
+MAGIC = b"MREC"
+VERSION = 1
+HEADER = struct.Struct("<4sBd")
+RECORD = struct.Struct("<IBBH")
+MAX_PAYLOAD = 0xFFFF
+MAX_DELTA_MS = 0xFFFFFFFF
+
+# Record kinds
+FRAME, JOIN, LEAVE = 0, 1, 2
+
+RECORDING_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Seconds between retention sweeps
+PRUNE_INTERVAL = 3600.0
+
+
+class Record(NamedTuple):
+    offset_ms: int  # Since the start of the recording
+    kind: int
+    slot: int
+    payload: str
+
+
+class RecordingWriter:
+    """Background thread appending queued records to their files in batches"""
+
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self._queue: queue.SimpleQueue[tuple[str, Path, Any] | None] = queue.SimpleQueue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="recording-writer", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Write out everything queued, then stop the thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def put(self, op: str, path: Path, data: Any) -> None:
+        self.start()
+        self._queue.put((op, path, data))
+
+    def _run(self) -> None:
+        files: dict[Path, Any] = {}
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            time.sleep(self.flush_interval)  # Let more records pile up
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            running = None not in batch
+            try:
+                self._write_batch([item for item in batch if item is not None], files)
+            except Exception as e:
+                logger.error("Recording writer failed: %s: %s", type(e).__name__, e)
+
+        for file in files.values():
+            file.close()
+
+    @staticmethod
+    def _open(path: Path) -> Any:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return open(path, "ab")
+
+    @classmethod
+    def _write_batch(cls, batch: list[tuple[str, Path, Any]], files: dict[Path, Any]) -> None:
+        pending: dict[Path, list[bytes]] = {}
+        for op, path, data in batch:
+            if op == "append":
+                pending.setdefault(path, []).append(data)
+            elif op == "meta":
+                # Write then rename, so readers never see a half-written sidecar
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(data))
+                os.replace(tmp, path)
+            elif op == "close":
+                if path in pending:
+                    if path not in files:
+                        files[path] = cls._open(path)
+                    files[path].write(b"".join(pending.pop(path)))
+                file = files.pop(path, None)
+                if file is not None:
+                    file.close()
+            elif op == "delete":
+                pending.pop(path, None)
+                file = files.pop(path, None)
+                if file is not None:
+                    file.close()
+                path.unlink(missing_ok=True)
+                path.with_suffix(".json").unlink(missing_ok=True)
+            elif op == "call":
+                # Disk work the event loop must not do, such as a retention sweep
+                try:
+                    data()
+                except Exception as e:
+                    logger.error("Recording task failed: %s: %s", type(e).__name__, e)
+
+        for path, chunks in pending.items():
+            file = files.get(path)
+            if file is None:
+                file = files[path] = cls._open(path)
+            file.write(b"".join(chunks))
+            file.flush()
+
+
+class Recording:
+    """A channel session being recorded"""
+
+    def __init__(
+            self,
+            channel_id: str,
+            writer: RecordingWriter,
+            directory: Path,
+            on_meta: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        self.id = uuid.uuid4().hex
+        self.writer = writer
+        self.on_meta = on_meta  # Told about every metadata update
+        self.path = directory / f"{self.id}.mrec"
+        self.meta_path = directory / f"{self.id}.json"
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self._last_ms = 0
+        self.frames = 0
+        self.meta: dict[str, Any] = {
+            "id": self.id,
+            "channel_id": channel_id,
+            "started_at": datetime.utcfromtimestamp(self.started_at).isoformat(),
+            "participants": [],
+            "frames": 0,
+            "duration_ms": 0,
+            "closed": False,
+        }
+        writer.put("append", self.path, HEADER.pack(MAGIC, VERSION, self.started_at))
+        self._put_meta(dict(self.meta))
+
+    def _append(self, kind: int, slot: int, payload: str, at: float | None) -> None:
+        data = payload.encode()
+        if len(data) > MAX_PAYLOAD:
+            return
+        now_ms = int(((time.monotonic() if at is None else at) - self._start) * 1000)
+        delta = min(max(0, now_ms - self._last_ms), MAX_DELTA_MS)
+        self._last_ms += delta
+        self.writer.put("append", self.path, RECORD.pack(delta, kind, slot, len(data)) + data)
+
+    def frame(self, slot: int, payload: str, at: float | None = None) -> None:
+        """Record a relayed frame; `at` is its time.monotonic() arrival stamp"""
+        self._append(FRAME, slot, payload, at)
+        self.frames += 1
+
+    def join(self, slot: int, user: User) -> None:
+        participant = {"id": str(user.id), "callsign": user.callsign}
+        self._append(JOIN, slot, json.dumps(participant), None)
+        if participant not in self.meta["participants"]:
+            self.meta["participants"].append(participant)
+            self._write_meta()
+
+    def leave(self, slot: int, user: User) -> None:
+        self._append(LEAVE, slot, json.dumps({"id": str(user.id), "callsign": user.callsign}), None)
+
+    def close(self) -> None:
+        self.meta["closed"] = True
+        self._write_meta()
+        self.writer.put("close", self.path, None)
+
+    def _write_meta(self) -> None:
+        self.meta["frames"] = self.frames
+        self.meta["duration_ms"] = self._last_ms
+        self._put_meta(dict(self.meta, participants=list(self.meta["participants"])))
+
+    def _put_meta(self, meta: dict[str, Any]) -> None:
+        self.writer.put("meta", self.meta_path, meta)
+        if self.on_meta is not None:
+            self.on_meta(meta)
+
+
+class RecordingReader:
+    """Memory-mapped view of a recording file"""
+
+    def __init__(self, path: Path) -> None:
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError("Recording has no header")
+        self._map = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        magic, version, self.started_at = HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError("Not a recording")
+
+    def __iter__(self) -> Iterator[Record]:
+        offset, elapsed = HEADER.size, 0
+        end = len(self._map)
+        while offset + RECORD.size <= end:
+            delta, kind, slot, length = RECORD.unpack_from(self._map, offset)
+            start = offset + RECORD.size
+            if start + length > end:
+                break  # Record still being written
+            elapsed += delta
+            yield Record(elapsed, kind, slot, self._map[start:start + length].decode())
+            offset = start + length
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "RecordingReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class Recorder:
+    """Creates recordings, finds them again and deletes them after `retention_days`"""
+
+    def __init__(self, directory: str, flush_interval: float, retention_days: float = 0.0) -> None:
+        self.directory = Path(directory)
+        self.writer = RecordingWriter(flush_interval)
+        self.retention_days = retention_days  # 0 keeps recordings forever
+        # Metadata by recording id for `_indexed_dir`; its sidecars are read in once
+        # `_loaded`. The lock is never held over disk IO, since the event loop takes it
+        self._index: dict[str, dict[str, Any]] = {}
+        self._indexed_dir: Path | None = None
+        self._loaded = False
+        self._live: set[str] = set()  # Recordings this process has not closed yet
+        self._lock = threading.Lock()  # Routes reading the index run in the threadpool
+        self._last_prune = 0.0
+
+    def start(self, channel_id: str) -> Recording:
+        """Begin a recording; no disk IO here, it is called from the event loop"""
+        self._maybe_prune()
+        recording = Recording(channel_id, self.writer, self.directory, on_meta=self._remember)
+        with self._lock:
+            self._live.add(recording.id)
+        return recording
+
+    def flush(self) -> None:
+        """Block until everything queued so far is on disk"""
+        self.writer.stop()
+
+    def _remember(self, meta: dict[str, Any]) -> None:
+        with self._lock:
+            self._follow_directory()
+            self._index[meta["id"]] = meta
+            if meta["closed"]:
+                self._live.discard(meta["id"])
+
+    def _follow_directory(self) -> None:
+        """Start a fresh index if `directory` changed; lock held"""
+        if self._indexed_dir != self.directory:
+            self._index, self._indexed_dir, self._loaded = {}, self.directory, False
+
+    def _load(self) -> None:
+        """Read the sidecars of the current directory, once; reads disk, so never on the event loop"""
+        with self._lock:
+            self._follow_directory()
+            if self._loaded:
+                return
+            directory = self.directory
+
+        scanned: dict[str, dict[str, Any]] = {}
+        if directory.is_dir():
+            for path in directory.glob("*.json"):
+                if not RECORDING_ID.match(path.stem):
+                    continue
+                try:
+                    scanned[path.stem] = json.loads(path.read_text())
+                except (OSError, ValueError):
+                    continue
+
+        with self._lock:
+            if self._indexed_dir == directory and not self._loaded:
+                # Updates that arrived during the scan are newer than their sidecars
+                self._index = {**scanned, **self._index}
+                self._loaded = True
+
+    def metadata(self, recording_id: str) -> dict[str, Any] | None:
+        if not RECORDING_ID.match(recording_id):
+            return None
+        self._load()
+        with self._lock:
+            return self._index.get(recording_id)
+
+    def list(self) -> list[dict[str, Any]]:
+        self._load()
+        with self._lock:
+            recordings = list(self._index.values())
+        return sorted(recordings, key=lambda r: r["started_at"], reverse=True)
+
+    def prune(self, now: float | None = None) -> int:
+        """Delete recordings started more than `retention_days` ago; returns how many"""
+        if self.retention_days <= 0:
+            return 0
+        cutoff = datetime.utcfromtimestamp((time.time() if now is None else now) - self.retention_days * 86400)
+        self._load()
+        with self._lock:
+            expired = [
+                recording_id for recording_id, meta in self._index.items()
+                if recording_id not in self._live and datetime.fromisoformat(meta["started_at"]) < cutoff
+            ]
+            for recording_id in expired:
+                del self._index[recording_id]
+        for recording_id in expired:
+            self.writer.put("delete", self.directory / f"{recording_id}.mrec", None)
+        return len(expired)
+
+    def _maybe_prune(self) -> None:
+        """Queue a retention sweep on the writer thread, at most every PRUNE_INTERVAL"""
+        now = time.monotonic()
+        if self.retention_days > 0 and now - self._last_prune >= PRUNE_INTERVAL:
+            self._last_prune = now
+            self.writer.put("call", self.directory, self.prune)
+
+    def open(self, recording_id: str) -> RecordingReader:
+        if not RECORDING_ID.match(recording_id):
+            raise ValueError("Invalid recording id")
+        return RecordingReader(self.directory / f"{recording_id}.mrec")
+
+
+# Single instance for the app
+recorder = Recorder(settings.recording_dir, settings.recording_flush_interval, settings.recording_retention_days)
@@ -0,0 +1,105 @@
+# app/core/relay_log.py
+"""
+Structured logging for the relay hot path.
+
+Per-frame events are cheap to skip: the level check happens before any
+formatting, only one in `sample_every` frames is considered, and each
+channel is capped at `channel_rate` events per second. Records go through a
+QueueHandler so formatting and disk or terminal I/O happen on the listener
+thread instead of the event loop.
+"""
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from ..config import settings
+
+logger = logging.getLogger("morse.relay")
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as one JSON object per line, including `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RelayLog:
+    """Sampled, per-channel rate-limited frame events"""
+
+    def __init__(self, sample_every: int = 100, channel_rate: float = 5.0) -> None:
+        self.sample_every = max(1, sample_every)
+        self.channel_rate = channel_rate
+        self._frame_count = 0
+        # channel_id -> [tokens, last refill time]
+        self._budgets: dict[str, list[float]] = {}
+
+    def _allow(self, channel_id: str) -> bool:
+        now = time.monotonic()
+        budget = self._budgets.get(channel_id)
+        if budget is None:
+            budget = self._budgets[channel_id] = [self.channel_rate, now]
+        else:
+            budget[0] = min(self.channel_rate, budget[0] + (now - budget[1]) * self.channel_rate)
+            budget[1] = now
+
+        if budget[0] < 1:
+            return False
+        budget[0] -= 1
+        return True
+
+    def frame(self, event: str, channel_id: str, callsign: str, size: int) -> None:
+        """Log a per-frame event, subject to level, sampling and rate limit"""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+
+        self._frame_count += 1
+        if self._frame_count % self.sample_every:
+            return
+
+        if not self._allow(channel_id):
+            return
+
+        logger.debug(event, extra={"channel_id": channel_id, "callsign": callsign, "bytes": size})
+
+    def discard(self, channel_id: str) -> None:
+        """Forget a closed channel's rate-limit budget"""
+        self._budgets.pop(channel_id, None)
+
+
+def setup_relay_logging() -> QueueListener:
+    """Route relay records through a queue to a structured handler; returns the started listener"""
+    if settings.relay_log_file:
+        handler: logging.Handler = logging.FileHandler(settings.relay_log_file)
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(StructuredFormatter())
+
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(settings.relay_log_level.upper())
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+# Single instance for the app
+relay_log = RelayLog(settings.relay_log_sample_every, settings.relay_log_channel_rate)
@@ -0,0 +1,138 @@
+# app/core/resume.py
+"""
+Resumable channel connections.
+
+A client that joins with `resumable=true` gets a resume token, and every
+frame relayed to it is also kept in a FrameRing. If its socket then drops
+without a clean close, its slot is held for `resume_grace` seconds instead of
+being given up: the partner keeps keying into the ring, and a reconnect to
+/channel/resume with the token and the number of frames already received
+puts the connection back in its slot and replays what it missed.
+"""
+import asyncio
+import secrets
+from collections.abc import Awaitable, Callable
+
+from fastapi import WebSocket
+
+from ..config import settings
+from ..models import User
+from .channel import Channel
+from .connection import MorseConnection
+from .metrics import SESSION_RESUMES
+
+
+class FrameRing:
+    """
+    The last `capacity` frames relayed to a connection, numbered from 1.
+
+    The slots are allocated up front and a push only stores a reference to
+    the frame string the relay already has, so buffering costs nothing per
+    frame beyond the slot it overwrites.
+    """
+
+    __slots__ = ("frames", "seq")
+
+    def __init__(self, capacity: int) -> None:
+        self.frames: list[str] = [""] * capacity
+        self.seq = 0  # Number of the newest frame
+
+    def push(self, frame: str) -> None:
+        self.frames[self.seq % len(self.frames)] = frame
+        self.seq += 1
+
+    def since(self, seq: int) -> tuple[list[str], int]:
+        """Frames after number `seq` that are still held, and how many after it were overwritten"""
+        seq = max(0, min(seq, self.seq))
+        start = max(seq, self.seq - len(self.frames))
+        capacity = len(self.frames)
+        return [self.frames[n % capacity] for n in range(start, self.seq)], start - seq
+
+
+OnExpire = Callable[[MorseConnection, Channel], Awaitable[None]]
+
+
+class ResumeSessions:
+    """Resume tokens of live connections and the slots held for dropped ones"""
+
+    def __init__(self, grace: float, buffer_size: int) -> None:
+        self.grace = grace
+        self.buffer_size = buffer_size
+        self._connections: dict[str, MorseConnection] = {}  # token -> connection
+        # token -> (channel, expiry, on_expire)
+        self._held: dict[str, tuple[Channel, asyncio.TimerHandle, OnExpire]] = {}
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    def issue(self, connection: MorseConnection) -> str:
+        """Make `connection` resumable and return its token"""
+        token = secrets.token_urlsafe(16)
+        connection.resume_token = token
+        connection.ring = FrameRing(self.buffer_size)
+        self._connections[token] = connection
+        return token
+
+    def discard(self, connection: MorseConnection) -> None:
+        """Forget a connection that has left for good"""
+        token = connection.resume_token
+        if token is None:
+            return
+        self._connections.pop(token, None)
+        held = self._held.pop(token, None)
+        if held is not None:
+            held[1].cancel()
+
+    def hold(self, connection: MorseConnection, channel: Channel, on_expire: OnExpire) -> bool:
+        """
+        Keep a dropped connection's slot for the grace period.
+
+        Returns False if it cannot be resumed, in which case the caller cleans
+        up as usual. Otherwise `on_expire` does that once the grace runs out.
+        """
+        token = connection.resume_token
+        if token is None or token not in self._connections or self.grace <= 0 or connection not in channel:
+            return False
+
+        connection.suspended = True
+        handle = asyncio.get_running_loop().call_later(self.grace, self._expire, token, on_expire)
+        self._held[token] = (channel, handle, on_expire)
+        return True
+
+    def expire_all(self) -> None:
+        """Give up every held slot now, as if its grace had run out"""
+        for token, (_, handle, on_expire) in list(self._held.items()):
+            handle.cancel()
+            self._expire(token, on_expire)
+
+    def _expire(self, token: str, on_expire: OnExpire) -> None:
+        held = self._held.pop(token, None)
+        connection = self._connections.pop(token, None)
+        if held is None or connection is None:
+            return
+        SESSION_RESUMES.inc(labels=("expired",))
+        task = asyncio.ensure_future(on_expire(connection, held[0]))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def can_resume(self, token: str, user: User) -> bool:
+        connection = self._connections.get(token)
+        return token in self._held and connection is not None and connection.user.id == user.id
+
+    def resume(self, token: str, user: User, websocket: WebSocket) -> tuple[MorseConnection, Channel] | None:
+        """
+        Move a held connection onto its new socket.
+
+        It stays suspended, so new frames keep going to the ring until the
+        caller has replayed them and clears `suspended`.
+        """
+        if not self.can_resume(token, user):
+            return None
+        channel, handle, _ = self._held.pop(token)
+        handle.cancel()
+        connection = self._connections[token]
+        connection.websocket = websocket
+        SESSION_RESUMES.inc(labels=("resumed",))
+        return connection, channel
+
+
+# Single instance for the app
+resumer = ResumeSessions(settings.resume_grace, settings.resume_buffer_size)
@@ -0,0 +1,221 @@
+# app/core/scoring.py
+"""
+Copy-accuracy scoring.
+
+The expected and copied texts are aligned with a banded edit distance
+(Ukkonen): only cells within `band` of the diagonal are computed, and the band
+doubles until the distance fits inside it. For copy practice the distance is
+small compared to the text length, so this is O(n * d) instead of O(n * m).
+
+Once the band would be as wide as the matrix, banding saves nothing, so
+unrelated texts fall back to the full matrix, keeping two rows of distances
+and one byte per cell for the traceback. The work is never more than about
+three full matrices, and the request model caps the text lengths.
+"""
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Literal, NamedTuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+from ..models import PracticeStats
+
+Op = Literal["match", "sub", "del", "ins"]
+
+_INF = 1 << 30
+
+# Start narrow; most copies are close to the drill
+INITIAL_BAND = 8
+
+# Traceback moves of the full-matrix fallback
+_DIAG, _UP, _LEFT = 0, 1, 2
+
+
+class Edit(NamedTuple):
+    op: Op
+    expected: str  # "" for insertions
+    actual: str  # "" for deletions
+
+
+class Score(NamedTuple):
+    distance: int
+    length: int  # Expected characters
+    edits: list[Edit]
+
+    @property
+    def accuracy(self) -> float:
+        if not self.length:
+            return 1.0 if not self.distance else 0.0
+        return max(0.0, 1 - self.distance / self.length)
+
+    def char_stats(self) -> dict[str, list[int]]:
+        """Expected character -> [times expected, times missed or miscopied]; spaces are left out"""
+        stats: dict[str, list[int]] = {}
+        for edit in self.edits:
+            if edit.op == "ins" or edit.expected == " ":
+                continue
+            entry = stats.setdefault(edit.expected, [0, 0])
+            entry[0] += 1
+            if edit.op != "match":
+                entry[1] += 1
+        return stats
+
+    @property
+    def insertions(self) -> int:
+        return sum(1 for edit in self.edits if edit.op == "ins")
+
+    def confusions(self) -> Counter[tuple[str, str]]:
+        """(expected, copied) pairs of substitutions"""
+        return Counter((e.expected, e.actual) for e in self.edits if e.op == "sub")
+
+
+def _banded_rows(a: str, b: str, band: int) -> list[list[int]] | None:
+    """
+    DP rows restricted to |i - j| <= band, or None if the distance exceeds it.
+
+    Row i holds D[i][j] at index j - i + band.
+    """
+    n, m = len(a), len(b)
+    if abs(n - m) > band:
+        return None
+
+    width = 2 * band + 1
+    first = [_INF] * width
+    for j in range(min(m, band) + 1):
+        first[j + band] = j
+    rows = [first]
+
+    for i in range(1, n + 1):
+        prev = rows[-1]
+        row = [_INF] * width
+        char = a[i - 1]
+        for j in range(max(0, i - band), min(m, i + band) + 1):
+            k = j - i + band
+            if j == 0:
+                row[k] = i
+                continue
+            best = prev[k] + (char != b[j - 1])  # Diagonal: match or substitution
+            if k + 1 < width and prev[k + 1] + 1 < best:  # Up: expected char missed
+                best = prev[k + 1] + 1
+            if k > 0 and row[k - 1] + 1 < best:  # Left: extra copied char
+                best = row[k - 1] + 1
+            row[k] = best
+        rows.append(row)
+
+    if rows[n][m - n + band] > band:
+        return None
+    return rows
+
+
+def _backtrace(a: str, b: str, rows: list[list[int]], band: int) -> list[Edit]:
+    edits: list[Edit] = []
+    i, j = len(a), len(b)
+    while i or j:
+        k = j - i + band
+        current = rows[i][k]
+        if i and j and rows[i - 1][k] + (a[i - 1] != b[j - 1]) == current:
+            edits.append(Edit("match" if a[i - 1] == b[j - 1] else "sub", a[i - 1], b[j - 1]))
+            i, j = i - 1, j - 1
+        elif i and k + 1 < len(rows[i - 1]) and rows[i - 1][k + 1] + 1 == current:
+            edits.append(Edit("del", a[i - 1], ""))
+            i -= 1
+        else:
+            edits.append(Edit("ins", "", b[j - 1]))
+            j -= 1
+    edits.reverse()
+    return edits
+
+
+def _full_alignment(a: str, b: str) -> tuple[int, list[Edit]]:
+    """Distance and edits over the whole matrix, storing one move byte per cell instead of the rows"""
+    n, m = len(a), len(b)
+    width = m + 1
+    moves = bytearray(width * (n + 1))
+    moves[1:width] = bytes([_LEFT]) * m
+    prev = list(range(width))
+
+    for i in range(1, n + 1):
+        row = [i] + [0] * m
+        base = i * width
+        moves[base] = _UP
+        char = a[i - 1]
+        for j in range(1, width):
+            best, move = prev[j - 1] + (char != b[j - 1]), _DIAG
+            if prev[j] + 1 < best:
+                best, move = prev[j] + 1, _UP
+            if row[j - 1] + 1 < best:
+                best, move = row[j - 1] + 1, _LEFT
+            row[j] = best
+            moves[base + j] = move
+        prev = row
+
+    edits: list[Edit] = []
+    i, j = n, m
+    while i or j:
+        move = moves[i * width + j]
+        if move == _DIAG:
+            edits.append(Edit("match" if a[i - 1] == b[j - 1] else "sub", a[i - 1], b[j - 1]))
+            i, j = i - 1, j - 1
+        elif move == _UP:
+            edits.append(Edit("del", a[i - 1], ""))
+            i -= 1
+        else:
+            edits.append(Edit("ins", "", b[j - 1]))
+            j -= 1
+    edits.reverse()
+    return prev[m], edits
+
+
+def align(expected: str, actual: str, band: int = INITIAL_BAND) -> Score:
+    """Align `actual` against `expected` with the smallest band that holds the distance"""
+    band = max(band, abs(len(expected) - len(actual)), 1)
+    # A band at least as wide as the matrix computes every cell anyway
+    while 2 * band < max(len(expected), len(actual)):
+        rows = _banded_rows(expected, actual, band)
+        if rows is not None:
+            distance = rows[len(expected)][len(actual) - len(expected) + band]
+            return Score(distance, len(expected), _backtrace(expected, actual, rows, band))
+        band *= 2
+
+    distance, edits = _full_alignment(expected, actual)
+    return Score(distance, len(expected), edits)
+
+
+def normalize(text: str) -> str:
+    """Upper-case and collapse whitespace, so only copying errors count"""
+    return " ".join(text.upper().split())
+
+
+def record_score(session: Session, user_id: uuid.UUID, score: Score) -> PracticeStats:
+    """Fold a score into the user's aggregate row"""
+    try:
+        return _fold_score(session, user_id, score)
+    except IntegrityError:
+        # A concurrent first score inserted the row; lock that one and fold into it
+        session.rollback()
+        return _fold_score(session, user_id, score)
+
+
+def _fold_score(session: Session, user_id: uuid.UUID, score: Score) -> PracticeStats:
+    stats = session.get(PracticeStats, user_id, with_for_update=True)
+    if stats is None:
+        stats = PracticeStats(user_id=user_id)
+
+    per_char = {char: list(counts) for char, counts in stats.per_char.items()}
+    for char, (total, errors) in score.char_stats().items():
+        entry = per_char.setdefault(char, [0, 0])
+        entry[0] += total
+        entry[1] += errors
+
+    stats.drills += 1
+    stats.chars += score.length
+    stats.errors += score.distance - score.insertions
+    stats.insertions += score.insertions
+    stats.per_char = per_char  # Reassigned so the JSON column is flagged dirty
+    stats.updated_at = datetime.utcnow()
+
+    session.add(stats)
+    session.commit()
+    return stats
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 import jwt
 
 from ..config import settings
+from .metrics import BCRYPT_LATENCY
 
 # Create password context
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -17,12 +18,14 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    return pwd_context.hash(password)
+    with BCRYPT_LATENCY.time(("hash",)):
+        return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    with BCRYPT_LATENCY.time(("verify",)):
+        return pwd_context.verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict) -> str:
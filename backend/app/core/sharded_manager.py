@@ -0,0 +1,310 @@
+# app/core/sharded_manager.py
+"""
+ConnectionManager split into shards, for handling channels from several
+threads, such as one event loop per core, in one process.
+
+Channels are spread over the shards by a hash of the channel ID, and users
+by a hash of the user ID. Each shard has its own lock, so joins and leaves
+in different channels rarely wait on each other. An operation on a user and
+a channel takes both shard locks in shard order, so two of them cannot
+deadlock. Queries over everything (`active_users`, `get_all_channels`,
+iterating `channels`) merge snapshots of the shards, each taken under its
+own lock: every shard is consistent, the merge is not one point in time.
+
+On a single event loop nothing contends, and the plain ConnectionManager
+is cheaper; BACKEND_CONNECTION_SHARDS above 1 selects this one.
+"""
+import random
+import threading
+import uuid
+import zlib
+from collections.abc import ItemsView, Iterable, Iterator, Mapping, ValuesView
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Any
+
+from pydantic import ValidationError
+
+from ..models import ChannelPublic, User
+from .channel import Channel
+from .channel_ids import ChannelIdAllocator
+from .connection import MorseConnection
+from .connection_manager import (
+    ActiveUsers,
+    ChannelFull,
+    ChannelReserved,
+    Reservation,
+    UserAlreadyActive,
+    UserId,
+    channel_closed,
+)
+
+
+class Shard:
+    __slots__ = ("index", "lock", "channels", "user_channels", "user_connections", "reserved", "version")
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+        self.lock = threading.Lock()
+        self.channels: dict[str, Channel] = {}  # Channels hashed to this shard
+        self.user_channels: dict[str, str] = {}  # Users hashed to this shard: user_id -> channel_id
+        self.user_connections: dict[str, MorseConnection] = {}  # The same users: user_id -> connection
+        self.version = 0  # Bumped whenever one of its users joins or leaves a channel
+        self.reserved: dict[str, Reservation] = {}  # channel_id -> reservation
+
+
+class ShardedChannels(Mapping[str, Channel]):
+    """Read-only view of the channels of every shard, for code written against `manager.channels`"""
+
+    def __init__(self, manager: "ShardedConnectionManager") -> None:
+        self._manager = manager
+
+    def __getitem__(self, channel_id: str) -> Channel:
+        shard = self._manager.channel_shard(channel_id)
+        with shard.lock:
+            return shard.channels[channel_id]
+
+    def __contains__(self, channel_id: object) -> bool:
+        if not isinstance(channel_id, str):
+            return False
+        shard = self._manager.channel_shard(channel_id)
+        with shard.lock:
+            return channel_id in shard.channels
+
+    def __len__(self) -> int:
+        return sum(len(shard.channels) for shard in self._manager.shards)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.snapshot())
+
+    def snapshot(self) -> dict[str, Channel]:
+        """Every shard's channels, each copied under its own lock"""
+        merged: dict[str, Channel] = {}
+        for shard in self._manager.shards:
+            with shard.lock:
+                merged.update(shard.channels)
+        return merged
+
+    # Views over one snapshot, so iterating them takes each shard lock once, not once per key
+    def items(self) -> ItemsView[str, Channel]:
+        return self.snapshot().items()
+
+    def values(self) -> ValuesView[Channel]:
+        return self.snapshot().values()
+
+
+class ShardedConnectionManager:
+    """Same interface as ConnectionManager, with channels and users partitioned over locked shards"""
+
+    def __init__(self, shards: int) -> None:
+        if shards < 1:
+            raise ValueError("Need at least one shard")
+        self.shards = [Shard(index) for index in range(shards)]
+        self.channels = ShardedChannels(self)
+        # Random IDs come from one allocator; its lock is only ever taken last
+        self._ids = ChannelIdAllocator()
+        self._ids_lock = threading.Lock()
+        self._snapshot = ActiveUsers(0, MappingProxyType({}))
+
+    def channel_shard(self, channel_id: str) -> Shard:
+        return self.shards[zlib.crc32(channel_id.encode()) % len(self.shards)]
+
+    def user_shard(self, user_id: uuid.UUID | str) -> Shard:
+        return self.shards[zlib.crc32(str(user_id).encode()) % len(self.shards)]
+
+    @contextmanager
+    def _locked(self, first: Shard, second: Shard) -> Iterator[None]:
+        """Hold the locks of both shards, taken in shard order"""
+        if first is second:
+            with first.lock:
+                yield
+            return
+        low, high = sorted((first, second), key=lambda shard: shard.index)
+        with low.lock, high.lock:
+            yield
+
+    @property
+    def version(self) -> int:
+        """Sum of the shard versions, so it grows whenever any of them does"""
+        return sum(shard.version for shard in self.shards)
+
+    @property
+    def active_users(self) -> list[User]:
+        """Returns a list of all currently connected users."""
+        users: list[User] = []
+        for shard in self.shards:
+            with shard.lock:
+                users.extend(connection.user for connection in shard.user_connections.values())
+        return users
+
+    def filter_active(self, user_ids: Iterable[UserId]) -> dict[UserId, Channel]:
+        """The given users who are in a channel, with their channel; O(len(user_ids))"""
+        active = {}
+        for user_id in user_ids:
+            channel = self.get_user_channel(user_id)
+            if channel is not None:
+                active[user_id] = channel
+        return active
+
+    def snapshot(self) -> ActiveUsers:
+        """Who is in which channel, rebuilt at most once per version; see ConnectionManager.snapshot"""
+        version = self.version
+        if self._snapshot.version != version:
+            channels = {}
+            for shard in self.shards:
+                with shard.lock:
+                    channels.update(shard.user_channels)
+            self._snapshot = ActiveUsers(version, MappingProxyType(channels))
+        return self._snapshot
+
+    def clear(self) -> None:
+        """Forget every channel, user and reservation"""
+        for shard in self.shards:
+            with shard.lock:
+                shard.channels.clear()
+                shard.user_channels.clear()
+                shard.user_connections.clear()
+                shard.reserved.clear()
+                shard.version += 1
+        with self._ids_lock:
+            self._ids.clear()
+
+    def get_user_channel(self, user_id: uuid.UUID | str) -> Channel | None:
+        """Get the channel a user is currently in"""
+        user_id = str(user_id)
+        shard = self.user_shard(user_id)
+        with shard.lock:
+            channel_id = shard.user_channels.get(user_id)
+        if channel_id is None:
+            return None
+        return self.channels.get(channel_id)
+
+    def is_user_active(self, user_id: uuid.UUID | str) -> bool:
+        """Check if a user is already in any channel."""
+        user_id = str(user_id)
+        shard = self.user_shard(user_id)
+        with shard.lock:
+            return user_id in shard.user_channels
+
+    def connect(self, connection: MorseConnection, channel_id: str) -> Channel:
+        """Handles a new user connecting to a channel."""
+        try:
+            Channel(channel_id=channel_id, user_connections=[])
+        except ValidationError:
+            raise ValueError("Channel ID must be a 6-digit number string")
+
+        user_id = str(connection.user.id)
+        users, channels = self.user_shard(user_id), self.channel_shard(channel_id)
+        with self._locked(users, channels):
+            if user_id in users.user_channels:
+                self._release_unused(channels, channel_id)
+                raise UserAlreadyActive(f"User {connection.user.callsign} is already in a channel")
+
+            reservation = channels.reserved.get(channel_id)
+            if reservation is not None and user_id not in reservation.user_ids:
+                raise ChannelReserved("Channel is reserved")
+
+            channel = channels.channels.get(channel_id)
+            if channel is None:
+                channel = channels.channels[channel_id] = Channel(channel_id=channel_id)
+                with self._ids_lock:
+                    self._ids.claim(channel_id)
+
+            if channel.is_full:
+                raise ChannelFull("Channel is full")
+
+            channel.add_user(connection)
+            users.user_channels[user_id] = channel_id
+            users.user_connections[user_id] = connection
+            users.version += 1
+        return channel
+
+    def disconnect(self, connection: MorseConnection, channel_id: str) -> bool:
+        """Handles a user disconnecting; False if the connection had already been removed"""
+        user_id = str(connection.user.id)
+        users, channels = self.user_shard(user_id), self.channel_shard(channel_id)
+        with self._locked(users, channels):
+            channel = channels.channels.get(channel_id)
+            if channel is None or connection not in channel:
+                return False
+
+            channel.remove_user(connection)
+            users.user_channels.pop(user_id, None)
+            users.user_connections.pop(user_id, None)
+            users.version += 1
+
+            closed = channel.user_count == 0
+            if closed:
+                del channels.channels[channel_id]
+                channels.reserved.pop(channel_id, None)
+                with self._ids_lock:
+                    self._ids.release(channel_id)
+
+        if closed:
+            channel_closed(channel)
+        return True
+
+    def reserve(self, channel_id: str, user_ids: list[uuid.UUID | str], owner: str | None = None) -> None:
+        """Only let these users into the channel, until it closes or is released"""
+        shard = self.channel_shard(channel_id)
+        with shard.lock:
+            shard.reserved[channel_id] = Reservation(frozenset(str(user_id) for user_id in user_ids), owner)
+
+    def release(self, channel_id: str, owner: str | None = None) -> None:
+        """Drop the reservation of a channel nobody has opened; see ConnectionManager.release"""
+        shard = self.channel_shard(channel_id)
+        with shard.lock:
+            if owner is not None:
+                reservation = shard.reserved.get(channel_id)
+                if reservation is None or reservation.owner != owner:
+                    return
+            if channel_id not in shard.channels:
+                shard.reserved.pop(channel_id, None)
+                with self._ids_lock:
+                    self._ids.release(channel_id)
+
+    def is_reserved(self, channel_id: str) -> bool:
+        shard = self.channel_shard(channel_id)
+        with shard.lock:
+            return channel_id in shard.reserved
+
+    def _release_unused(self, shard: Shard, channel_id: str) -> None:
+        """Give back an ID from create_random_channel that will not be opened; shard lock held"""
+        if channel_id not in shard.channels and channel_id not in shard.reserved:
+            with self._ids_lock:
+                self._ids.release(channel_id)
+
+    def find_random_waiting_channel(self) -> str | None:
+        """Find a random channel with exactly one user waiting, trying the shards in random order"""
+        for shard in random.sample(self.shards, len(self.shards)):
+            with shard.lock:
+                waiting_channels = [
+                    channel_id for channel_id, channel in shard.channels.items()
+                    if channel.user_count == 1 and channel_id not in shard.reserved
+                ]
+            if waiting_channels:
+                return random.choice(waiting_channels)
+        return None
+
+    def create_random_channel(self) -> str:
+        """Pick a random unused 6-digit ID for a new channel, held until the channel closes or is released"""
+        with self._ids_lock:
+            return self._ids.allocate()
+
+    async def broadcast_to_channel(self, message: dict[str, Any], channel_id: str) -> None:
+        """Sends a message to both users in a channel."""
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            raise ValueError("Channel does not exist")
+        await channel.broadcast(message)
+
+    async def relay_message(self, message: str, sender: MorseConnection, channel_id: str) -> None:
+        """Relays a morse message to the other user."""
+        channel = self.channels.get(channel_id)
+        if channel is None:
+            raise ValueError("Channel does not exist")
+        await channel.relay_message(message, sender)
+
+    def get_all_channels(self) -> list[ChannelPublic]:
+        """Get all active channels as public models"""
+        return [channel.to_public() for channel in self.channels.values()]
@@ -0,0 +1,149 @@
+# app/core/timing.py
+import math
+from collections import deque
+
+from . import morse
+
+# Frames from the frontend classify the element already; "•" is its dot
+DOT_SIGNALS = frozenset({".", "•", "·", "dot"})
+DASH_SIGNALS = frozenset({"-", "–", "—", "dash"})
+SPACE_SIGNAL = " "
+
+# Assumed speed until the first timed mark arrives
+DEFAULT_WPM = 15
+
+# Codes longer than this cannot be a character, so the buffer stops growing
+MAX_SYMBOL_LENGTH = 8
+
+# Marks shorter than a dit at 120 WPM, or than this fraction of the unit once
+# it has been measured, are key bounce and ignored. A real dit is still about a
+# third of a unit estimated from dahs, so the reclassification below survives
+MIN_MARK_MS = morse.unit_from_wpm(120)
+GLITCH_RATIO = 0.2
+
+# Dit/dah and gap decision points, halfway between nominal lengths in log space
+_DAH_RATIO = math.sqrt(morse.DIT * morse.DAH)
+_LETTER_RATIO = math.sqrt(morse.ELEMENT_GAP * morse.LETTER_GAP)
+_WORD_RATIO = math.sqrt(morse.LETTER_GAP * morse.WORD_GAP)
+
+
+class TimingAnalyzer:
+    """
+    Streaming dit/dah/gap classifier for one sender.
+
+    Keeps an exponential moving estimate of the unit (dit) length: every mark
+    classified as a dit pulls the estimate towards its duration and every dah
+    towards a third of its duration. Marks far shorter than any dit are
+    dropped as key bounce, so one glitch cannot reset the estimate. Each event
+    is O(1) and memory is bounded by the symbol buffer and the transcript size.
+    """
+
+    __slots__ = ("alpha", "unit", "marks", "_symbol", "_last_key_up", "_after_word", "transcript")
+
+    def __init__(self, alpha: float = 0.2, wpm: float = DEFAULT_WPM, transcript_size: int = 512) -> None:
+        self.alpha = alpha
+        self.unit = morse.unit_from_wpm(wpm)  # Milliseconds
+        self.marks = 0  # Timed marks seen so far
+        self._symbol = ""
+        self._last_key_up: float | None = None
+        self._after_word = True
+        self.transcript: deque[str] = deque(maxlen=transcript_size)
+
+    @property
+    def wpm(self) -> float | None:
+        return morse.wpm_from_unit(self.unit) if self.marks else None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.transcript)
+
+    def is_glitch(self, duration: float) -> bool:
+        """Whether a key-down duration (ms) is too short to be a dit"""
+        return duration < MIN_MARK_MS or (self.marks > 0 and duration < self.unit * GLITCH_RATIO)
+
+    def mark(self, duration: float) -> str:
+        """
+        Classify a key-down duration (ms) as '.' or '-' and update the unit
+        estimate; a glitch is ignored and gives ''
+        """
+        if self.is_glitch(duration):
+            return ""
+        if duration < self.unit / _DAH_RATIO:
+            # Much shorter than a dit: the estimate was built from dahs
+            self._symbol = self._symbol.replace(".", "-")
+            element, self.unit = ".", duration
+        elif duration < self.unit * _DAH_RATIO:
+            element = "."
+            self.unit = self._update(duration)
+        else:
+            element = "-"
+            self.unit = self._update(duration / morse.DAH)
+
+        self.marks += 1
+        self._push(element)
+        return element
+
+    def space(self, duration: float) -> str:
+        """Classify a key-up duration (ms); returns any characters it completes"""
+        if duration < self.unit * _LETTER_RATIO:
+            return ""
+        if duration < self.unit * _WORD_RATIO:
+            return self.end_letter()
+        return self.end_letter() + self.end_word()
+
+    def end_letter(self) -> str:
+        """Decode the buffered elements as one character"""
+        if not self._symbol:
+            return ""
+        char = morse.decode_char(self._symbol) if len(self._symbol) <= MAX_SYMBOL_LENGTH else morse.UNKNOWN_CHAR
+        self._symbol = ""
+        self._after_word = False
+        self.transcript.append(char)
+        return char
+
+    def end_word(self) -> str:
+        if self._after_word:
+            return ""
+        self._after_word = True
+        self.transcript.append(" ")
+        return " "
+
+    def observe(self, signal: object, duration: object, now: float) -> str:
+        """
+        Feed one relayed frame; returns the characters it completes.
+
+        `now` is the frame's arrival time from time.monotonic(). When the client
+        sends the key-down `duration` (ms) the element is classified here and
+        the gap since the previous key-up is derived from arrival times;
+        otherwise the client's own dot/dash classification is used.
+        """
+        if signal == SPACE_SIGNAL:
+            # A space after a letter ends it, a second one ends the word
+            return self.end_letter() if self._symbol else self.end_word()
+
+        if signal not in DOT_SIGNALS and signal not in DASH_SIGNALS:
+            return ""
+
+        decoded = ""
+        if isinstance(duration, (int, float)) and duration > 0:
+            if self.is_glitch(duration):
+                return ""  # Key bounce: the gap runs on to the next real mark
+            if self._last_key_up is not None:
+                gap = (now - self._last_key_up) * 1000 - duration
+                decoded = self.space(gap)
+            self.mark(duration)
+        else:
+            self._push("." if signal in DOT_SIGNALS else "-")
+
+        self._last_key_up = now
+        return decoded
+
+    def _update(self, units: float) -> float:
+        # The first mark replaces the assumed speed outright
+        if not self.marks:
+            return units
+        return self.unit + self.alpha * (units - self.unit)
+
+    def _push(self, element: str) -> None:
+        if len(self._symbol) <= MAX_SYMBOL_LENGTH:
+            self._symbol += element
@@ -0,0 +1,68 @@
+# app/core/tracing.py
+import random
+from collections import deque
+
+from ..config import settings
+from ..models import RelayTraceStats
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    index = min(len(ordered) - 1, int(fraction * len(ordered)))
+    return ordered[index]
+
+
+class RelayTracer:
+    """
+    Samples time spent by frames inside the server, per channel.
+
+    A sampled frame is stamped with its monotonic receive and send times and
+    the difference goes into a fixed-size rolling window for its channel, so
+    memory stays bounded and percentiles are only computed when read.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, window: int = 1024) -> None:
+        self.sample_rate = sample_rate
+        self.window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def should_sample(self) -> bool:
+        """Decide whether to trace the next frame"""
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record(self, channel_id: str, received_at: float, sent_at: float) -> None:
+        samples = self._samples.get(channel_id)
+        if samples is None:
+            samples = self._samples[channel_id] = deque(maxlen=self.window)
+        samples.append(sent_at - received_at)
+
+    def discard(self, channel_id: str) -> None:
+        """Forget a channel's samples once it is closed"""
+        self._samples.pop(channel_id, None)
+
+    def clear(self) -> None:
+        self._samples.clear()
+
+    def stats(self) -> list[RelayTraceStats]:
+        """Rolling latency percentiles for every traced channel"""
+        result: list[RelayTraceStats] = []
+        for channel_id, samples in self._samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            result.append(RelayTraceStats(
+                channel_id=channel_id,
+                samples=len(ordered),
+                p50_ms=_percentile(ordered, 0.50) * 1000,
+                p90_ms=_percentile(ordered, 0.90) * 1000,
+                p99_ms=_percentile(ordered, 0.99) * 1000,
+                max_ms=ordered[-1] * 1000,
+            ))
+        return result
+
+
+# Single instance for the app
+tracer = RelayTracer(settings.relay_trace_sample_rate, settings.relay_trace_window)
@@ -1,22 +1,96 @@
-from typing import Generator
+import hashlib
+from functools import cache
+from typing import TYPE_CHECKING, Generator
 
-from sqlmodel import SQLModel, create_engine
+from sqlalchemy import Column, MetaData, String, Table, delete, inspect, insert
+from sqlalchemy.engine import Engine
+from sqlmodel import SQLModel, create_engine, select
 from sqlmodel import Session
 
+from . import migrations
 from .config import settings  # type: ignore
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=True,  # Set to False in production
-    pool_pre_ping=True,  # Verify connections before use
-)
+if TYPE_CHECKING:
+    from .models import User
+
+# Fingerprint of the models the tables were last created from. Kept out of
+# SQLModel.metadata so that it is not part of its own fingerprint.
+_marker_metadata = MetaData()
+schema_version = Table("schema_version", _marker_metadata, Column("fingerprint", String(64), nullable=False))
+
+
+@cache
+def get_engine() -> Engine:
+    """
+    The database engine, created on first use.
+
+    Creating it loads the database driver, so importing the app (tests, the
+    CLI, a worker that is about to fork) does not pay for that.
+    """
+    return create_engine(
+        settings.database_url,
+        echo=True,  # Set to False in production
+        pool_pre_ping=True,  # Verify connections before use
+    )
+
 
 def create_db_and_tables() -> None:
     """Create all database tables"""
+    SQLModel.metadata.create_all(get_engine())
+
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column, type and index the models declare, and of the newest migration"""
+    parts = [f"migration {migrations.head()}"]
+    for table in SQLModel.metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        parts.extend(f"column {column.name} {column.type!r} {column.nullable}" for column in table.columns)
+        parts.extend(sorted(f"index {index.name}" for index in table.indexes))
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def ensure_schema(engine: Engine, force: bool = False) -> bool:
+    """
+    Create missing tables and apply pending migrations, unless the stored
+    fingerprint says the database already matches the models and
+    migrations, so a normal start costs one query instead of a lookup per
+    table. Returns True if the schema was checked and brought up to date.
+    """
+    fingerprint = schema_fingerprint()
+    if not force and inspect(engine).has_table(schema_version.name):
+        with engine.connect() as connection:
+            if connection.execute(schema_version.select()).scalar() == fingerprint:
+                return False
+
     SQLModel.metadata.create_all(engine)
+    migrations.upgrade(engine)
+    _marker_metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(delete(schema_version))
+        connection.execute(insert(schema_version).values(fingerprint=fingerprint))
+    return True
+
+
+def create_admin(engine: Engine, password: str) -> "User | None":
+    """Create the admin account; returns None if it already exists"""
+    # Imported here so that only the callers that need bcrypt load it
+    from .core.security import hash_password
+    from .models import User
+
+    with Session(engine) as session:
+        if session.exec(select(User).where(User.callsign == "admin")).first() is not None:
+            return None
+
+        admin_user = User(callsign="admin", hashed_password=hash_password(password))
+        session.add(admin_user)
+        session.commit()
+        session.refresh(admin_user)
+        return admin_user
+
 
 def get_db_session() -> Generator[Session, None, None]:
     """Get database session for dependency injection"""
-    with Session(engine) as session:
-        yield session
\ No newline at end of file
+    # Keep loaded attributes after commit so long-lived handlers (WebSockets)
+    # don't lazily reopen a transaction and pin a pooled connection
+    with Session(get_engine(), expire_on_commit=False) as session:
+        yield session
@@ -1,4 +1,5 @@
 # app/dep.py
+from collections.abc import Awaitable, Callable
 from typing import Annotated
 
 from fastapi import Depends
@@ -15,6 +16,12 @@ def get_current_user_dep():
     return get_current_user
 
 
+def get_current_admin_dep() -> Callable[..., Awaitable[User]]:
+    """Lazy import to avoid circular dependency"""
+    from .core.auth import get_current_admin
+    return get_current_admin
+
+
 def get_current_user_from_ws_dep():
     """Lazy import to avoid circular dependency"""
     from .core.auth import get_current_user_from_ws
@@ -23,4 +30,5 @@ def get_current_user_from_ws_dep():
 # Type aliases for cleaner code
 SessionDep = Annotated[Session, Depends(get_db_session)]
 CurrentUser = Annotated[User, Depends(get_current_user_dep())]
+AdminUser = Annotated[User, Depends(get_current_admin_dep())]
 CurrentWsUser = Annotated[User, Depends(get_current_user_from_ws_dep())]
\ No newline at end of file
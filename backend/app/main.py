@@ -1,60 +1,82 @@
 # app/main.py
+import gc
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
-from sqlmodel import Session, select
+from fastapi.responses import JSONResponse, PlainTextResponse
 from starlette.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .core.security import hash_password
-from .db import create_db_and_tables, engine
-from .models import User
+from .core.bot import stop_bots
+from .core.drain import drainer
+from .core.heartbeat import heartbeat
+from .core.invites import expire_invite, invites
+from .core.metrics import MetricsMiddleware, registry
+from .core.ratelimit import RateLimitMiddleware, auth_store
+from .core.recording import recorder
+from .core.relay_log import setup_relay_logging
+from .db import create_admin, ensure_schema, get_engine
 # Import routes
-from .routes import user, follow, login, channel
+from .routes import user, follow, login, channel, admin, morse, practice, recording, invite, presence
 
 logger = logging.getLogger("uvicorn.error")
 
 def create_default_admin():
     """Create default admin user if it doesn't exist"""
     try:
-        with Session(engine) as session:
-            # Check if admin user already exists
-            existing_admin = session.exec(select(User).where(User.callsign == "admin")).first()
-
-            if existing_admin:
-                logger.info("Admin user already exists")
-                return
-
-            # Create default admin user
-            admin_user = User(callsign="admin", hashed_password=hash_password("admin"))
-
-            session.add(admin_user)
-            session.commit()
-            session.refresh(admin_user)
-
+        admin_user = create_admin(get_engine(), "admin")
+        if admin_user is None:
+            logger.info("Admin user already exists")
+        else:
             logger.info(f"Default admin user created with ID: {admin_user.id}")
 
     except Exception as e:
         logger.error(f"Failed to create default admin user: {e}")
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup code
-    logger.info("Starting up Morse-Me Backend...")
+def prepare_database() -> None:
+    """Bring the schema up to date and, unless fast-starting, bootstrap the admin account"""
     try:
-        create_db_and_tables()
-        logger.info("Database tables created successfully!")
+        if ensure_schema(get_engine(), force=not settings.fast_start):
+            logger.info("Database tables created successfully!")
+        else:
+            logger.info("Database schema is current")
     except Exception as e:
         logger.error(f"Database error during startup: {e}")
         # App still starts, you can handle this gracefully
 
+    if settings.fast_start:
+        return  # The admin account comes from `python -m app.cli create-admin`
     create_default_admin()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Startup code
+    logger.info("Starting up Morse-Me Backend...")
+    relay_log_listener = setup_relay_logging()
+    prepare_database()
+    drainer.reset()
+    heartbeat.start()
+    invites.start(expire_invite)
+    # Everything imported and built so far lives as long as the process, so
+    # keep full collections from scanning it again (the first would land on
+    # the first request)
+    gc.freeze()
     yield  # App runs between startup and shutdown
 
     # Shutdown code
     logger.info("Shutting down Morse-Me Backend...")
+    # Under DrainingServer the drain is over by now. Plain uvicorn has already
+    # closed the sockets, so this only lets an admin drain under way finish
+    await drainer.drain(settings.drain_deadline)
+    await heartbeat.stop()
+    await invites.stop()
+    await stop_bots()
+    recorder.flush()
+    relay_log_listener.stop()
+    gc.unfreeze()
 
 app = FastAPI(
     title="Morse-Me Backend",
@@ -63,6 +85,13 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+app.add_middleware(MetricsMiddleware)
+
+# Over-limit logins and registrations are turned away before they reach the
+# database or bcrypt. Added before CORS so CORS wraps it and its 429s carry
+# the CORS headers the browser needs to read them
+app.add_middleware(RateLimitMiddleware, store=auth_store)
+
 # CORS middleware - allow frontend to connect
 app.add_middleware(
     CORSMiddleware,
@@ -77,6 +106,12 @@ app.include_router(user.router)
 app.include_router(login.router)
 app.include_router(follow.router)
 app.include_router(channel.router)
+app.include_router(admin.router)
+app.include_router(morse.router)
+app.include_router(practice.router)
+app.include_router(recording.router)
+app.include_router(invite.router)
+app.include_router(presence.router)
 
 app.include_router(follow.router)
 
@@ -86,4 +121,14 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "app": settings.app_name}
\ No newline at end of file
+    if drainer.draining:
+        # Take this worker out of the load balancer
+        return JSONResponse({"status": "draining", "app": settings.app_name}, status_code=503)
+    return {"status": "healthy", "app": settings.app_name}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint"""
+    # async so the callback gauges read the connection manager on the event loop
+    # that changes it, not from the threadpool
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
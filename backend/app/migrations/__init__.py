@@ -0,0 +1,120 @@
+# app/migrations/__init__.py
+"""
+Schema migrations.
+
+`SQLModel.metadata.create_all` only creates missing tables, so anything else
+an existing database needs, such as a new index, is a migration: a module in
+this package named `v<NNNN>_<what>.py`, with a docstring saying what it does
+and an `upgrade(connection)` function. Migrations run in order, each in its
+own transaction, and the revisions applied are kept in `schema_migrations`.
+
+Startup creates the tables of a fresh database from the models before
+migrating it, so every migration has to cope with its change already being
+there (`IF NOT EXISTS`).
+
+Several workers starting together all migrate. On PostgreSQL each migration
+transaction takes an advisory lock and checks the revision again under it;
+elsewhere a worker that loses the race hits the primary key of
+`schema_migrations` and takes the revision as applied.
+"""
+import importlib
+import pkgutil
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    insert,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("revision", String(16), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# pg_advisory_xact_lock key held while migrating ("MORSE" in ASCII)
+LOCK_KEY = 0x4D4F525345
+
+
+@dataclass(frozen=True)
+class Migration:
+    revision: str  # "0002"
+    name: str  # Module name
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def discover() -> list[Migration]:
+    """All migrations in this package, oldest first"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        if not module_info.name.startswith("v"):
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        revision = module_info.name[1:].split("_", 1)[0]
+        description = (module.__doc__ or "").strip().split("\n", 1)[0]
+        migrations.append(Migration(revision, module_info.name, description, module.upgrade))
+    return sorted(migrations, key=lambda migration: migration.revision)
+
+
+def head() -> str | None:
+    """Revision of the newest migration"""
+    migrations = discover()
+    return migrations[-1].revision if migrations else None
+
+
+def applied(engine: Engine) -> set[str]:
+    if not inspect(engine).has_table(schema_migrations.name):
+        return set()
+    with engine.connect() as connection:
+        return set(connection.execute(select(schema_migrations.c.revision)).scalars())
+
+
+def pending(engine: Engine) -> list[Migration]:
+    done = applied(engine)
+    return [migration for migration in discover() if migration.revision not in done]
+
+
+def _lock(connection: Connection) -> None:
+    """Wait for other workers migrating the same database; held until the transaction ends"""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+
+
+def _apply(engine: Engine, migration: Migration) -> bool:
+    """Apply one migration in its own transaction; False if another worker already had"""
+    try:
+        with engine.begin() as connection:
+            _lock(connection)
+            done = connection.execute(
+                select(schema_migrations.c.revision).where(schema_migrations.c.revision == migration.revision)
+            ).first()
+            if done is not None:
+                return False
+            migration.upgrade(connection)
+            connection.execute(
+                insert(schema_migrations).values(revision=migration.revision, applied_at=datetime.utcnow())
+            )
+    except IntegrityError:
+        return False  # Recorded by a concurrent upgrade between our check and insert
+    return True
+
+
+def upgrade(engine: Engine) -> list[Migration]:
+    """Apply the pending migrations; returns the ones applied"""
+    with engine.begin() as connection:
+        _lock(connection)
+        _metadata.create_all(connection)
+    return [migration for migration in pending(engine) if _apply(engine, migration)]
@@ -0,0 +1,16 @@
+# app/migrations/v0001_tables.py
+"""
+Create the tables from the models.
+
+Databases from before migrations existed already have them, and fresh ones
+get them at startup, so this only does something for `python -m app.cli
+migrate` against an empty database.
+"""
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from .. import models  # noqa: F401 - registers the tables
+
+
+def upgrade(connection: Connection) -> None:
+    SQLModel.metadata.create_all(connection)
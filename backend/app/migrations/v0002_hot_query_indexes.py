@@ -0,0 +1,22 @@
+# app/migrations/v0002_hot_query_indexes.py
+"""
+Indexes for the follower lookup, recently seen users and callsign search.
+
+- follow.followed_id: the primary key (follower_id, followed_id) cannot
+  serve "who follows this user"
+- user.last_seen: online users and the most recently seen callsigns
+- user.callsign trigrams (PostgreSQL only): `callsign LIKE '%q%'` from the
+  user search cannot use the btree index on callsign
+"""
+from sqlalchemy.engine import Connection
+
+
+def upgrade(connection: Connection) -> None:
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_follow_followed_id ON follow (followed_id)")
+    connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_user_last_seen ON "user" (last_seen)')
+
+    if connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        connection.exec_driver_sql(
+            'CREATE INDEX IF NOT EXISTS ix_user_callsign_trgm ON "user" USING gin (callsign gin_trgm_ops)'
+        )
@@ -1,9 +1,10 @@
 # app/models.py
 import uuid
 from datetime import datetime
-from typing import TYPE_CHECKING, Literal, List, Optional
+from typing import TYPE_CHECKING, Any, Literal, List, Optional
 
 from pydantic import BaseModel, computed_field
+from sqlalchemy import JSON, Column
 from sqlmodel import Field, Relationship, SQLModel
 
 # Channel Models
@@ -21,11 +22,34 @@ class ChannelsPublic(BaseModel):
     count: int
 
 
+class RelayTraceStats(BaseModel):
+    """Rolling relay latency percentiles of one channel"""
+    channel_id: str
+    samples: int
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class RelayTracePublic(BaseModel):
+    sample_rate: float
+    channels: list[RelayTraceStats]
+
+
+class DrainStatus(BaseModel):
+    """Whether this worker is draining, and who is still connected"""
+    draining: bool
+    remaining: float | None  # Seconds until the remaining connections are closed
+    connections: int
+
+
 # Follow Models
 class Follow(SQLModel, table=True):
     """Follow relationship table"""
     follower_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
-    followed_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    # Own index for the reverse lookup (followers); the primary key leads with follower_id
+    followed_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
     follower: "User" = Relationship(
@@ -55,7 +79,7 @@ class User(UserBase, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str = Field(max_length=255)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    last_seen: datetime = Field(default_factory=datetime.utcnow)
+    last_seen: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     @computed_field  # type: ignore
     @property
@@ -124,6 +148,176 @@ class UserPublicDetailed(UserPublicWithFollowers, UserPublicWithChannel):
 
 
 
+# Invite Models
+class InviteCreate(BaseModel):
+    callee_id: uuid.UUID
+
+
+class InvitePublic(BaseModel):
+    """An invite to a reserved channel; both users join it by channel_id"""
+    id: str
+    caller: "UserPublic"
+    callee_id: uuid.UUID
+    channel_id: str
+    expires_in: float  # Seconds left to answer, or to open the channel once accepted
+
+
+# Morse Models
+class MorseEncodeRequest(BaseModel):
+    text: str = Field(max_length=10_000)
+
+
+class MorseDecodeRequest(BaseModel):
+    morse: str = Field(max_length=60_000)
+
+
+class MorseTimingRequest(BaseModel):
+    """Signed durations in ms: positive is key down, negative is key up"""
+    durations: list[float] = Field(max_length=100_000)
+    wpm: float | None = Field(default=None, gt=0, le=100)
+
+
+class MorseTranslation(BaseModel):
+    text: str
+    morse: str
+
+
+class MorseTimingDecoded(MorseTranslation):
+    unit_ms: float
+    wpm: float
+
+
+# Recording Models
+class RecordingParticipant(BaseModel):
+    id: uuid.UUID
+    callsign: str
+
+
+class RecordingPublic(BaseModel):
+    id: str
+    channel_id: str
+    started_at: datetime
+    participants: list[RecordingParticipant]
+    frames: int
+    duration_ms: int
+    closed: bool
+
+
+class RecordingsPublic(BaseModel):
+    recordings: list[RecordingPublic]
+    count: int
+
+
+# Practice Models
+class PracticeLesson(BaseModel):
+    number: int
+    chars: str
+    new_char: str
+    word_count: int
+
+
+class PracticeLessons(BaseModel):
+    lessons: list[PracticeLesson]
+
+
+class PracticeDrill(BaseModel):
+    text: str
+    morse: str
+
+
+class PracticeDrillBatch(BaseModel):
+    """One page of drills; request `next_page` with the same seed to continue"""
+    lesson: int
+    kind: str
+    seed: int
+    page: int
+    next_page: int
+    wpm: float
+    farnsworth_wpm: float | None = None
+    drills: list[PracticeDrill]
+
+
+class PracticeScoreRequest(BaseModel):
+    """Expected and copied text; with format 'morse' both are decoded first"""
+    expected: str = Field(max_length=1_000)
+    actual: str = Field(max_length=1_500)
+    format: Literal["text", "morse"] = "text"
+
+
+class PracticeEdit(BaseModel):
+    op: Literal["match", "sub", "del", "ins"]
+    expected: str
+    actual: str
+
+
+class PracticeCharStats(BaseModel):
+    char: str
+    total: int
+    errors: int
+
+
+class PracticeScore(BaseModel):
+    expected: str
+    actual: str
+    distance: int
+    accuracy: float
+    edits: list[PracticeEdit]
+    chars: list[PracticeCharStats]
+
+
+class PracticeStats(SQLModel, table=True):
+    """Running copy-accuracy totals, one row per user"""
+    user_id: uuid.UUID = Field(foreign_key="user.id", primary_key=True)
+    drills: int = 0
+    chars: int = 0
+    errors: int = 0
+    insertions: int = 0
+    # Expected character -> [times expected, times missed or miscopied]
+    per_char: dict[str, list[int]] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class PracticeStatsPublic(BaseModel):
+    drills: int
+    chars: int
+    errors: int
+    insertions: int
+    accuracy: float
+    per_char: list[PracticeCharStats]
+    updated_at: datetime | None = None
+
+
+# Bulk Models
+class UserBulkCreate(BaseModel):
+    """Batch of users to register in one transaction; each row is validated on its own"""
+    users: list[dict[str, Any]] = Field(min_length=1, max_length=1000)
+
+
+class FollowPair(BaseModel):
+    follower_id: uuid.UUID
+    followed_id: uuid.UUID
+
+
+class FollowBulkCreate(BaseModel):
+    """Batch of follow edges to create in one transaction"""
+    follows: list[FollowPair] = Field(min_length=1, max_length=5000)
+    mutual: bool = False  # Also create the reverse edge of every pair
+
+
+class BulkRowResult(BaseModel):
+    """Outcome of a single row in a bulk request"""
+    index: int
+    ok: bool
+    id: uuid.UUID | None = None
+    error: str | None = None
+
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    results: list[BulkRowResult]
+
+
 # Auth Models
 class LoginRequest(BaseModel):
     callsign: str
@@ -0,0 +1,120 @@
+# app/routes/admin.py
+import uuid
+from collections.abc import Iterator
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..core.drain import connection_count, drainer
+from ..core.export import (
+    gzip_chunks,
+    iter_follows,
+    iter_users,
+    ndjson_chunks,
+    parse_follow_cursor,
+)
+from ..core.tracing import tracer
+from ..dep import AdminUser, SessionDep
+from ..models import DrainStatus, RelayTracePublic
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _ndjson_response(chunks: Iterator[bytes], compress: bool) -> StreamingResponse:
+    headers = {}
+    if compress:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(chunks, media_type=NDJSON_MEDIA_TYPE, headers=headers)
+
+
+@router.get("/export/users")
+def export_users(
+        session: SessionDep,
+        _admin: AdminUser,
+        cursor: uuid.UUID | None = Query(None, description="Resume after this user id"),
+        gzip: bool = Query(False, description="Gzip-compress the stream"),
+) -> StreamingResponse:
+    """Stream all users as NDJSON, ordered by id"""
+    return _ndjson_response(ndjson_chunks(iter_users(session, cursor)), gzip)
+
+
+@router.get("/export/follows")
+def export_follows(
+        session: SessionDep,
+        _admin: AdminUser,
+        cursor: str | None = Query(
+            None, description="Resume after this edge, as '<follower_id>:<followed_id>'"
+        ),
+        gzip: bool = Query(False, description="Gzip-compress the stream"),
+) -> StreamingResponse:
+    """Stream all follow edges as NDJSON, ordered by (follower_id, followed_id)"""
+    follow_cursor = None
+    if cursor is not None:
+        try:
+            follow_cursor = parse_follow_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="Cursor must be '<follower_id>:<followed_id>'"
+            )
+
+    return _ndjson_response(ndjson_chunks(iter_follows(session, follow_cursor)), gzip)
+
+
+# The tracer is updated by the relay on the event loop, so these read and clear
+# it there too rather than in the threadpool
+@router.get("/trace/relay", response_model=RelayTracePublic)
+async def get_relay_trace(_admin: AdminUser) -> RelayTracePublic:
+    """Rolling relay latency percentiles per channel"""
+    return RelayTracePublic(sample_rate=tracer.sample_rate, channels=tracer.stats())
+
+
+@router.put("/trace/relay", response_model=RelayTracePublic)
+async def set_relay_trace(
+        _admin: AdminUser,
+        sample_rate: float = Query(..., ge=0.0, le=1.0, description="Fraction of frames to trace"),
+) -> RelayTracePublic:
+    """Change the relay tracing sample rate at runtime (0 disables tracing)"""
+    tracer.sample_rate = sample_rate
+    if not tracer.enabled:
+        tracer.clear()
+    return RelayTracePublic(sample_rate=tracer.sample_rate, channels=tracer.stats())
+
+
+def _drain_status() -> DrainStatus:
+    return DrainStatus(draining=drainer.draining, remaining=drainer.remaining(), connections=connection_count())
+
+
+@router.get("/drain", response_model=DrainStatus)
+async def get_drain(_admin: AdminUser) -> DrainStatus:
+    """Drain state of the worker serving this request"""
+    # async so connection_count() walks the channels on the loop that changes them
+    return _drain_status()
+
+
+@router.post("/drain", response_model=DrainStatus, status_code=202)
+async def start_drain(
+        _admin: AdminUser,
+        deadline: float = Query(
+            settings.drain_deadline, ge=0.0, description="Seconds until the remaining connections are closed"
+        ),
+) -> DrainStatus:
+    """
+    Start draining this worker ahead of a deploy: new channel joins are
+    refused, connected clients are told to move, and whoever is left at the
+    deadline is disconnected. A drain already under way keeps its deadline.
+    """
+    drainer.start(deadline)
+    return _drain_status()
+
+
+@router.delete("/drain", response_model=DrainStatus)
+async def cancel_drain(_admin: AdminUser) -> DrainStatus:
+    """Stop draining and accept channel joins again; clients already told to move are not called back"""
+    await drainer.cancel()
+    return _drain_status()
@@ -1,17 +1,127 @@
 # app/routes/channel.py
 import logging
+import time
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect, status
 
+from ..config import settings
+from ..core.bot import start_bot
+from ..core.channel import Channel
+from ..core.channel_ids import ChannelIdsExhausted
 from ..core.connection import MorseConnection
-from ..core.connection_manager import ChannelFull, UserAlreadyActive, manager
+from ..core.connection_manager import (
+    ChannelFull,
+    ChannelReserved,
+    UserAlreadyActive,
+    manager,
+)
+from ..core.drain import drainer
+from ..core.heartbeat import PONG, heartbeat
+from ..core.metrics import RELAY_FLOOD_DISCONNECTS, RELAY_REJECTED
+from ..core.ratelimit import global_bucket
+from ..core.recording import recorder
+from ..core.relay_log import relay_log
+from ..core.resume import resumer
 from ..dep import CurrentUser, CurrentWsUser
-from ..models import ChannelsPublic, UserPublic
+from ..models import ChannelsPublic, User, UserPublic
 
 router = APIRouter(prefix="/channel", tags=["channels"])
 logger = logging.getLogger('uvicorn.error')
 
 
+async def relay_loop(websocket: WebSocket, channel: Channel, morse_connection: MorseConnection) -> None:
+    """Main loop to listen for morse signals and relay them to the other user"""
+    user = morse_connection.user
+    bucket = morse_connection.bucket
+    while True:
+        data = await websocket.receive_text()
+        # Stamp on arrival so relay latency includes everything after the read
+        received_at = time.monotonic()
+        morse_connection.last_seen = received_at
+
+        # uvicorn's ws_max_size refuses frames far over the limit before they are buffered
+        if len(data) > settings.relay_max_frame_size:
+            if await reject_frame(websocket, user, "too_large", status.WS_1009_MESSAGE_TOO_BIG):
+                return
+            continue
+        # The global bucket is only charged for frames the connection may send
+        if not (bucket.allow(received_at) and global_bucket.allow(received_at)):
+            if await reject_frame(websocket, user, "rate_limited", status.WS_1008_POLICY_VIOLATION):
+                return
+            continue
+        if data == PONG:
+            continue  # Only keeps the connection alive
+
+        relay_log.frame("frame received", channel.channel_id, user.callsign, len(data))
+        drainer.inflight += 1
+        try:
+            await channel.relay_message(data, morse_connection, received_at)
+        finally:
+            drainer.inflight -= 1
+
+
+async def reject_frame(websocket: WebSocket, user: User, reason: str, close_code: int) -> bool:
+    """Count a refused frame; returns True if the connection was closed for it"""
+    RELAY_REJECTED.inc(labels=(reason,))
+    if settings.relay_flood_action != "disconnect":
+        return False
+
+    logger.warning(f"Disconnecting {user.callsign}: {reason}")
+    RELAY_FLOOD_DISCONNECTS.inc()
+    await websocket.close(code=close_code, reason=f"Flood protection: {reason}")
+    return True
+
+
+async def refuse_if_draining(websocket: WebSocket, user: User) -> bool:
+    """Turn a join away while this worker drains; returns True if it was"""
+    if not drainer.draining:
+        return False
+
+    logger.info(f"Refusing {user.callsign}: server draining")
+    await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason="Server draining")
+    return True
+
+
+# Closes the client meant; anything else (1006 for a dropped network) may be resumed
+CLEAN_CLOSE_CODES = (status.WS_1000_NORMAL_CLOSURE, status.WS_1001_GOING_AWAY)
+
+
+async def end_session(morse_connection: MorseConnection, channel: Channel, dropped: bool) -> None:
+    """After the relay loop ends: hold the slot of a dropped resumable connection, or leave"""
+    heartbeat.remove(morse_connection)
+    if dropped and not drainer.draining and resumer.hold(morse_connection, channel, leave_channel):
+        user = morse_connection.user
+        logger.info(f"Holding slot of {user.callsign} in channel {channel.channel_id} for a resume")
+        user_public_dict = UserPublic(**user.model_dump()).model_dump(mode="json")
+        await channel.broadcast({"event": "user_reconnecting", "user": user_public_dict})
+        return
+    await leave_channel(morse_connection, channel)
+
+
+async def leave_channel(morse_connection: MorseConnection, channel: Channel) -> None:
+    """Remove the connection from its channel and tell the partner, unless the heartbeat already did"""
+    user = morse_connection.user
+    resumer.discard(morse_connection)
+    left = manager.disconnect(morse_connection, channel.channel_id)
+    logger.info(f"User {user.callsign} cleaned up from channel {channel.channel_id}")
+
+    # Notify remaining user that partner left
+    if left and channel.user_count > 0:  # Only broadcast if there are remaining users
+        user_public_dict = UserPublic(**user.model_dump()).model_dump(mode="json")
+        await channel.broadcast(
+            {"event": "user_left", "user": user_public_dict}
+        )
+
+
+async def start_recording(channel: Channel) -> None:
+    """Record the channel from now on, unless it already is, and tell both users"""
+    if channel.recording is not None:
+        return
+    recording = recorder.start(channel.channel_id)
+    channel.start_recording(recording)
+    await channel.broadcast({"event": "recording_started", "recording_id": recording.id})
+
+
 @router.get("/list", response_model=ChannelsPublic)
 async def list_channels(current_user: CurrentUser):
     """Get all active channels"""
@@ -22,14 +132,28 @@ async def list_channels(current_user: CurrentUser):
 @router.websocket("/random")
 async def join_random_channel(
         websocket: WebSocket,
-        user: CurrentWsUser
+        user: CurrentWsUser,
+        bot: bool = Query(False, description="Practice with a bot if nobody is waiting"),
+        record: bool = Query(False, description="Record the session for replay"),
+        resumable: bool = Query(False, description="Issue a resume token, and hold the slot if the connection drops")
 ):
     """Join a random channel with someone waiting, or create a new one"""
     if user is None:
         return
+    if await refuse_if_draining(websocket, user):
+        return
 
     # Find a channel with someone waiting or create new
-    channel_id = manager.find_random_waiting_channel() or manager.create_random_channel()
+    waiting_channel_id = manager.find_random_waiting_channel()
+    try:
+        channel_id = waiting_channel_id or manager.create_random_channel()
+    except ChannelIdsExhausted:
+        logger.error("No channel IDs left for a random channel")
+        await websocket.close(
+            code=status.WS_1013_TRY_AGAIN_LATER,
+            reason="No channels available"
+        )
+        return
     logger.info(f"User {user.callsign} joining random channel: {channel_id}")
 
     # Now join that channel using the main join_channel logic
@@ -63,28 +187,43 @@ async def join_random_channel(
         )
         return
 
+    except ChannelReserved:
+        logger.warning(f"Channel {channel_id} is reserved for an invite")
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Channel is reserved"
+        )
+        return
+
     # Only accept connection after successful join
     await websocket.accept()
     logger.info(f"WebSocket accepted for user {user.callsign} in channel {channel_id}")
+    heartbeat.add(morse_connection, channel_id)
 
+    dropped = False
     try:
+        if resumable:
+            await websocket.send_json(
+                {"event": "session", "resume_token": resumer.issue(morse_connection), "grace": resumer.grace}
+            )
+
         # Notify the channel that a user has joined
         user_public_dict = UserPublic(**user.model_dump()).model_dump(mode="json")
         await channel.broadcast(
             {"event": "user_joined", "user": user_public_dict, "channel_id": channel_id}
         )
 
-        # Main loop to listen for morse signals
-        while True:
-            data = await websocket.receive_text()
-            logger.debug(f"Received message from {user.callsign}: {data}")
-            # Relay morse signal to the other user
-            await channel.relay_message(data, morse_connection)
+        if record:
+            await start_recording(channel)
+
+        if bot and waiting_channel_id is None:
+            await start_bot(channel_id)
+
+        await relay_loop(websocket, channel, morse_connection)
 
     except WebSocketDisconnect as e:
         logger.info(f"User {user.callsign} disconnected from channel {channel_id}")
-        # Normal disconnect
-        pass
+        dropped = e.code not in CLEAN_CLOSE_CODES
 
     except Exception as e:
         logger.error(f"Unexpected error for user {user.callsign}: {type(e).__name__}: {e}")
@@ -95,23 +234,97 @@ async def join_random_channel(
             pass  # WebSocket might already be closed
 
     finally:
-        # Always clean up on disconnect
-        manager.disconnect(morse_connection, channel_id)
-        logger.info(f"User {user.callsign} cleaned up from channel {channel_id}")
-
-        # Notify remaining user that partner left
-        if channel.user_count > 0:  # Only broadcast if there are remaining users
-            user_public_dict = UserPublic(**user.model_dump()).model_dump(mode="json")
-            await channel.broadcast(
-                {"event": "user_left", "user": user_public_dict}
-            )
+        # Always clean up on disconnect, or hold the slot for a resume
+        await end_session(morse_connection, channel, dropped)
+
+
+@router.websocket("/resume")
+async def resume_channel(
+        websocket: WebSocket,
+        user: CurrentWsUser,
+        resume_token: str = Query(description="Token from the session event"),
+        last_seq: int = Query(0, ge=0, description="Number of relayed frames received before the drop")
+) -> None:
+    """
+    Reconnect a dropped resumable connection to its held slot.
+
+    The client gets a `resumed` event with who is in the channel now, then
+    every frame relayed after `last_seq` that is still buffered (`missed`
+    counts those that are not), and the partner gets `user_resumed`.
+    """
+    if user is None:
+        return
+    if await refuse_if_draining(websocket, user):
+        return
+
+    if not resumer.can_resume(resume_token, user):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Nothing to resume")
+        return
+
+    await websocket.accept()
+    held = resumer.resume(resume_token, user, websocket)
+    if held is None:
+        # The grace period ran out while accepting
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Nothing to resume")
+        return
+
+    morse_connection, channel = held
+    channel_id = channel.channel_id
+    logger.info(f"User {user.callsign} resumed in channel {channel_id}")
+    heartbeat.add(morse_connection, channel_id)
+
+    dropped = False
+    try:
+        # Frames relayed during the replay land in the ring too, so keep going
+        # until it is drained; only then take new frames directly
+        ring = morse_connection.ring
+        if ring is None:
+            raise RuntimeError("Held connection has no frame ring")
+        frames, missed = ring.since(last_seq)
+        # The partner may have left meanwhile; that user_left went nowhere
+        users = [
+            UserPublic.model_validate(connection.user).model_dump(mode="json")
+            for connection in channel.user_connections
+        ]
+        await websocket.send_json(
+            {"event": "resumed", "channel_id": channel_id, "users": users, "seq": ring.seq, "missed": missed}
+        )
+        sent = last_seq + missed
+        while frames:
+            for frame in frames:
+                await websocket.send_text(frame)
+            sent += len(frames)
+            frames, skipped = ring.since(sent)
+            sent += skipped
+        morse_connection.suspended = False
+
+        user_public_dict = UserPublic(**user.model_dump()).model_dump(mode="json")
+        await channel.broadcast({"event": "user_resumed", "user": user_public_dict})
+
+        await relay_loop(websocket, channel, morse_connection)
+
+    except WebSocketDisconnect as e:
+        logger.info(f"User {user.callsign} disconnected from channel {channel_id}")
+        dropped = e.code not in CLEAN_CLOSE_CODES
+
+    except Exception as e:
+        logger.error(f"Unexpected error for user {user.callsign}: {type(e).__name__}: {e}")
+        try:
+            await websocket.close(code=status.WS_1011_INTERNAL_ERROR, reason=f"Internal error: {e}")
+        except Exception:
+            pass  # WebSocket might already be closed
+
+    finally:
+        await end_session(morse_connection, channel, dropped)
 
 
 @router.websocket("/{channel_id}")
 async def join_channel(
         websocket: WebSocket,
         channel_id: str,
-        user: CurrentWsUser
+        user: CurrentWsUser,
+        record: bool = Query(False, description="Record the session for replay"),
+        resumable: bool = Query(False, description="Issue a resume token, and hold the slot if the connection drops")
 ):
     """
     Handles a user joining a specific channel via WebSocket.
@@ -123,6 +336,8 @@ async def join_channel(
 
     if user is None:
         return
+    if await refuse_if_draining(websocket, user):
+        return
 
     logger.info(f"User {user.callsign} attempting to join channel {channel_id}")
     morse_connection = MorseConnection(websocket, user)
@@ -156,11 +371,26 @@ async def join_channel(
         )
         return
 
+    except ChannelReserved:
+        logger.warning(f"Channel {channel_id} is reserved for an invite")
+        await websocket.close(
+            code=status.WS_1008_POLICY_VIOLATION,
+            reason="Channel is reserved"
+        )
+        return
+
     # Only accept connection after successful join
     await websocket.accept()
     logger.info(f"WebSocket accepted for user {user.callsign} in channel {channel_id}")
+    heartbeat.add(morse_connection, channel_id)
 
+    dropped = False
     try:
+        if resumable:
+            await websocket.send_json(
+                {"event": "session", "resume_token": resumer.issue(morse_connection), "grace": resumer.grace}
+            )
+
         # Notify the channel that a user has joined
         user_public_dict = UserPublic(**user.model_dump()).model_dump(mode="json")
         await channel.broadcast(
@@ -168,17 +398,14 @@ async def join_channel(
         )
         logger.debug(f"Broadcasted user_joined event for {user.callsign}")
 
-        # Main loop to listen for morse signals
-        while True:
-            data = await websocket.receive_text()
-            logger.debug(f"Received message from {user.callsign}: {data}")
-            # Relay morse signal to the other user
-            await channel.relay_message(data, morse_connection)
+        if record:
+            await start_recording(channel)
+
+        await relay_loop(websocket, channel, morse_connection)
 
-    except WebSocketDisconnect:
+    except WebSocketDisconnect as e:
         logger.info(f"User {user.callsign} disconnected from channel {channel_id}")
-        # Normal disconnect
-        pass
+        dropped = e.code not in CLEAN_CLOSE_CODES
 
     except Exception as e:
         logger.error(f"Unexpected error for user {user.callsign}: {type(e).__name__}: {e}")
@@ -189,13 +416,5 @@ async def join_channel(
             pass  # WebSocket might already be closed
 
     finally:
-        # Always clean up on disconnect
-        manager.disconnect(morse_connection, channel_id)
-        logger.info(f"User {user.callsign} cleaned up from channel {channel_id}")
-
-        # Notify remaining user that partner left
-        if channel.user_count > 0:  # Only broadcast if there are remaining users
-            user_public_dict = UserPublic(**user.model_dump()).model_dump(mode="json")
-            await channel.broadcast(
-                {"event": "user_left", "user": user_public_dict}
-            )
+        # Always clean up on disconnect, or hold the slot for a resume
+        await end_session(morse_connection, channel, dropped)
@@ -1,11 +1,24 @@
 # app/routes/follow.py
 import uuid
+from datetime import datetime
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
-
-from ..dep import SessionDep, CurrentUser
-from ..models import Follow, User, UserPublic
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, select
+
+from ..core.connection_manager import manager
+from ..dep import AdminUser, SessionDep, CurrentUser
+from ..models import (
+    BulkResult,
+    BulkRowResult,
+    Follow,
+    FollowBulkCreate,
+    User,
+    UserPublic,
+    UserPublicWithChannel,
+)
 
 router = APIRouter(prefix="/follow", tags=["follow"])
 
@@ -24,6 +37,113 @@ async def get_follows(
     return user.follows
 
 
+@router.get(
+    "/online",
+    response_model=list[UserPublicWithChannel],
+    status_code=status.HTTP_200_OK
+)
+async def get_online_follows(
+        session: SessionDep,
+        current_user: CurrentUser
+) -> list[UserPublicWithChannel]:
+    """
+    Followed users who are in a channel right now, waiting ones first.
+
+    The follow ids come from the primary key index alone and are matched
+    against the connection manager in memory, so only the users that are
+    actually in a channel are loaded.
+    """
+    if not manager.channels:
+        return []
+
+    followed_ids = session.exec(select(Follow.followed_id).where(Follow.follower_id == current_user.id)).all()
+    channels = manager.filter_active(followed_ids)
+    if not channels:
+        return []
+
+    users = session.exec(select(User).where(col(User.id).in_(channels))).all()
+    online = [
+        UserPublicWithChannel(
+            id=user.id,
+            callsign=user.callsign,
+            created_at=user.created_at,
+            last_seen=user.last_seen,
+            # From the channel itself: User.status would look it up again
+            status="busy" if channels[user.id].is_full else "waiting",
+            in_channel=channels[user.id].channel_id,
+        )
+        for user in users
+    ]
+    return sorted(online, key=lambda user: (user.status != "waiting", user.callsign))
+
+
+@router.post(
+    "/bulk",
+    response_model=BulkResult,
+    status_code=status.HTTP_200_OK
+)
+async def follow_bulk(
+        batch: FollowBulkCreate,
+        session: SessionDep,
+        _admin: AdminUser,
+) -> BulkResult:
+    """Create a batch of follow relationships in a single transaction"""
+    user_ids = {pair.follower_id for pair in batch.follows} | {pair.followed_id for pair in batch.follows}
+
+    # One query to check every referenced user exists
+    known_ids = set(session.exec(select(User.id).where(col(User.id).in_(user_ids))).all())
+
+    # One query for every edge that may already exist between these users
+    existing = set(session.exec(
+        select(Follow.follower_id, Follow.followed_id).where(
+            col(Follow.follower_id).in_(user_ids),
+            col(Follow.followed_id).in_(user_ids),
+        )
+    ).all())
+
+    results: list[BulkRowResult] = []
+    new_edges: list[tuple[uuid.UUID, uuid.UUID]] = []
+    for index, pair in enumerate(batch.follows):
+        if pair.follower_id not in known_ids or pair.followed_id not in known_ids:
+            results.append(BulkRowResult(index=index, ok=False, error="User not found"))
+            continue
+
+        if pair.follower_id == pair.followed_id:
+            results.append(BulkRowResult(index=index, ok=False, error="Cannot follow yourself"))
+            continue
+
+        edges = [(pair.follower_id, pair.followed_id)]
+        if batch.mutual:
+            edges.append((pair.followed_id, pair.follower_id))
+
+        edges = [edge for edge in edges if edge not in existing]
+        if not edges:
+            results.append(BulkRowResult(index=index, ok=False, error="Already following"))
+            continue
+
+        existing.update(edges)
+        new_edges.extend(edges)
+        results.append(BulkRowResult(index=index, ok=True))
+
+    if new_edges:
+        now = datetime.utcnow()
+        try:
+            session.execute(insert(Follow), [
+                {"follower_id": follower_id, "followed_id": followed_id, "created_at": now}
+                for follower_id, followed_id in new_edges
+            ])
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Follow created concurrently, retry the batch"
+            )
+
+    created = sum(1 for result in results if result.ok)
+    return BulkResult(created=created, failed=len(results) - created, results=results)
+
+
 @router.post(
     "/{target_user_id}/",
     status_code=status.HTTP_201_CREATED,
@@ -0,0 +1,167 @@
+# app/routes/invite.py
+import logging
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, status
+
+from ..core.channel_ids import ChannelIdsExhausted
+from ..core.connection_manager import manager
+from ..core.invites import Invite, invites
+from ..core.metrics import INVITES
+from ..core.presence import presence
+from ..dep import CurrentUser, SessionDep
+from ..models import Follow, InviteCreate, InvitePublic, User, UserPublic
+
+router = APIRouter(prefix="/invites", tags=["invites"])
+logger = logging.getLogger("uvicorn.error")
+
+
+def invite_public(invite: Invite) -> InvitePublic:
+    return InvitePublic(
+        id=invite.id,
+        caller=UserPublic.model_validate(invite.caller),
+        callee_id=uuid.UUID(invite.callee_id),
+        channel_id=invite.channel_id,
+        expires_in=round(invite.expires_in(), 3),
+    )
+
+
+def invite_event(event: str, invite: Invite) -> dict[str, Any]:
+    return {"event": event, "invite": invite_public(invite).model_dump(mode="json")}
+
+
+def get_invite(invite_id: str) -> Invite:
+    invite = invites.get(invite_id)
+    if invite is None or invite.state != "pending":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invite not found"
+        )
+    return invite
+
+
+@router.post(
+    "/",
+    response_model=InvitePublic,
+    status_code=status.HTTP_201_CREATED
+)
+async def create_invite(
+        body: InviteCreate,
+        session: SessionDep,
+        current_user: CurrentUser
+) -> InvitePublic:
+    """Call a followed user into a channel reserved for the two of you"""
+    callee = session.get(User, body.callee_id)
+    if not callee:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+
+    if callee.id == current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot call yourself"
+        )
+
+    if session.get(Follow, (current_user.id, callee.id)) is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only call users you follow"
+        )
+
+    if manager.is_user_active(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You are already in a channel"
+        )
+
+    if manager.is_user_active(callee.id) or not presence.is_present(callee.id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{callee.callsign} is not available"
+        )
+
+    if invites.outgoing(current_user.id) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You are already calling someone"
+        )
+
+    try:
+        channel_id = manager.create_random_channel()
+    except ChannelIdsExhausted:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No channels available"
+        )
+    invite = invites.create(current_user, callee.id, channel_id)
+    manager.reserve(channel_id, [current_user.id, callee.id], owner=invite.id)
+
+    if not await presence.send(callee.id, invite_event("invite", invite)):
+        # The callee's last socket went away while we were sending
+        invites.discard(invite)
+        manager.release(channel_id, owner=invite.id)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"{callee.callsign} is not available"
+        )
+
+    logger.info(f"User {current_user.callsign} invited {callee.callsign} to channel {channel_id}")
+    return invite_public(invite)
+
+
+@router.get(
+    "/",
+    response_model=list[InvitePublic],
+    status_code=status.HTTP_200_OK
+)
+async def list_invites(current_user: CurrentUser) -> list[InvitePublic]:
+    """Pending invites to the current user"""
+    return [invite_public(invite) for invite in invites.incoming(current_user.id)]
+
+
+@router.post(
+    "/{invite_id}/accept",
+    response_model=InvitePublic,
+    status_code=status.HTTP_200_OK
+)
+async def accept_invite(invite_id: str, current_user: CurrentUser) -> InvitePublic:
+    """Accept an invite; both users then join its channel"""
+    invite = get_invite(invite_id)
+    if invite.callee_id != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the callee can accept an invite"
+        )
+
+    invites.accept(invite)
+    INVITES.inc(labels=("accepted",))
+    await presence.send(invite.caller_id, invite_event("invite_accepted", invite))
+    return invite_public(invite)
+
+
+@router.delete(
+    "/{invite_id}",
+    status_code=status.HTTP_204_NO_CONTENT
+)
+async def delete_invite(invite_id: str, current_user: CurrentUser) -> None:
+    """Decline an invite to you, or cancel your own call"""
+    invite = get_invite(invite_id)
+    user_id = str(current_user.id)
+    if user_id == invite.callee_id:
+        outcome, notify = "declined", invite.caller_id
+    elif user_id == invite.caller_id:
+        outcome, notify = "cancelled", invite.callee_id
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Invite not found"
+        )
+
+    invites.discard(invite)
+    manager.release(invite.channel_id, owner=invite.id)
+    INVITES.inc(labels=(outcome,))
+    await presence.send(notify, {"event": f"invite_{outcome}", "invite_id": invite.id, "channel_id": invite.channel_id})
+    return
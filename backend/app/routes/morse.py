@@ -0,0 +1,117 @@
+# app/routes/morse.py
+import asyncio
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..core import morse
+from ..core.audio import ToneParams, duration, iter_audio, pcm_length
+from ..core.connection_manager import manager
+from ..dep import CurrentUser
+from ..models import (
+    MorseDecodeRequest,
+    MorseEncodeRequest,
+    MorseTimingDecoded,
+    MorseTimingRequest,
+    MorseTranslation,
+)
+
+router = APIRouter(prefix="/morse", tags=["morse"])
+
+AudioFormat = Literal["wav", "pcm"]
+
+
+def tone_params(
+        wpm: float = Query(20.0, ge=5, le=60, description="Character speed"),
+        farnsworth_wpm: float | None = Query(None, ge=2, le=60, description="Overall speed, stretches the gaps"),
+        frequency: float = Query(600.0, ge=200, le=2000, description="Tone frequency in Hz"),
+        ramp_ms: float = Query(5.0, ge=0, le=20, description="Attack and release time"),
+        sample_rate: int = Query(8000, ge=8000, le=48000),
+) -> ToneParams:
+    return ToneParams(
+        wpm=wpm,
+        farnsworth_wpm=farnsworth_wpm,
+        frequency=frequency,
+        ramp_ms=ramp_ms,
+        sample_rate=sample_rate,
+    )
+
+
+def _audio_response(text: str, params: ToneParams, audio_format: AudioFormat) -> StreamingResponse:
+    seconds = duration(pcm_length(text, params), params)
+    if seconds > settings.audio_max_seconds:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Audio would last {seconds:.0f}s, the limit is {settings.audio_max_seconds:.0f}s"
+        )
+
+    wav = audio_format == "wav"
+    return StreamingResponse(
+        iter_audio(text, params, wav),
+        # Raw PCM is mono, signed 16-bit little endian at the requested sample rate
+        media_type="audio/wav" if wav else "application/octet-stream",
+    )
+
+
+@router.post("/encode", response_model=MorseTranslation)
+def encode_text(request: MorseEncodeRequest) -> MorseTranslation:
+    """Encode text as Morse"""
+    return MorseTranslation(text=request.text, morse=morse.encode(request.text))
+
+
+@router.post("/decode", response_model=MorseTranslation)
+def decode_morse(request: MorseDecodeRequest) -> MorseTranslation:
+    """Decode Morse written with '.', '-', spaces and '/'"""
+    return MorseTranslation(text=morse.decode(request.morse), morse=request.morse)
+
+
+@router.post("/decode/timings", response_model=MorseTimingDecoded)
+def decode_timings(request: MorseTimingRequest) -> MorseTimingDecoded:
+    """Decode key-down/key-up durations, estimating the speed unless `wpm` is given"""
+    try:
+        unit = morse.unit_from_wpm(request.wpm) if request.wpm else morse.estimate_unit(request.durations)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    code = morse.timings_to_morse(request.durations, unit)
+    return MorseTimingDecoded(
+        text=morse.decode(code),
+        morse=code,
+        unit_ms=unit,
+        wpm=morse.wpm_from_unit(unit),
+    )
+
+
+@router.get("/audio")
+def render_audio(
+        _current_user: CurrentUser,
+        params: Annotated[ToneParams, Depends(tone_params)],
+        text: str = Query(max_length=10_000),
+        format: AudioFormat = Query("wav"),
+) -> StreamingResponse:
+    """Render text as Morse audio, streamed as WAV or raw PCM"""
+    return _audio_response(text, params, format)
+
+
+@router.get("/audio/channel/{channel_id}")
+async def render_channel_audio(
+        channel_id: str,
+        current_user: CurrentUser,
+        params: Annotated[ToneParams, Depends(tone_params)],
+        format: AudioFormat = Query("wav"),
+) -> StreamingResponse:
+    """Render what the other user in your channel has keyed so far"""
+    # The transcript is read here on the event loop, where the relay appends
+    # to it; only rendering the snapshot goes to a thread
+    channel = manager.get_user_channel(current_user.id)
+    if channel is None or channel.channel_id != channel_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="You are not in this channel")
+
+    text = "".join(
+        connection.timing.text
+        for connection in channel.user_connections
+        if connection.user.id != current_user.id
+    )
+    return await asyncio.to_thread(_audio_response, text, params, format)
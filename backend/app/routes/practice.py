@@ -0,0 +1,127 @@
+# app/routes/practice.py
+import random
+
+from fastapi import APIRouter, HTTPException, Query, status
+
+from ..core import morse, practice, scoring
+from ..core.practice import DrillKind
+from ..dep import CurrentUser, SessionDep
+from ..models import (
+    PracticeCharStats,
+    PracticeDrill,
+    PracticeDrillBatch,
+    PracticeEdit,
+    PracticeLesson,
+    PracticeLessons,
+    PracticeScore,
+    PracticeScoreRequest,
+    PracticeStats,
+    PracticeStatsPublic,
+)
+
+router = APIRouter(prefix="/practice", tags=["practice"])
+
+
+def _lesson_or_404(number: int) -> practice.Lesson:
+    try:
+        return practice.get_lesson(number)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+def _lesson_public(lesson: practice.Lesson) -> PracticeLesson:
+    return PracticeLesson(
+        number=lesson.number,
+        chars=lesson.chars,
+        new_char=lesson.new_char,
+        word_count=len(lesson.words),
+    )
+
+
+@router.get("/lessons", response_model=PracticeLessons)
+def list_lessons() -> PracticeLessons:
+    """All Koch lessons, each adding one character"""
+    return PracticeLessons(
+        lessons=[_lesson_public(practice.get_lesson(n)) for n in range(1, practice.MAX_LESSON + 1)]
+    )
+
+
+@router.get("/lessons/{number}", response_model=PracticeLesson)
+def get_lesson(number: int) -> PracticeLesson:
+    return _lesson_public(_lesson_or_404(number))
+
+
+@router.get("/lessons/{number}/drills", response_model=PracticeDrillBatch)
+def get_drills(
+        number: int,
+        session: SessionDep,
+        kind: DrillKind = Query("groups"),
+        seed: int | None = Query(None, description="Omit to start a new sequence"),
+        page: int = Query(0, ge=0),
+        page_size: int = Query(10, gt=0, le=100),
+        length: int = Query(5, gt=0, le=50, description="Groups, words or callsigns per drill"),
+        group_size: int = Query(5, gt=0, le=10),
+        wpm: float = Query(20.0, ge=5, le=60, description="Character speed"),
+        farnsworth_wpm: float | None = Query(None, ge=2, le=60, description="Overall speed"),
+) -> PracticeDrillBatch:
+    """A page of Koch drills for the lesson, reproducible from `seed`"""
+    lesson = _lesson_or_404(number)
+    if seed is None:
+        seed = random.getrandbits(32)
+
+    callsigns = practice.callsigns.for_lesson(session, lesson) if kind in ("callsigns", "mixed") else ()
+    texts = practice.drill_batch(lesson, kind, seed, page, page_size, length, group_size, callsigns)
+
+    return PracticeDrillBatch(
+        lesson=lesson.number,
+        kind=kind,
+        seed=seed,
+        page=page,
+        next_page=page + 1,
+        wpm=wpm,
+        farnsworth_wpm=farnsworth_wpm,
+        drills=[PracticeDrill(text=text, morse=morse.encode(text)) for text in texts],
+    )
+
+
+def _char_stats(per_char: dict[str, list[int]]) -> list[PracticeCharStats]:
+    return [
+        PracticeCharStats(char=char, total=total, errors=errors)
+        for char, (total, errors) in sorted(per_char.items())
+    ]
+
+
+@router.post("/score", response_model=PracticeScore)
+def score_copy(request: PracticeScoreRequest, current_user: CurrentUser, session: SessionDep) -> PracticeScore:
+    """Score copied text against the drill and add it to your statistics"""
+    expected, actual = request.expected, request.actual
+    if request.format == "morse":
+        expected, actual = morse.decode(expected), morse.decode(actual)
+    expected, actual = scoring.normalize(expected), scoring.normalize(actual)
+
+    score = scoring.align(expected, actual)
+    scoring.record_score(session, current_user.id, score)
+
+    return PracticeScore(
+        expected=expected,
+        actual=actual,
+        distance=score.distance,
+        accuracy=score.accuracy,
+        edits=[PracticeEdit(op=e.op, expected=e.expected, actual=e.actual) for e in score.edits],
+        chars=_char_stats(score.char_stats()),
+    )
+
+
+@router.get("/stats", response_model=PracticeStatsPublic)
+def get_stats(current_user: CurrentUser, session: SessionDep) -> PracticeStatsPublic:
+    """Your copy accuracy across all scored drills"""
+    stats = session.get(PracticeStats, current_user.id) or PracticeStats(user_id=current_user.id, updated_at=None)
+    return PracticeStatsPublic(
+        drills=stats.drills,
+        chars=stats.chars,
+        errors=stats.errors,
+        insertions=stats.insertions,
+        accuracy=max(0.0, 1 - stats.errors / stats.chars) if stats.chars else 1.0,
+        per_char=_char_stats(stats.per_char),
+        updated_at=stats.updated_at,
+    )
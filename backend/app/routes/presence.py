@@ -0,0 +1,46 @@
+# app/routes/presence.py
+import logging
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+
+from ..core.invites import invites
+from ..core.presence import presence
+from ..dep import CurrentWsUser
+from .invite import invite_event
+
+router = APIRouter(prefix="/presence", tags=["presence"])
+logger = logging.getLogger("uvicorn.error")
+
+
+@router.websocket("")
+async def presence_socket(websocket: WebSocket, user: CurrentWsUser) -> None:
+    """
+    Keep a socket open while the app is, to be reachable for invites.
+
+    ws://localhost:8000/presence?token=YOUR_JWT_TOKEN
+
+    Invites already waiting are sent on connect. Anything the client sends
+    is ignored; it may send to keep the socket alive. Past the per-user limit,
+    the user's oldest presence socket is closed to make room.
+    """
+    if user is None:
+        return
+
+    await websocket.accept()
+    replaced = presence.add(user.id, websocket)
+    if replaced is not None:
+        try:
+            await replaced.close(code=status.WS_1008_POLICY_VIOLATION, reason="Too many presence connections")
+        except Exception:
+            pass  # Already gone
+    logger.info(f"User {user.callsign} is present")
+    try:
+        for invite in invites.incoming(user.id):
+            await websocket.send_json(invite_event("invite", invite))
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        presence.remove(user.id, websocket)
+        logger.info(f"User {user.callsign} is no longer present")
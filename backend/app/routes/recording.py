@@ -0,0 +1,87 @@
+# app/routes/recording.py
+import asyncio
+import json
+import logging
+from typing import Any
+
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Query,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
+
+from ..core.recording import FRAME, JOIN, recorder
+from ..dep import CurrentUser, CurrentWsUser
+from ..models import RecordingPublic, RecordingsPublic, User
+
+router = APIRouter(prefix="/recordings", tags=["recordings"])
+logger = logging.getLogger('uvicorn.error')
+
+
+def _can_access(user: User, meta: dict[str, Any]) -> bool:
+    """Participants and the admin may see a recording"""
+    return user.callsign == "admin" or any(p["id"] == str(user.id) for p in meta["participants"])
+
+
+@router.get("/", response_model=RecordingsPublic)
+def list_recordings(current_user: CurrentUser) -> RecordingsPublic:
+    """Recordings of sessions you took part in, newest first"""
+    recordings = [RecordingPublic.model_validate(meta) for meta in recorder.list() if _can_access(current_user, meta)]
+    return RecordingsPublic(recordings=recordings, count=len(recordings))
+
+
+@router.get("/{recording_id}", response_model=RecordingPublic)
+def get_recording(recording_id: str, current_user: CurrentUser) -> dict[str, Any]:
+    meta = recorder.metadata(recording_id)
+    if meta is None or not _can_access(current_user, meta):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Recording not found")
+    return meta
+
+
+@router.websocket("/{recording_id}/replay")
+async def replay_recording(
+        websocket: WebSocket,
+        recording_id: str,
+        user: CurrentWsUser,
+        speed: float = Query(1.0, gt=0, le=100, description="Playback speed, 1 is the original timing"),
+) -> None:
+    """Stream a recorded session back with its original (or scaled) timing"""
+    if user is None:
+        return
+
+    # Both may read the disk, so keep them off the event loop
+    meta = await asyncio.to_thread(recorder.metadata, recording_id)
+    if meta is None or not _can_access(user, meta):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Recording not found")
+        return
+
+    try:
+        reader = await asyncio.to_thread(recorder.open, recording_id)
+    except (OSError, ValueError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Recording not found")
+        return
+
+    await websocket.accept()
+    try:
+        with reader:
+            await websocket.send_json({"event": "replay_started", "recording_id": recording_id})
+            position_ms = 0
+            for record in reader:
+                if record.offset_ms > position_ms:
+                    await asyncio.sleep((record.offset_ms - position_ms) / 1000 / speed)
+                    position_ms = record.offset_ms
+
+                if record.kind == FRAME:
+                    await websocket.send_text(record.payload)
+                else:
+                    event = "user_joined" if record.kind == JOIN else "user_left"
+                    await websocket.send_json({"event": event, "user": json.loads(record.payload), "slot": record.slot})
+
+            await websocket.send_json({"event": "replay_finished", "recording_id": recording_id})
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info(f"User {user.callsign} stopped replaying {recording_id}")
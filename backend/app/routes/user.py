@@ -1,14 +1,24 @@
 # app/routes/user.py
+import os
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import List
 
 import bcrypt
 from fastapi import APIRouter, HTTPException, Query
-from sqlmodel import func, select
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, func, select
 
-from ..dep import SessionDep
+from ..core.metrics import BCRYPT_LATENCY
+from ..dep import AdminUser, SessionDep
 from ..models import (
+    BulkResult,
+    BulkRowResult,
     User,
+    UserBulkCreate,
     UserCreate,
     UserPublic,
     UserPublicWithChannel,
@@ -20,8 +30,18 @@ router = APIRouter(prefix="/users", tags=["users"])
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt"""
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    with BCRYPT_LATENCY.time(("hash",)):
+        salt = bcrypt.gensalt()
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+# bcrypt releases the GIL while hashing, so threads give real parallelism
+_hash_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 4, thread_name_prefix="bcrypt")
+
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    """Hash a batch of passwords in parallel on the worker pool"""
+    return list(_hash_pool.map(hash_password, passwords))
 
 
 @router.post("/", response_model=UserPublic, status_code=201)
@@ -51,6 +71,75 @@ def create_user(user: UserCreate, session: SessionDep):
     return db_user
 
 
+def row_error(error: ValidationError) -> str:
+    """First problem of an invalid bulk row, as 'field: message'"""
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first["loc"])
+    return f"{field}: {first['msg']}" if field else first["msg"]
+
+
+@router.post("/bulk", response_model=BulkResult)
+def create_users_bulk(batch: UserBulkCreate, session: SessionDep, _admin: AdminUser) -> BulkResult:
+    """Register a batch of users in a single transaction"""
+    # Rows are validated one by one, so a bad row fails alone instead of the batch
+    users: dict[int, UserCreate] = {}
+    invalid: dict[int, str] = {}
+    for index, row in enumerate(batch.users):
+        try:
+            users[index] = UserCreate.model_validate(row)
+        except ValidationError as e:
+            invalid[index] = row_error(e)
+
+    # One query for all collisions with existing users
+    taken = set(session.exec(
+        select(User.callsign).where(col(User.callsign).in_([user.callsign for user in users.values()]))
+    ).all())
+
+    results: list[BulkRowResult] = []
+    accepted: list[int] = []
+    seen: set[str] = set()
+    for index in range(len(batch.users)):
+        if index in invalid:
+            results.append(BulkRowResult(index=index, ok=False, error=invalid[index]))
+        elif users[index].callsign in taken:
+            results.append(BulkRowResult(index=index, ok=False, error="Callsign already registered"))
+        elif users[index].callsign in seen:
+            results.append(BulkRowResult(index=index, ok=False, error="Duplicate callsign in batch"))
+        else:
+            seen.add(users[index].callsign)
+            accepted.append(index)
+            results.append(BulkRowResult(index=index, ok=True))
+
+    hashed = hash_passwords([users[index].password for index in accepted])
+
+    now = datetime.utcnow()
+    rows = []
+    for index, hashed_password in zip(accepted, hashed, strict=True):
+        user_id = uuid.uuid4()
+        results[index].id = user_id
+        rows.append({
+            "id": user_id,
+            "callsign": users[index].callsign,
+            "hashed_password": hashed_password,
+            "created_at": now,
+            "last_seen": now,
+        })
+
+    if rows:
+        try:
+            session.execute(insert(User), rows)
+            session.commit()
+        except IntegrityError:
+            # A concurrent registration took one of the callsigns
+            session.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail="Callsign registered concurrently, retry the batch"
+            )
+
+    return BulkResult(created=len(rows), failed=len(results) - len(rows), results=results)
+
+
 @router.get("/", response_model=List[UserPublic])
 def get_users(
         session: SessionDep,
@@ -0,0 +1,91 @@
+# benchmarks/bot_bench.py
+"""
+Practice bots per CPU core.
+
+Runs pairs of bots in one process: one calls CQ and the other answers, and
+they keep holding QSOs at real keying speed through Channel.relay_message.
+Reports process CPU use while they run and the number of bots one fully
+used core could sustain.
+
+Run from the backend directory:
+    python -m benchmarks.bot_bench --pairs 1000 --seconds 20
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.core.bot import MorseBot
+from app.core.channel import Channel
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(0)
+    bots: list[MorseBot] = []
+    for i in range(args.pairs):
+        channel = Channel(channel_id=str(100000 + i))
+        caller = MorseBot(channel, callsign=f"C{i}", wpm=args.wpm, calls_cq=True, repeat=True, rng=rng)
+        answerer = MorseBot(channel, callsign=f"A{i}", wpm=args.wpm, rng=rng)
+        channel.add_user(caller)
+        channel.add_user(answerer)
+        bots.extend((caller, answerer))
+
+    # Stagger the first CQs so the pairs do not key in lockstep
+    async def start(bot: MorseBot) -> None:
+        await asyncio.sleep(rng.random() * args.ramp_up if bot.calls_cq else 0)
+        await bot.run()
+
+    tasks = [asyncio.create_task(start(bot)) for bot in bots]
+    await asyncio.sleep(args.ramp_up)
+
+    frames_before = sum(bot.sent for bot in bots)
+    cpu_before, wall_before = time.process_time(), time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    cpu = time.process_time() - cpu_before
+    wall = time.perf_counter() - wall_before
+    frames = sum(bot.sent for bot in bots) - frames_before
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    utilization = cpu / wall
+    return {
+        "bots": len(bots),
+        "wpm": args.wpm,
+        "frames_per_s": frames / wall,
+        "cpu_utilization": utilization,
+        "cpu_us_per_frame": cpu / frames * 1e6 if frames else None,
+        "bots_per_core": len(bots) / utilization if utilization else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Practice bots per CPU core")
+    parser.add_argument("--pairs", type=int, default=500, help="Calling/answering bot pairs")
+    parser.add_argument("--wpm", type=float, default=20.0)
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measurement time")
+    parser.add_argument("--ramp-up", type=float, default=3.0, help="Seconds to stagger the first CQs over")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/bots-<time>.json)")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+
+    report = {"benchmark": "bots", "timestamp": datetime.utcnow().isoformat(), "params": vars(args), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bots-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+# benchmarks/channel_id_bench.py
+"""
+Channel ID allocation as the 6-digit space fills.
+
+Fills the space to each occupancy, then times allocate + release pairs so
+the occupancy holds steady: with the allocator, and with the old loop of
+random 6-digit numbers until one is not taken. The allocator should cost
+the same at any occupancy; the loop takes 1 / (1 - occupancy) draws on
+average, and its worst case grows faster still. Also reports the
+allocator's bookkeeping size.
+
+Run from the backend directory:
+    python -m benchmarks.channel_id_bench --occupancy 0.5 0.9 0.99
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.core.channel_ids import ChannelIdAllocator
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def measure_allocator(occupancy: float, args: argparse.Namespace) -> dict:
+    ids = ChannelIdAllocator(rng=random.Random(args.seed))
+    in_use = [ids.allocate() for _ in range(int(ids.size * occupancy))]
+    rng = random.Random(args.seed)
+
+    worst = 0.0
+    started = time.perf_counter()
+    for _ in range(args.operations):
+        op_started = time.perf_counter()
+        index = rng.randrange(len(in_use))
+        ids.release(in_use[index])
+        in_use[index] = ids.allocate()
+        worst = max(worst, time.perf_counter() - op_started)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "us_per_op": elapsed / args.operations * 1e6,
+        "worst_us": worst * 1e6,
+        "tracked_slots": len(ids._slot_ids),
+    }
+
+
+def measure_retry_loop(occupancy: float, args: argparse.Namespace) -> dict:
+    """The loop create_random_channel used to run"""
+    rng = random.Random(args.seed)
+    taken = set(str(i) for i in rng.sample(range(100000, 1000000), int(900000 * occupancy)))
+    in_use = list(taken)
+
+    draws = 0
+    most_draws = 0
+    worst = 0.0
+    started = time.perf_counter()
+    for _ in range(args.operations):
+        op_started = time.perf_counter()
+        index = rng.randrange(len(in_use))
+        taken.discard(in_use[index])
+        attempts = 0
+        while True:
+            attempts += 1
+            channel_id = str(rng.randint(100000, 999999))
+            if channel_id not in taken:
+                break
+        taken.add(channel_id)
+        in_use[index] = channel_id
+        draws += attempts
+        most_draws = max(most_draws, attempts)
+        worst = max(worst, time.perf_counter() - op_started)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "us_per_op": elapsed / args.operations * 1e6,
+        "worst_us": worst * 1e6,
+        "draws_per_op": draws / args.operations,
+        "most_draws": most_draws,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Channel ID allocation as the ID space fills")
+    parser.add_argument("--occupancy", type=float, nargs="+", default=[0.1, 0.5, 0.9])
+    parser.add_argument("--operations", type=int, default=100_000, help="Allocate + release pairs to time")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/channel-ids-<time>.json)")
+    args = parser.parse_args(argv)
+
+    results = [
+        {
+            "occupancy": occupancy,
+            "allocator": measure_allocator(occupancy, args),
+            "retry_loop": measure_retry_loop(occupancy, args),
+        }
+        for occupancy in args.occupancy
+    ]
+
+    report = {"benchmark": "channel_ids", "timestamp": datetime.utcnow().isoformat(), "params": vars(args), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"channel-ids-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# benchmarks/heartbeat_bench.py
+"""
+Heartbeat scheduler cost per tick.
+
+Fills a Heartbeat with connections arriving evenly over one interval, so
+every tick has the same share of them due, and times the ticks. The time
+per due connection should stay flat as the total grows; the time for a tick
+with nothing due should stay near zero.
+
+Run from the backend directory:
+    python -m benchmarks.heartbeat_bench --connections 1000 10000 50000 100000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.core.connection import MorseConnection
+from app.core.heartbeat import Heartbeat
+from app.models import User
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class IdleSocket:
+    async def send_json(self, data) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        pass
+
+
+async def measure(total: int, args: argparse.Namespace) -> dict:
+    heartbeat = Heartbeat(args.interval, timeout=float("inf"), tick=1.0)
+    user = User(id=uuid.uuid4(), callsign="BENCH", hashed_password="")
+    per_tick = total // heartbeat.interval_ticks
+    for _ in range(heartbeat.interval_ticks):
+        for _ in range(per_tick):
+            heartbeat.add(MorseConnection(IdleSocket(), user), "123456")
+        await heartbeat.run_tick()
+
+    # Everyone has just been heard from, so ticks only reschedule
+    now = time.monotonic()
+    ticks = heartbeat.interval_ticks * args.turns
+    started = time.perf_counter()
+    visited = 0
+    for _ in range(ticks):
+        visited += await heartbeat.run_tick(now)
+    elapsed = time.perf_counter() - started
+
+    empty = Heartbeat(args.interval, timeout=float("inf"), tick=1.0)
+    for _ in range(total):
+        empty.add(MorseConnection(IdleSocket(), user), "123456")
+    started = time.perf_counter()
+    for _ in range(empty.interval_ticks - 1):
+        await empty.run_tick(now)
+    empty_elapsed = time.perf_counter() - started
+
+    return {
+        "connections": len(heartbeat),
+        "due_per_tick": visited / ticks,
+        "tick_ms": elapsed / ticks * 1000,
+        "us_per_due_connection": elapsed / visited * 1e6 if visited else None,
+        "empty_tick_us": empty_elapsed / (empty.interval_ticks - 1) * 1e6,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Heartbeat scheduler cost per tick")
+    parser.add_argument("--connections", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--interval", type=float, default=20.0, help="Heartbeat interval in ticks")
+    parser.add_argument("--turns", type=int, default=3, help="Full wheel turns to time")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/heartbeat-<time>.json)")
+    args = parser.parse_args(argv)
+
+    results = [asyncio.run(measure(total, args)) for total in args.connections]
+
+    report = {"benchmark": "heartbeat", "timestamp": datetime.utcnow().isoformat(), "params": vars(args), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"heartbeat-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+# benchmarks/manager_contention_bench.py
+"""
+Connect/disconnect storms against the connection manager from many threads.
+
+Each thread joins and leaves random channels as fast as it can. One shard
+is the same as guarding the plain ConnectionManager with a single lock,
+which is what using it from several threads would take; more shards give
+the threads separate locks. Reports join + leave pairs per second and the
+slowest pairs, and as a reference the plain manager on one thread with no
+locking at all.
+
+Under the GIL the threads never run manager code in parallel, so more
+shards do not add throughput, and the tails are set by the interpreter's
+thread switch interval (5ms) more than by the locks. The shard count pays
+off where the threads really run at once, as on a free-threaded build.
+
+Run from the backend directory:
+    python -m benchmarks.manager_contention_bench --threads 1 4 16 --shards 1 4 16 64
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.core.connection import MorseConnection
+from app.core.connection_manager import (
+    ChannelFull,
+    ConnectionManager,
+    UserAlreadyActive,
+)
+from app.core.sharded_manager import ShardedConnectionManager
+from app.models import User
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+class IdleSocket:
+    async def send_json(self, data) -> None:
+        pass
+
+
+def storm(manager, seed: int, channels: int, seconds: float, start: threading.Barrier, latencies: list[float]) -> int:
+    rng = random.Random(seed)
+    connections = [
+        MorseConnection(IdleSocket(), User(id=uuid.uuid4(), callsign=f"S{seed}U{i}", hashed_password=""))
+        for i in range(64)
+    ]
+    channel_ids = [str(100000 + i) for i in range(channels)]
+    start.wait()
+    deadline = time.perf_counter() + seconds
+    pairs = 0
+    while (now := time.perf_counter()) < deadline:
+        connection = rng.choice(connections)
+        channel_id = rng.choice(channel_ids)
+        try:
+            manager.connect(connection, channel_id)
+        except (ChannelFull, UserAlreadyActive):
+            continue
+        manager.disconnect(connection, channel_id)
+        latencies.append(time.perf_counter() - now)
+        pairs += 1
+    return pairs
+
+
+def measure(manager, threads: int, args: argparse.Namespace) -> dict:
+    start = threading.Barrier(threads)
+    latencies: list[list[float]] = [[] for _ in range(threads)]
+    counts = [0] * threads
+
+    def run(index: int) -> None:
+        counts[index] = storm(manager, index, args.channels, args.seconds, start, latencies[index])
+
+    workers = [threading.Thread(target=run, args=(index,)) for index in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    merged = sorted(latency for thread_latencies in latencies for latency in thread_latencies)
+    return {
+        "threads": threads,
+        "pairs_per_second": sum(counts) / args.seconds,
+        "p50_us": statistics.median(merged) * 1e6,
+        "p99_us": merged[int(len(merged) * 0.99)] * 1e6,
+        "p999_us": merged[int(len(merged) * 0.999)] * 1e6,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Connection manager under concurrent connect/disconnect storms")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--channels", type=int, default=10_000, help="Channel IDs the storms pick from")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration of each run")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/manager-contention-<time>.json)")
+    args = parser.parse_args(argv)
+
+    results = [{"manager": "plain, unlocked", **measure(ConnectionManager(), 1, args)}]
+    for shards in args.shards:
+        for threads in args.threads:
+            results.append({"manager": f"{shards} shards", **measure(ShardedConnectionManager(shards), threads, args)})
+
+    report = {"benchmark": "manager_contention", "timestamp": datetime.utcnow().isoformat(), "params": vars(args), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"manager-contention-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for result in results:
+        print(
+            f"{result['manager']:>16}  {result['threads']:>3} threads  {result['pairs_per_second']:>9.0f} pairs/s"
+            f"  p50 {result['p50_us']:7.1f}us  p99 {result['p99_us']:8.1f}us  p99.9 {result['p999_us']:8.1f}us"
+        )
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# benchmarks/morse_bench.py
+"""
+Throughput of the Morse codec in characters per second.
+
+Run from the backend directory:
+    python -m benchmarks.morse_bench
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.core import morse
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+WORDS = ["CQ", "DE", "QTH", "RST", "599", "NAME", "TNX", "73", "QSL", "WX", "HR", "OM", "FB", "PARIS"]
+
+
+def chars_per_second(fn, arg, chars: int, min_time: float) -> float:
+    """Run `fn(arg)` repeatedly for at least `min_time` seconds"""
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        fn(arg)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return runs * chars / elapsed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Morse codec throughput")
+    parser.add_argument("--words", type=int, default=10_000, help="Words per buffer")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds per measurement")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/morse-<time>.json)")
+    args = parser.parse_args(argv)
+
+    text = " ".join(random.choice(WORDS) for _ in range(args.words))
+    code = morse.encode(text)
+    unit = morse.unit_from_wpm(20)
+    timings = [d * random.uniform(0.85, 1.15) for d in morse.text_to_timings(text, unit)]
+    chars = len(text)
+
+    assert morse.decode_timings(timings) == text
+
+    results = {
+        "chars_per_buffer": chars,
+        "encode_cps": chars_per_second(morse.encode, text, chars, args.min_time),
+        "decode_cps": chars_per_second(morse.decode, code, chars, args.min_time),
+        "decode_timings_cps": chars_per_second(morse.decode_timings, timings, chars, args.min_time),
+    }
+
+    report = {"benchmark": "morse", "timestamp": datetime.utcnow().isoformat(), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"morse-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for name, value in results.items():
+        print(f"{name:<22} {value:>14,.0f}")
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
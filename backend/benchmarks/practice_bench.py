@@ -0,0 +1,70 @@
+# benchmarks/practice_bench.py
+"""
+Drill generation time per Koch lesson and drill kind.
+
+Run from the backend directory:
+    python -m benchmarks.practice_bench
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.core import practice
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Stand-in for the callsign corpus, which normally comes from the database
+CALLSIGNS = tuple(
+    f"{random.choice('KNW')}{random.randint(0, 9)}{''.join(random.choices('ABCDEFGHIJKLMNOPQRSTUVWXYZ', k=3))}"
+    for _ in range(5000)
+)
+
+
+def us_per_drill(lesson: practice.Lesson, kind: str, length: int, min_time: float) -> float:
+    callsigns = practice._spellable(CALLSIGNS, lesson.chars)
+    rng = random.Random(0)
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        practice.drill(rng, lesson, kind, length, callsigns=callsigns)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            return elapsed / runs * 1e6
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Practice drill generation time")
+    parser.add_argument("--length", type=int, default=10, help="Items per drill")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds per measurement")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/practice-<time>.json)")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    for number in range(1, practice.MAX_LESSON + 1):
+        practice.get_lesson(number)
+    precompute_ms = (time.perf_counter() - started) * 1000
+
+    results: dict[str, float] = {"precompute_all_lessons_ms": precompute_ms}
+    for number in (1, 10, 20, practice.MAX_LESSON):
+        for kind in ("groups", "words", "callsigns", "mixed"):
+            lesson = practice.get_lesson(number)
+            results[f"lesson{number}_{kind}_us"] = us_per_drill(lesson, kind, args.length, args.min_time)
+
+    report = {"benchmark": "practice", "timestamp": datetime.utcnow().isoformat(), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"practice-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for name, value in results.items():
+        print(f"{name:<28} {value:>10,.1f}")
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+# benchmarks/scoring_bench.py
+"""
+Copy-scoring throughput against the rate characters are relayed.
+
+Aligns practice drills with copies carrying a given error rate and reports
+characters scored per second. For comparison it also reports how many
+senders that throughput covers at a given keying speed: at 20 wpm a sender
+produces about 2 characters per second.
+
+Run from the backend directory:
+    python -m benchmarks.scoring_bench --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app.core import practice, scoring
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# PARIS is 5 characters plus a space per word
+CHARS_PER_WORD = 6
+
+
+def corrupt(rng: random.Random, text: str, error_rate: float, alphabet: str) -> str:
+    out: list[str] = []
+    for char in text:
+        if rng.random() >= error_rate:
+            out.append(char)
+            continue
+        action = rng.choice("sid")
+        if action == "s":
+            out.append(rng.choice(alphabet))
+        elif action == "i":
+            out.extend((char, rng.choice(alphabet)))
+    return "".join(out)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Copy-scoring throughput")
+    parser.add_argument("--lesson", type=int, default=20)
+    parser.add_argument("--drill-length", type=int, default=10, help="Groups per drill")
+    parser.add_argument("--drills", type=int, default=200, help="Distinct drill/copy pairs")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Chance of an error per character")
+    parser.add_argument("--wpm", type=float, default=20.0, help="Keying speed for the senders comparison")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to measure")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/scoring-<time>.json)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    lesson = practice.get_lesson(args.lesson)
+    pairs = []
+    for _ in range(args.drills):
+        text = practice.drill(rng, lesson, "groups", args.drill_length)
+        pairs.append((text, corrupt(rng, text, args.error_rate, lesson.chars)))
+
+    chars = 0
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        expected, actual = pairs[runs % len(pairs)]
+        scoring.align(expected, actual)
+        chars += len(expected)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= args.min_time:
+            break
+
+    cps = chars / elapsed
+    sender_cps = args.wpm * CHARS_PER_WORD / 60
+    results = {
+        "drill_chars": sum(len(e) for e, _ in pairs) / len(pairs),
+        "error_rate": args.error_rate,
+        "us_per_drill": elapsed / runs * 1e6,
+        "chars_scored_per_s": cps,
+        "sender_chars_per_s": sender_cps,
+        "senders_per_core": cps / sender_cps,
+    }
+
+    report = {"benchmark": "scoring", "timestamp": datetime.utcnow().isoformat(), "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"scoring-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    for name, value in results.items():
+        print(f"{name:<22} {value:>14,.2f}")
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+# benchmarks/startup_bench.py
+"""
+Cold start time: importing the app, running its startup, and serving the
+first request, each measured in a fresh interpreter.
+
+Every mode gets one unmeasured start first, so the schema and the admin
+account already exist, as they do on any restart after the first deploy.
+
+Run from the backend directory:
+    python -m benchmarks.startup_bench --runs 5
+    python -m benchmarks.startup_bench --database-url postgresql://...
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).parent / "results"
+BACKEND_DIR = Path(__file__).parent.parent
+
+MODES = {"default": "false", "fast": "true"}
+
+# Runs in the child; the test client is loaded before the clock starts since
+# a real server would not import it
+CHILD = """
+import json, time
+import starlette.testclient
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+with starlette.testclient.TestClient(app) as client:
+    ready = time.perf_counter()
+    status = client.get("/health").status_code
+    answered = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "startup_s": ready - imported,
+    "first_request_s": answered - ready,
+    "status": status,
+}))
+"""
+
+
+def run_child(env: dict[str, str]) -> dict:
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["process_s"] = time.perf_counter() - started
+    return timings
+
+
+def measure(mode: str, database_url: str, runs: int) -> dict:
+    env = {
+        **os.environ,
+        "ENV_FILE": "/dev/null",
+        "BACKEND_DATABASE_URL": database_url,
+        "BACKEND_FAST_START": MODES[mode],
+    }
+    run_child(env)  # Schema and admin account in place
+    samples = [run_child(env) for _ in range(runs)]
+
+    result: dict = {"mode": mode}
+    for key in ("import_s", "startup_s", "first_request_s", "process_s"):
+        values = [sample[key] for sample in samples]
+        result[f"{key[:-2]}_ms"] = {
+            "median": statistics.median(values) * 1000,
+            "min": min(values) * 1000,
+        }
+    return result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold start time of the app")
+    parser.add_argument("--runs", type=int, default=5, help="Measured starts per mode")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=sorted(MODES))
+    parser.add_argument("--database-url", help="Database to start against (default: a fresh SQLite file)")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/startup-<time>.json)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = args.database_url or f"sqlite:///{directory}/startup.db"
+        results = [measure(mode, database_url, args.runs) for mode in args.modes]
+
+    params = {**vars(args), "database_url": args.database_url or "sqlite"}
+    report = {"benchmark": "startup", "timestamp": datetime.utcnow().isoformat(), "params": params, "results": results}
+    output = Path(args.output) if args.output else RESULTS_DIR / f"startup-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+# benchmarks/ws_load.py
+"""
+WebSocket load test for the channel relay.
+
+Starts the app under uvicorn in a subprocess, connects many concurrent
+clients through /channel/random or /channel/{id}, sends paced morse keying
+and reports connect rate, pairing time, relay latency percentiles, server
+CPU per 1k frames and server RSS. Results are written as JSON so runs can
+be compared.
+
+Run from the backend directory:
+    python -m benchmarks.ws_load --clients 2000 --mode random
+    python -m benchmarks.ws_load --clients 2000 --compare benchmarks/results/<old>.json
+
+Thousands of clients need a raised open-file limit (ulimit -n 65536).
+SQLite is used by default; pass --database-url to benchmark against PostgreSQL.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+import websockets
+
+from app.core import morse
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+WORDS = ["CQ", "DE", "QTH", "RST", "599", "NAME", "TNX", "73", "QSL", "WX", "HR", "OM", "FB"]
+
+
+def keying_stream(wpm: float):
+    """Yield (signal, delay_after) pairs like a human sender at `wpm`"""
+    unit = 1.2 / wpm
+    while True:
+        word = random.choice(WORDS)
+        for char in word:
+            for element in morse.encode(char):
+                yield ("•" if element == "." else "-"), unit
+            yield " ", unit * 2  # Completes the 3-unit letter gap
+        yield " ", unit * 4  # Completes the 7-unit word gap
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "p50_ms": at(0.50) * 1000,
+        "p90_ms": at(0.90) * 1000,
+        "p99_ms": at(0.99) * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def process_cpu_seconds(pid: int) -> float | None:
+    """User + system CPU time of a process, from /proc (Linux only)"""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def process_rss_mb(pid: int) -> float | None:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def seed_users(count: int) -> list[tuple[str, str]]:
+    """Insert benchmark users directly and mint their tokens"""
+    from sqlmodel import Session
+
+    from app.core.security import create_access_token
+    from app.db import create_db_and_tables, get_engine
+    from app.models import User
+
+    create_db_and_tables()
+    run_id = uuid.uuid4().hex[:6].upper()
+    users = [
+        # Bench users never log in, so any string will do for the hash
+        User(callsign=f"BENCH{run_id}{i:05d}", hashed_password="x")
+        for i in range(count)
+    ]
+    with Session(get_engine()) as session:
+        session.add_all(users)
+        session.commit()
+        return [(str(user.id), create_access_token({"sub": str(user.id)})) for user in users]
+
+
+class Client:
+    def __init__(self, user_id: str, token: str, url: str) -> None:
+        self.user_id = user_id
+        self.token = token
+        self.url = url
+        self.connect_time: float | None = None
+        self.pairing_time: float | None = None
+        self.latencies: list[float] = []
+        self.received = 0
+        self.sent = 0
+        self.error: str | None = None
+
+
+class Pairing:
+    """Tracks when both members of a channel are in, as seen by the clients"""
+
+    def __init__(self) -> None:
+        self._members: dict[str, set[str]] = {}
+        self._paired: dict[str, asyncio.Event] = {}
+
+    async def joined(self, channel_id: str, user_id: str) -> None:
+        members = self._members.setdefault(channel_id, set())
+        paired = self._paired.setdefault(channel_id, asyncio.Event())
+        members.add(user_id)
+        if len(members) == 2:
+            paired.set()
+        await paired.wait()
+
+
+async def run_client(client: Client, args: argparse.Namespace, pairing: Pairing,
+                     connect_slots: asyncio.Semaphore, start_sending: asyncio.Event) -> None:
+    started = time.perf_counter()
+    try:
+        async with connect_slots:
+            ws = await websockets.connect(f"{client.url}?token={client.token}", open_timeout=30)
+        client.connect_time = time.perf_counter() - started
+
+        async with ws:
+            # Our own user_joined event tells us which channel we landed in
+            while True:
+                message = json.loads(await asyncio.wait_for(ws.recv(), args.pairing_timeout))
+                if message.get("event") == "user_joined" and message["user"]["id"] == client.user_id:
+                    break
+            await asyncio.wait_for(pairing.joined(message["channel_id"], client.user_id), args.pairing_timeout)
+            client.pairing_time = time.perf_counter() - started
+
+            async def receiver():
+                try:
+                    async for raw in ws:
+                        message = json.loads(raw)
+                        if message.get("type") == "morse":
+                            client.received += 1
+                            client.latencies.append(time.perf_counter() - message["sent_at"])
+                except websockets.ConnectionClosed:
+                    pass
+
+            receive_task = asyncio.create_task(receiver())
+            await start_sending.wait()
+
+            stream = keying_stream(args.wpm)
+            for _ in range(args.frames):
+                signal, delay = next(stream)
+                await ws.send(json.dumps({"type": "morse", "signal": signal, "sent_at": time.perf_counter()}))
+                client.sent += 1
+                await asyncio.sleep(0 if args.unpaced else delay)
+
+            # Give the last frames time to arrive before hanging up
+            await asyncio.sleep(1.0)
+            receive_task.cancel()
+    except Exception as e:
+        client.error = f"{type(e).__name__}: {e}"
+
+
+async def run_load(args: argparse.Namespace, ws_url: str, server_pid: int) -> dict:
+    users = seed_users(args.clients)
+
+    if args.mode == "random":
+        urls = [f"{ws_url}/channel/random"] * args.clients
+    else:
+        urls = [f"{ws_url}/channel/{100000 + i // 2}" for i in range(args.clients)]
+
+    clients = [Client(user_id, token, url) for (user_id, token), url in zip(users, urls)]
+    pairing = Pairing()
+    connect_slots = asyncio.Semaphore(args.connect_concurrency)
+    start_sending = asyncio.Event()
+
+    connect_started = time.perf_counter()
+    tasks = [
+        asyncio.create_task(run_client(client, args, pairing, connect_slots, start_sending))
+        for client in clients
+    ]
+
+    # Start keying once every client is paired (or failed)
+    while any(c.pairing_time is None and c.error is None for c in clients):
+        await asyncio.sleep(0.05)
+    connect_elapsed = time.perf_counter() - connect_started
+
+    cpu_before = process_cpu_seconds(server_pid)
+    send_started = time.perf_counter()
+    start_sending.set()
+    await asyncio.gather(*tasks)
+    send_elapsed = time.perf_counter() - send_started
+    cpu_after = process_cpu_seconds(server_pid)
+
+    connected = [c for c in clients if c.connect_time is not None]
+    latencies = [latency for c in clients for latency in c.latencies]
+    received = sum(c.received for c in clients)
+    errors = [c.error for c in clients if c.error]
+
+    cpu_per_1k = None
+    if cpu_before is not None and cpu_after is not None and received:
+        cpu_per_1k = (cpu_after - cpu_before) / received * 1000
+
+    return {
+        "clients": args.clients,
+        "connected": len(connected),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "connect_rate_per_s": len(connected) / connect_elapsed if connect_elapsed else None,
+        "connect_latency": percentiles([c.connect_time for c in connected]),
+        "pairing_time": percentiles([c.pairing_time for c in clients if c.pairing_time is not None]),
+        "frames_sent": sum(c.sent for c in clients),
+        "frames_received": received,
+        "frames_per_s": received / send_elapsed if send_elapsed else None,
+        "relay_latency": percentiles(latencies),
+        "server_cpu_s_per_1k_frames": cpu_per_1k,
+        "server_rss_mb": process_rss_mb(server_pid),
+    }
+
+
+def wait_for_server(server: subprocess.Popen, base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health").status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("Server did not become healthy in time")
+
+
+def compare(current: dict, previous_path: str) -> None:
+    previous = json.loads(Path(previous_path).read_text())["results"]
+    rows = [
+        ("connect_rate_per_s", current["connect_rate_per_s"], previous.get("connect_rate_per_s")),
+        ("pairing p50 ms", current["pairing_time"].get("p50_ms"), previous.get("pairing_time", {}).get("p50_ms")),
+        ("relay p50 ms", current["relay_latency"].get("p50_ms"), previous.get("relay_latency", {}).get("p50_ms")),
+        ("relay p99 ms", current["relay_latency"].get("p99_ms"), previous.get("relay_latency", {}).get("p99_ms")),
+        ("cpu s / 1k frames", current["server_cpu_s_per_1k_frames"], previous.get("server_cpu_s_per_1k_frames")),
+        ("server rss MB", current["server_rss_mb"], previous.get("server_rss_mb")),
+    ]
+    def fmt(value: float | None) -> str:
+        return f"{value:.3f}" if value is not None else "n/a"
+
+    print(f"{'metric':<20} {'previous':>12} {'current':>12} {'change':>9}")
+    for name, now, before in rows:
+        change = f"{(now - before) / before * 100:+.1f}%" if now is not None and before else "n/a"
+        print(f"{name:<20} {fmt(before):>12} {fmt(now):>12} {change:>9}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="WebSocket relay load test")
+    parser.add_argument("--clients", type=int, default=200, help="Concurrent clients (an even number)")
+    parser.add_argument("--mode", choices=["random", "direct"], default="random")
+    parser.add_argument("--frames", type=int, default=100, help="Frames each client sends")
+    parser.add_argument("--wpm", type=float, default=20.0, help="Keying speed")
+    parser.add_argument("--unpaced", action="store_true", help="Send frames back to back")
+    parser.add_argument("--connect-concurrency", type=int, default=200)
+    parser.add_argument("--pairing-timeout", type=float, default=60.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--database-url", help="Defaults to a temporary SQLite file")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/ws_load-<time>.json)")
+    parser.add_argument("--compare", help="Previous result file to compare against")
+    args = parser.parse_args(argv)
+
+    database_url = args.database_url or (
+        f"sqlite:///{tempfile.mkdtemp()}/bench.db?check_same_thread=false"
+    )
+    # The benchmark process seeds users and mints tokens with the same settings as the server
+    os.environ["BACKEND_DATABASE_URL"] = database_url
+    os.environ.setdefault("ENV_FILE", os.devnull)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    ws_url = f"ws://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        wait_for_server(server, base_url)
+        results = asyncio.run(run_load(args, ws_url, server.pid))
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    report = {
+        "benchmark": "ws_load",
+        "timestamp": datetime.utcnow().isoformat(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "results": results,
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"ws_load-{datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -72,5 +72,5 @@ mypy . --no-error-summary || echo "MyPy found type issues"
 echo "Starting uvicorn (checks will run on each reload via app startup)..."
 
 
-# Start uvicorn (we're already in backend directory)
-uvicorn app.main:app --reload --port $BACKEND_APP_PORT
\ No newline at end of file
+# Start uvicorn (we're already in backend directory), with the WebSocket message limit the relay expects
+python -m app.cli serve --reload --port $BACKEND_APP_PORT
\ No newline at end of file
@@ -1,7 +1,10 @@
 # tests/conftest.py
 """Shared test fixtures and configuration"""
+import asyncio
 import sys
+import uuid
 from pathlib import Path
+from unittest.mock import AsyncMock
 
 # Add the backend directory to Python path
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -11,8 +14,27 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session, SQLModel, create_engine
 from sqlmodel.pool import StaticPool
 
+from app.config import settings
+from app.core.connection import MorseConnection
+from app.core.connection_manager import manager
+from app.core.ratelimit import auth_store
 from app.dep import get_db_session
 from app.main import app
+from app.models import User
+from app.routes.user import hash_password
+
+
+def make_connection(callsign: str) -> MorseConnection:
+    """A connection for a new user `callsign` on a mock socket"""
+    return MorseConnection(AsyncMock(), User(id=uuid.uuid4(), callsign=callsign, hashed_password="hash"))
+
+
+@pytest.fixture(autouse=True)
+def clean_manager():
+    """Start and end every test with no channels in the shared connection manager"""
+    manager.clear()
+    yield
+    manager.clear()
 
 
 @pytest.fixture(scope="function")
@@ -33,14 +55,57 @@ def session():
 
 
 @pytest.fixture(scope="function")
-def client(session: Session):
+def client(session: Session, monkeypatch):
     """Create test client with dependency override"""
     def get_session_override():
         return session
 
     app.dependency_overrides[get_db_session] = get_session_override
+    # Every test logs in and registers from the same client address
+    asyncio.run(auth_store.clear())
+    # Connections a test leaves in the manager are closed at shutdown, not waited for
+    monkeypatch.setattr(settings, "drain_deadline", 0.0)
 
     with TestClient(app) as client:
         yield client
 
-    app.dependency_overrides.clear()
\ No newline at end of file
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def admin_user(session: Session):
+    """Create the default admin user"""
+    user = User(callsign="admin", hashed_password=hash_password("adminpass"))
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+@pytest.fixture
+def admin_headers(client: TestClient, admin_user):
+    """Get auth headers for the admin user"""
+    response = client.post("/auth/login", json={
+        "callsign": "admin",
+        "password": "adminpass"
+    })
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def callsigns() -> tuple[str, ...]:
+    """Users registered by `tokens`; override in a module to name them"""
+    return ("PLAYER1", "PLAYER2")
+
+
+@pytest.fixture
+def tokens(client: TestClient, session: Session, callsigns: tuple[str, ...]) -> list[str]:
+    """Access tokens for freshly registered `callsigns`, in order"""
+    result = []
+    for callsign in callsigns:
+        session.add(User(callsign=callsign, hashed_password=hash_password("password123")))
+        session.commit()
+        response = client.post("/auth/login", json={"callsign": callsign, "password": "password123"})
+        result.append(response.json()["access_token"])
+    return result
@@ -0,0 +1,200 @@
+# tests/test_audio.py
+import io
+import json
+import wave
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core import audio, morse
+from app.core.audio import ToneParams
+from app.models import User
+from app.routes.user import hash_password
+
+
+def samples_for(text: str, params: ToneParams) -> int:
+    """Expected sample count from the nominal timing"""
+    unit = morse.unit_from_wpm(params.wpm)
+    return sum(int(params.sample_rate * abs(d) / 1000) for d in morse.text_to_timings(text, unit))
+
+
+class TestRendering:
+    """Test PCM rendering from cached buffers"""
+
+    def test_length_matches_timing(self):
+        """Test the PCM is as long as the keying it represents"""
+        params = ToneParams(wpm=20)
+        pcm = audio.render_pcm("PARIS PARIS", params)
+        assert len(pcm) == samples_for("PARIS PARIS", params) * audio.SAMPLE_WIDTH
+
+    def test_pcm_length_without_rendering(self):
+        """Test the predicted size matches the rendered size"""
+        params = ToneParams(wpm=25, farnsworth_wpm=10)
+        text = "CQ CQ DE DL1ABC K"
+        assert audio.pcm_length(text, params) == len(b"".join(audio.iter_pcm(text, params)))
+
+    def test_farnsworth_stretches_gaps_only(self):
+        """Test Farnsworth timing keeps the elements and lengthens the gaps"""
+        plain = audio.tone_set(ToneParams(wpm=20))
+        slow = audio.tone_set(ToneParams(wpm=20, farnsworth_wpm=10))
+        assert slow.dit == plain.dit
+        assert slow.element_gap == plain.element_gap
+        assert len(slow.letter_gap) > len(plain.letter_gap)
+        assert len(slow.word_gap) > len(plain.word_gap)
+
+    def test_farnsworth_overall_speed(self):
+        """Test PARIS at Farnsworth spacing takes one minute per overall-speed words"""
+        params = ToneParams(wpm=20, farnsworth_wpm=10, sample_rate=8000)
+        # Ten PARIS words followed by a word gap make exactly one minute at 10 wpm
+        pcm = audio.render_pcm(" ".join(["PARIS"] * 10), params)
+        seconds = (len(pcm) + len(audio.tone_set(params).word_gap)) / audio.SAMPLE_WIDTH / params.sample_rate
+        assert seconds == pytest.approx(60, rel=0.01)
+
+    def test_envelope(self):
+        """Test tones start and end silent and stay within range"""
+        tones = audio.tone_set(ToneParams(volume=1.0))
+        dit = memoryview(tones.dit).cast("h")
+        assert dit[0] == 0
+        assert abs(dit[-1]) < 100
+        assert max(abs(s) for s in dit) <= audio.MAX_AMPLITUDE
+
+    def test_tone_buffers_are_cached(self):
+        """Test building blocks are rendered once per parameter set"""
+        assert audio.tone_set(ToneParams(frequency=700)) is audio.tone_set(ToneParams(frequency=700))
+
+    def test_phrases_are_cached(self):
+        """Test repeated phrases are served from the phrase cache"""
+        params = ToneParams(frequency=650)
+        first = audio.render_pcm("TEST", params)
+        assert audio.render_pcm("TEST", params) is first
+
+    def test_phrase_cache_bounded_by_bytes(self):
+        """Test the phrase cache evicts the oldest phrases to stay under its byte limit"""
+        cache = audio.PhraseCache(max_bytes=100)
+        params = ToneParams()
+        cache.put(("A", params), bytes(40))
+        cache.put(("B", params), bytes(40))
+        assert cache.get(("A", params)) is not None
+        cache.put(("C", params), bytes(40))
+
+        assert cache.get(("B", params)) is None
+        assert cache.get(("A", params)) is not None
+        assert (len(cache), cache.size) == (2, 80)
+
+        cache.put(("D", params), bytes(101))
+        assert cache.get(("D", params)) is None
+        assert cache.size == 80
+
+    def test_long_text_streams_by_word(self, monkeypatch):
+        """Test text over the cache limit is streamed in chunks with a correct header"""
+        monkeypatch.setattr(audio.settings, "audio_cache_max_chars", 5)
+        params = ToneParams()
+        chunks = list(audio.iter_audio("CQ CQ DE DL1ABC", params))
+        assert len(chunks) == 5  # Header and one chunk per word
+
+        with wave.open(io.BytesIO(b"".join(chunks))) as wav:
+            assert wav.getnframes() == samples_for("CQ CQ DE DL1ABC", params)
+
+
+class TestAudioEndpoint:
+    """Test the audio endpoints"""
+
+    def test_wav(self, client: TestClient, sender):
+        """Test text renders to a valid WAV file"""
+        response = client.get(
+            "/morse/audio", params={"text": "SOS", "wpm": 15, "sample_rate": 16000}, headers=auth(client, sender)
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "audio/wav"
+        with wave.open(io.BytesIO(response.content)) as wav:
+            assert wav.getnchannels() == 1
+            assert wav.getsampwidth() == 2
+            assert wav.getframerate() == 16000
+            assert wav.getnframes() == samples_for("SOS", ToneParams(wpm=15, sample_rate=16000))
+
+    def test_pcm(self, client: TestClient, sender):
+        """Test raw PCM has no header"""
+        response = client.get("/morse/audio", params={"text": "E", "format": "pcm"}, headers=auth(client, sender))
+
+        assert response.status_code == 200
+        assert len(response.content) == samples_for("E", ToneParams()) * 2
+
+    def test_invalid_params(self, client: TestClient, sender):
+        """Test out-of-range parameters are rejected"""
+        headers = auth(client, sender)
+        assert client.get("/morse/audio", params={"text": "E", "wpm": 500}, headers=headers).status_code == 422
+        assert client.get("/morse/audio", params={"text": "E", "sample_rate": 100}, headers=headers).status_code == 422
+        assert client.get("/morse/audio", headers=headers).status_code == 422
+
+    def test_duration_limit(self, client: TestClient, sender, monkeypatch):
+        """Test text that would render too long is refused before rendering"""
+        monkeypatch.setattr(audio.settings, "audio_max_seconds", 5.0)
+        headers = auth(client, sender)
+        assert client.get("/morse/audio", params={"text": "E"}, headers=headers).status_code == 200
+        response = client.get("/morse/audio", params={"text": "PARIS " * 10}, headers=headers)
+        assert response.status_code == 422
+
+    def test_requires_auth(self, client: TestClient):
+        """Test anonymous clients cannot render audio"""
+        assert client.get("/morse/audio", params={"text": "E"}).status_code == 401
+
+
+@pytest.fixture
+def sender(session: Session):
+    user = User(callsign="AUDIO1", hashed_password=hash_password("password123"))
+    session.add(user)
+    session.commit()
+    return user
+
+
+@pytest.fixture
+def listener(session: Session):
+    user = User(callsign="AUDIO2", hashed_password=hash_password("password123"))
+    session.add(user)
+    session.commit()
+    return user
+
+
+def login(client: TestClient, callsign: str) -> str:
+    response = client.post("/auth/login", json={"callsign": callsign, "password": "password123"})
+    return response.json()["access_token"]
+
+
+def auth(client: TestClient, user: User) -> dict:
+    return {"Authorization": f"Bearer {login(client, user.callsign)}"}
+
+
+class TestChannelAudio:
+    """Test rendering a channel transcript"""
+
+    @pytest.mark.timeout(10)
+    def test_renders_partner_transcript(self, client: TestClient, sender, listener):
+        """Test the listener gets audio of what the sender keyed"""
+        token1, token2 = login(client, "AUDIO1"), login(client, "AUDIO2")
+
+        with client.websocket_connect(f"/channel/123456?token={token1}") as ws1:
+            ws1.receive_json()
+            with client.websocket_connect(f"/channel/123456?token={token2}") as ws2:
+                ws2.receive_json()
+                ws1.receive_json()
+
+                for signal in ["•", "•", "•", " "]:
+                    ws1.send_text(json.dumps({"type": "morse", "signal": signal}))
+                    ws2.receive_json()
+                assert ws2.receive_json()["text"] == "S"
+
+                response = client.get(
+                    "/morse/audio/channel/123456",
+                    params={"format": "pcm"},
+                    headers={"Authorization": f"Bearer {token2}"},
+                )
+                assert response.status_code == 200
+                assert response.content == audio.render_pcm("S", ToneParams())
+
+    def test_not_in_channel(self, client: TestClient, sender):
+        """Test users can only render channels they are in"""
+        token = login(client, "AUDIO1")
+        response = client.get("/morse/audio/channel/123456", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 404
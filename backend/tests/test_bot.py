@@ -0,0 +1,177 @@
+# tests/test_bot.py
+import asyncio
+import json
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core import bot as bot_module
+from app.core.bot import MorseBot
+from app.core.channel import Channel
+from app.core.connection_manager import manager
+from app.core.heartbeat import heartbeat
+from app.models import User
+from app.routes.user import hash_password
+from tests.conftest import make_connection
+
+
+async def wait_for(condition, timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "Timed out"
+        await asyncio.sleep(0.01)
+
+
+class TestMorseBot:
+    """Test bots keying and answering through a channel"""
+
+    @pytest.mark.asyncio
+    async def test_key_decodes_on_the_other_side(self):
+        """Test keyed text is decoded by the channel like a human sender's"""
+        channel = Channel(channel_id="123456")
+        sender = MorseBot(channel, callsign="ALPHA", speedup=1000)
+        listener = MorseBot(channel, callsign="BRAVO")
+        channel.add_user(sender)
+        channel.add_user(listener)
+
+        await sender.key("CQ DE ALPHA K")
+
+        assert sender.timing.text == "CQ DE ALPHA K "
+        assert sender.timing.wpm == pytest.approx(15)
+        frames = []
+        while not listener.websocket.inbox.empty():
+            frames.append(listener.websocket.inbox.get_nowait())
+        decoded = "".join(f["text"] for f in frames if f.get("event") == "decoded")
+        assert decoded == "CQ DE ALPHA K "
+
+    @pytest.mark.asyncio
+    async def test_qso(self):
+        """Test a calling bot and an answering bot complete a QSO and call again"""
+        channel = Channel(channel_id="123456")
+        caller = MorseBot(channel, callsign="ALPHA", wpm=30, calls_cq=True, repeat=True, speedup=1000,
+                          rng=random.Random(1))
+        answerer = MorseBot(channel, callsign="BRAVO", wpm=30, speedup=1000, rng=random.Random(2))
+        channel.add_user(caller)
+        channel.add_user(answerer)
+
+        tasks = [asyncio.create_task(b.run()) for b in (caller, answerer)]
+        try:
+            await wait_for(lambda: caller.timing.text.count("CQ CQ DE ALPHA") == 2)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert "ALPHA DE BRAVO BRAVO K" in answerer.timing.text
+        assert f"NAME {answerer.name}" in answerer.timing.text
+        assert "73 DE ALPHA SK" in caller.timing.text
+        assert "73 DE BRAVO SK" in answerer.timing.text
+
+    @pytest.mark.asyncio
+    async def test_matches_partner_speed(self):
+        """Test the bot keys at the partner's estimated speed, within limits"""
+        channel = Channel(channel_id="123456")
+        bot = MorseBot(channel)
+        assert bot.wpm == bot_module.DEFAULT_WPM
+        bot.partner_wpm = 12
+        assert bot.wpm == 12
+        bot.partner_wpm = 80
+        assert bot.wpm == bot_module.MAX_WPM
+
+    @pytest.mark.asyncio
+    async def test_replies_after_idle(self):
+        """Test the bot answers an over that never ends with K once the partner goes quiet"""
+        channel = Channel(channel_id="123456")
+        bot = MorseBot(channel, callsign="BRAVO", speedup=1000)
+        human = MorseBot(channel, callsign="HUMAN")
+        channel.add_user(bot)
+        channel.add_user(human)
+
+        task = asyncio.create_task(bot.run())
+        try:
+            for signal in ["-", "•", "-", "•", " ", "-", "-", "•", "-", " ", " "]:
+                await channel.relay_message(json.dumps({"type": "morse", "signal": signal}), human)
+            await wait_for(lambda: bot.timing.text.endswith(" K "))
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        assert bot.timing.text == "HUMAN DE BRAVO BRAVO K "
+
+
+@pytest.fixture
+def learner(session: Session):
+    user = User(callsign="LEARNER", hashed_password=hash_password("password123"))
+    session.add(user)
+    session.commit()
+    return user
+
+
+class TestRandomChannelBot:
+    """Test /channel/random?bot=true"""
+
+    @pytest.mark.timeout(10)
+    def test_bot_joins_and_answers(self, client: TestClient, learner):
+        """Test a bot fills the empty slot and answers a CQ"""
+        token = client.post("/auth/login", json={"callsign": "LEARNER", "password": "password123"}).json()["access_token"]
+
+        async def no_wait(self, seconds):
+            await asyncio.sleep(0)
+
+        with patch.object(MorseBot, "sleep", no_wait):
+            with client.websocket_connect(f"/channel/random?bot=true&token={token}") as ws:
+                assert ws.receive_json()["user"]["callsign"] == "LEARNER"
+                joined = ws.receive_json()
+                assert joined["event"] == "user_joined"
+                bot_callsign = joined["user"]["callsign"]
+                assert bot_callsign.startswith("BOT")
+
+                for signal in ["-", "•", "-", "•", " ", "-", "-", "•", "-", " ", " ", "-", "•", "-", " ", " "]:
+                    ws.send_text(json.dumps({"type": "morse", "signal": signal}))
+
+                heard = ""
+                while not heard.endswith(" K "):
+                    message = ws.receive_json()
+                    if message.get("event") == "decoded" and message["user_id"] != str(learner.id):
+                        heard += message["text"]
+
+        assert heard == f"LEARNER DE {bot_callsign} {bot_callsign} K "
+
+    @pytest.mark.timeout(10)
+    def test_human_takes_the_slot_first(self, client: TestClient, learner, monkeypatch):
+        """Test a human joining before the bot is started becomes the partner instead"""
+        token = client.post("/auth/login", json={"callsign": "LEARNER", "password": "password123"}).json()["access_token"]
+        human = make_connection("HUMAN")
+        add = heartbeat.add
+
+        def add_then_join(connection, channel_id):
+            # Runs right after accept, before the bot is started
+            add(connection, channel_id)
+            if connection.user.id == learner.id:
+                manager.connect(human, channel_id)
+
+        monkeypatch.setattr(heartbeat, "add", add_then_join)
+        with client.websocket_connect(f"/channel/random?bot=true&token={token}") as ws:
+            assert ws.receive_json()["user"]["callsign"] == "LEARNER"
+            channel = manager.get_user_channel(learner.id)
+            assert [c.user.callsign for c in channel.user_connections] == ["LEARNER", "HUMAN"]
+            # The session carries on with the human as partner
+            ws.send_text(json.dumps({"type": "morse", "signal": "-"}))
+            deadline = time.monotonic() + 5
+            while {"type": "morse", "signal": "-"} not in [c.args[0] for c in human.websocket.send_json.await_args_list]:
+                assert time.monotonic() < deadline, "Timed out"
+                time.sleep(0.01)
+        assert not bot_module._tasks
+
+    @pytest.mark.timeout(10)
+    def test_no_bot_by_default(self, client: TestClient, learner):
+        token = client.post("/auth/login", json={"callsign": "LEARNER", "password": "password123"}).json()["access_token"]
+        with client.websocket_connect(f"/channel/random?token={token}") as ws:
+            ws.receive_json()
+            channel = manager.get_user_channel(learner.id)
+            assert channel.user_count == 1
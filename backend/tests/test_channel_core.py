@@ -213,6 +213,21 @@ class TestChannel:
         expected = {"type": "morse", "signal": "dot"}
         mock_websocket2.send_json.assert_called_once_with(expected)
 
+    @pytest.mark.asyncio
+    async def test_relay_message_decodes_keying(self, connection1, connection2, mock_websocket1, mock_websocket2):
+        """Test completed characters are broadcast to both users"""
+        channel = Channel(channel_id="123456")
+        channel.add_user(connection1)
+        channel.add_user(connection2)
+
+        for signal in ["•", "-", " "]:
+            await channel.relay_message(json.dumps({"type": "morse", "signal": signal}), connection1)
+
+        decoded = {"event": "decoded", "user_id": str(connection1.user.id), "text": "A", "wpm": None}
+        mock_websocket1.send_json.assert_called_once_with(decoded)
+        mock_websocket2.send_json.assert_called_with(decoded)
+        assert connection1.timing.text == "A"
+
     @pytest.mark.asyncio
     async def test_relay_message_text(self, connection1, connection2, mock_websocket2):
         """Test relaying plain text message"""
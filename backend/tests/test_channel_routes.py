@@ -8,7 +8,6 @@ from fastapi.testclient import TestClient
 from sqlmodel import Session
 from starlette.websockets import WebSocketDisconnect
 
-from app.core.connection_manager import manager as real_manager
 from app.models import User
 from app.routes.user import hash_password
 
@@ -65,17 +64,6 @@ def auth_headers1(auth_token1):
     return {"Authorization": f"Bearer {auth_token1}"}
 
 
-@pytest.fixture(autouse=True)
-def clear_manager():
-    """Clear the connection manager before each test"""
-    real_manager.channels.clear()
-    real_manager._user_channels.clear()
-    yield
-    # Clean up after test
-    real_manager.channels.clear()
-    real_manager._user_channels.clear()
-
-
 class TestChannelList:
     """Test the channel list endpoint"""
 
@@ -1,9 +1,11 @@
 # tests/test_connection_manager.py
+import random
 import uuid
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from app.core.channel_ids import ChannelIdAllocator, ChannelIdsExhausted
 from app.core.connection import MorseConnection
 from app.core.connection_manager import (
     ChannelFull,
@@ -185,6 +187,57 @@ class TestConnectionManager:
         assert mock_user1 in active
         assert mock_user2 in active
 
+    def test_active_users_follow_disconnects(self, manager, connection1, connection2, mock_user1, mock_user2):
+        """The active-user index drops users as they leave"""
+        manager.connect(connection1, "123456")
+        manager.connect(connection2, "123456")
+        manager.disconnect(connection1, "123456")
+        assert manager.active_users == [mock_user2]
+
+        manager.disconnect(connection2, "123456")
+        assert manager.active_users == []
+
+    def test_filter_active(self, manager, connection1, connection2, mock_user1, mock_user2):
+        """Bulk membership keeps the ids as given, with each user's channel"""
+        manager.connect(connection1, "123456")
+        manager.connect(connection2, "654321")
+        missing = uuid.uuid4()
+
+        active = manager.filter_active([mock_user1.id, missing, str(mock_user2.id)])
+        assert active == {mock_user1.id: manager.channels["123456"], str(mock_user2.id): manager.channels["654321"]}
+        assert manager.filter_active([]) == {}
+
+    def test_snapshot_versions(self, manager, connection1, connection2, mock_user1):
+        """Snapshots are reused until someone joins or leaves"""
+        empty = manager.snapshot()
+        assert dict(empty.channels) == {}
+
+        manager.connect(connection1, "123456")
+        first = manager.snapshot()
+        assert first.version > empty.version
+        assert dict(first.channels) == {str(mock_user1.id): "123456"}
+        assert manager.snapshot() is first
+        with pytest.raises(TypeError):
+            first.channels["someone"] = "111111"
+
+        manager.connect(connection2, "123456")
+        manager.disconnect(connection2, "123456")
+        second = manager.snapshot()
+        assert second.version > first.version
+        assert second.channels == first.channels
+
+    def test_clear(self, manager, connection1):
+        """Clearing forgets everything and moves the version on"""
+        channel_id = manager.create_random_channel()
+        manager.connect(connection1, channel_id)
+        version = manager.version
+        manager.clear()
+
+        assert manager.channels == {} and manager.active_users == []
+        assert not manager.is_user_active(connection1.user.id)
+        assert len(manager._ids) == 0
+        assert manager.version > version
+
     def test_find_random_waiting_channel(self, manager, connection1, connection2):
         """Test finding channel with one waiting user"""
         # No channels
@@ -279,7 +332,59 @@ class TestConnectionManager:
         assert channels[0].is_full is True
         assert len(channels[0].users) == 2
 
+    def test_random_channel_ids_released(self, manager, connection1, mock_user1):
+        """IDs go back to the allocator when their channel closes or is never opened"""
+        channel_id = manager.create_random_channel()
+        assert channel_id in manager._ids
+        manager.connect(connection1, channel_id)
+        manager.disconnect(connection1, channel_id)
+        assert channel_id not in manager._ids
+
+        manager.connect(connection1, "123456")
+        assert "123456" in manager._ids
+        unused = manager.create_random_channel()
+        with pytest.raises(UserAlreadyActive):
+            manager.connect(MorseConnection(AsyncMock(), mock_user1), unused)
+        assert unused not in manager._ids
+        assert len(manager._ids) == 1
+
     def test_manager_singleton(self):
         """Test that we can import the singleton instance"""
         from app.core.connection_manager import manager
         assert isinstance(manager, ConnectionManager)
+
+
+class TestChannelIdAllocator:
+    """Test the lazily shuffled channel ID allocator"""
+
+    def test_allocates_every_id_once(self):
+        ids = ChannelIdAllocator(low=100, high=199, rng=random.Random(1))
+        allocated = [ids.allocate() for _ in range(100)]
+
+        assert sorted(allocated) == [str(i) for i in range(100, 200)]
+        assert allocated != sorted(allocated)
+        with pytest.raises(ChannelIdsExhausted):
+            ids.allocate()
+
+    def test_claim_and_release(self):
+        ids = ChannelIdAllocator(low=100, high=109)
+        assert ids.claim("105")
+        assert not ids.claim("105")
+        assert not ids.claim("99")
+        assert not ids.claim("abc")
+        assert "105" in ids
+
+        assert "105" not in {ids.allocate() for _ in range(9)}
+        assert ids.release("105")
+        assert not ids.release("105")
+        assert ids.allocate() == "105"
+
+    def test_state_follows_ids_in_use(self):
+        ids = ChannelIdAllocator(rng=random.Random(2))
+        allocated = [ids.allocate() for _ in range(1000)]
+        assert len(ids._slot_ids) <= 2 * len(allocated)
+
+        for channel_id in allocated:
+            assert ids.release(channel_id)
+        assert len(ids) == 0
+        assert ids._slot_ids == {} and ids._id_slots == {}
@@ -0,0 +1,172 @@
+# tests/test_drain.py
+import asyncio
+import signal
+import time
+
+import pytest
+import uvicorn
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.config import settings
+from app.core.connection import MorseConnection
+from app.core.connection_manager import manager
+from app.core.drain import Drainer, DrainingServer, drainer
+from app.core.metrics import DRAIN_CLOSED
+from tests.conftest import make_connection
+
+
+@pytest.fixture(autouse=True)
+def reset_drainer():
+    yield
+    drainer.reset()
+
+
+def fill_channels(count: int) -> list[MorseConnection]:
+    """`count` full channels of connections with mock sockets"""
+    connections = []
+    for n in range(count):
+        for side in "AB":
+            connection = make_connection(f"{side}{n}")
+            manager.connect(connection, f"{100000 + n}")
+            connections.append(connection)
+    return connections
+
+
+def drained_events(connection: MorseConnection) -> list[dict]:
+    return [
+        call.args[0] for call in connection.websocket.send_json.await_args_list
+        if call.args[0].get("event") == "server_draining"
+    ]
+
+
+class TestDrainer:
+    """Test notifying, waiting and closing"""
+
+    def test_closes_leftovers_at_deadline(self):
+        connections = fill_channels(2)
+        closed = DRAIN_CLOSED.value()
+
+        asyncio.run(Drainer(stagger=0, flush_timeout=0.1).drain(0.2))
+
+        for connection in connections:
+            assert len(drained_events(connection)) == 1
+            assert connection.websocket.close.await_args.kwargs["code"] == 1012
+        assert DRAIN_CLOSED.value() == closed + 4
+
+    def test_finishes_early_once_everyone_left(self):
+        connections = fill_channels(2)
+        for connection in connections:
+            def leave(message, connection=connection):
+                # The client closes its socket a moment later
+                channel_id = manager.get_user_channel(connection.user.id).channel_id
+                asyncio.get_running_loop().call_soon(manager.disconnect, connection, channel_id)
+            connection.websocket.send_json.side_effect = leave
+
+        started = time.monotonic()
+        asyncio.run(Drainer(stagger=0, flush_timeout=0.1).drain(10))
+
+        assert time.monotonic() - started < 1
+        for connection in connections:
+            connection.websocket.close.assert_not_awaited()
+
+    def test_notifies_in_waves(self):
+        connections = fill_channels(4)
+        sent_at = {}
+        for connection in connections:
+            def record(message, connection=connection):
+                sent_at[connection.user.callsign] = time.monotonic()
+                channel_id = manager.get_user_channel(connection.user.id).channel_id
+                asyncio.get_running_loop().call_soon(manager.disconnect, connection, channel_id)
+            connection.websocket.send_json.side_effect = record
+
+        started = time.monotonic()
+        # Two waves half a second apart
+        asyncio.run(Drainer(stagger=1.0, flush_timeout=0).drain(3))
+
+        offsets = {callsign: at - started for callsign, at in sent_at.items()}
+        assert len(offsets) == 8
+        # Partners hear it together
+        assert offsets["A0"] < 0.2 and offsets["B0"] < 0.2
+        assert offsets["A1"] < 0.2 and offsets["B1"] < 0.2
+        assert 0.4 < offsets["A2"] < 1.0 and 0.4 < offsets["B3"] < 1.0
+
+    def test_waits_for_inflight_relays(self):
+        connection = fill_channels(1)[0]
+
+        async def scenario() -> float:
+            drain = Drainer(stagger=0, flush_timeout=5)
+            drain.inflight = 1
+            asyncio.get_running_loop().call_later(0.3, setattr, drain, "inflight", 0)
+            started = time.monotonic()
+            await drain.drain(0)
+            return time.monotonic() - started
+
+        elapsed = asyncio.run(scenario())
+        assert 0.3 <= elapsed < 2
+        assert connection.websocket.close.await_args.kwargs["code"] == 1012
+
+
+class TestDrainingServer:
+    """Test draining on the signal that stops the server"""
+
+    def test_drains_before_uvicorn_closes_sockets(self, monkeypatch):
+        connections = fill_channels(1)
+        seen_by_uvicorn = []
+
+        async def uvicorn_shutdown(*_):
+            # uvicorn would close every socket here
+            seen_by_uvicorn.append([len(drained_events(c)) for c in connections])
+
+        monkeypatch.setattr(uvicorn.Server, "shutdown", uvicorn_shutdown)
+        monkeypatch.setattr(settings, "drain_deadline", 0.2)
+        monkeypatch.setattr(drainer, "stagger", 0)
+        server = DrainingServer(uvicorn.Config("app.main:app"))
+        server.handle_exit(signal.SIGTERM, None)
+
+        asyncio.run(server.shutdown())
+        assert seen_by_uvicorn == [[1, 1]]
+        assert connections[0].websocket.close.await_args.kwargs["code"] == 1012
+
+
+class TestDrainRoutes:
+    """Test the admin endpoint and the channel sockets while draining"""
+
+    @pytest.mark.timeout(10)
+    def test_refuses_joins_while_draining(self, client: TestClient, admin_headers, tokens):
+        response = client.post("/admin/drain?deadline=5", headers=admin_headers)
+        assert response.status_code == 202
+        assert response.json()["draining"] is True
+        assert client.get("/health").status_code == 503
+
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws:
+                ws.receive_json()
+        assert exc_info.value.code == 1013
+
+        response = client.delete("/admin/drain", headers=admin_headers)
+        assert response.json() == {"draining": False, "remaining": None, "connections": 0}
+        assert client.get("/health").status_code == 200
+
+    @pytest.mark.timeout(10)
+    def test_connected_clients_are_told_to_move(self, client: TestClient, admin_headers, tokens):
+        with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws1:
+            ws1.receive_json()
+            with client.websocket_connect(f"/channel/123456?token={tokens[1]}") as ws2:
+                ws2.receive_json()
+                ws1.receive_json()
+
+                client.post("/admin/drain?deadline=5", headers=admin_headers)
+                for ws in (ws1, ws2):
+                    event = ws.receive_json()
+                    assert event["event"] == "server_draining"
+                    assert 0 < event["deadline"] <= 5
+
+        status = client.get("/admin/drain", headers=admin_headers).json()
+        assert status["draining"] is True
+        assert status["connections"] == 0
+
+    def test_admin_only(self, client: TestClient, tokens):
+        response = client.post("/admin/drain", headers={"Authorization": f"Bearer {tokens[0]}"})
+        assert response.status_code == 403
+        assert not drainer.draining
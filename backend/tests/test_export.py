@@ -0,0 +1,125 @@
+# tests/test_export.py
+import gzip
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.cli import main as cli_main
+from app.core.export import gzip_chunks, iter_follows, iter_users, ndjson_chunks
+from app.models import Follow, User
+
+
+@pytest.fixture
+def many_users(session: Session):
+    """Create a handful of users with follows between them"""
+    users = [User(callsign=f"EXPORT{i:02d}", hashed_password="hashed") for i in range(7)]
+    session.add_all(users)
+    session.commit()
+    for user in users:
+        session.refresh(user)
+
+    for follower, followed in zip(users, users[1:]):
+        session.add(Follow(follower_id=follower.id, followed_id=followed.id))
+    session.commit()
+    return users
+
+
+class TestExportIterators:
+    """Test the keyset-paginated export iterators"""
+
+    def test_iter_users_batches_cover_all_rows(self, session: Session, many_users):
+        """Test small batches still return every user exactly once, in id order"""
+        records = list(iter_users(session, batch_size=2))
+
+        assert len(records) == len(many_users)
+        ids = [record["id"] for record in records]
+        assert ids == sorted(ids)
+        assert "hashed_password" not in records[0]
+
+    def test_iter_users_resume_from_cursor(self, session: Session, many_users):
+        """Test resuming after a cursor yields only the remaining users"""
+        records = list(iter_users(session, batch_size=3))
+        resumed = list(iter_users(session, cursor=records[2]["id"], batch_size=3))
+
+        assert resumed == records[3:]
+
+    def test_iter_follows_resume_from_cursor(self, session: Session, many_users):
+        """Test resuming the follow export after a composite cursor"""
+        records = list(iter_follows(session, batch_size=2))
+        assert len(records) == len(many_users) - 1
+
+        cursor = (records[1]["follower_id"], records[1]["followed_id"])
+        resumed = list(iter_follows(session, cursor=cursor, batch_size=2))
+        assert resumed == records[2:]
+
+    def test_gzip_chunks_round_trip(self):
+        """Test gzipped NDJSON decompresses to the plain stream"""
+        records = [{"n": i} for i in range(10)]
+        plain = b"".join(ndjson_chunks(records, lines_per_chunk=3))
+        compressed = b"".join(gzip_chunks(ndjson_chunks(records, lines_per_chunk=3)))
+
+        assert gzip.decompress(compressed) == plain
+        assert [json.loads(line) for line in plain.splitlines()] == records
+
+
+class TestExportRoutes:
+    """Test the admin export endpoints"""
+
+    def test_export_users(self, client: TestClient, admin_headers, many_users):
+        """Test exporting users as NDJSON"""
+        response = client.get("/admin/export/users", headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        callsigns = {line["callsign"] for line in lines}
+        assert callsigns == {"admin"} | {user.callsign for user in many_users}
+
+    def test_export_users_gzip(self, client: TestClient, admin_headers, many_users):
+        """Test exporting users gzip-compressed"""
+        response = client.get("/admin/export/users?gzip=true", headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.text.splitlines()) == len(many_users) + 1
+
+    def test_export_follows_with_cursor(self, client: TestClient, admin_headers, many_users):
+        """Test resuming the follow export through the API"""
+        response = client.get("/admin/export/follows", headers=admin_headers)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        cursor = f"{lines[0]['follower_id']}:{lines[0]['followed_id']}"
+
+        response = client.get(f"/admin/export/follows?cursor={cursor}", headers=admin_headers)
+        assert [json.loads(line) for line in response.text.splitlines()] == lines[1:]
+
+    def test_export_follows_invalid_cursor(self, client: TestClient, admin_headers):
+        """Test a malformed follow cursor is rejected"""
+        response = client.get("/admin/export/follows?cursor=nope", headers=admin_headers)
+        assert response.status_code == 422
+
+    def test_export_requires_admin(self, client: TestClient, many_users):
+        """Test non-admin users cannot export"""
+        client.post("/users/", json={"callsign": "NOTADMIN", "password": "password123"})
+        token = client.post("/auth/login", json={
+            "callsign": "NOTADMIN",
+            "password": "password123"
+        }).json()["access_token"]
+
+        response = client.get("/admin/export/users", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 403
+
+
+class TestExportCli:
+    """Test the export CLI command"""
+
+    def test_cli_export_users(self, session: Session, many_users, tmp_path, monkeypatch):
+        """Test the CLI writes a gzipped NDJSON file"""
+        monkeypatch.setattr("app.db.get_engine", session.get_bind)
+        output = tmp_path / "users.ndjson.gz"
+
+        assert cli_main(["export", "users", "--gzip", "-o", str(output)]) == 0
+
+        lines = gzip.decompress(output.read_bytes()).splitlines()
+        assert len(lines) == len(many_users)
@@ -1,8 +1,12 @@
 # tests/test_follow.py
+from unittest.mock import AsyncMock
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlmodel import Session
 
+from app.core.connection import MorseConnection
+from app.core.connection_manager import manager
 from app.models import Follow, User
 from app.routes.user import hash_password
 
@@ -287,4 +291,87 @@ class TestAuthMeWithFollows:
         assert "created_at" in user3_data
         # UserPublicFlat should not have follows/followers
         assert "follows" not in user3_data
-        assert "followers" not in user3_data# tests/test_follow.py
\ No newline at end of file
+        assert "followers" not in user3_data# tests/test_follow.py
+
+class TestBulkFollow:
+    """Test the bulk follow endpoint"""
+
+    def test_bulk_follow_mutual(self, client: TestClient, user1, user2, user3, admin_headers, session: Session):
+        """Test creating mutual follows for a batch of pairs"""
+        batch = {
+            "follows": [
+                {"follower_id": str(user1.id), "followed_id": str(user2.id)},
+                {"follower_id": str(user1.id), "followed_id": str(user3.id)},
+            ],
+            "mutual": True,
+        }
+        response = client.post("/follow/bulk", json=batch, headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 2
+        assert session.get(Follow, (user1.id, user2.id)) is not None
+        assert session.get(Follow, (user2.id, user1.id)) is not None
+        assert session.get(Follow, (user3.id, user1.id)) is not None
+
+    def test_bulk_follow_reports_per_row_errors(self, client: TestClient, user1, user2, admin_headers, session: Session):
+        """Test invalid and duplicate pairs are reported per row"""
+        session.add(Follow(follower_id=user1.id, followed_id=user2.id))
+        session.commit()
+
+        batch = {"follows": [
+            {"follower_id": str(user1.id), "followed_id": str(user2.id)},
+            {"follower_id": str(user1.id), "followed_id": str(user1.id)},
+            {"follower_id": str(user2.id), "followed_id": "00000000-0000-0000-0000-000000000000"},
+            {"follower_id": str(user2.id), "followed_id": str(user1.id)},
+        ]}
+        response = client.post("/follow/bulk", json=batch, headers=admin_headers)
+
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 3
+        errors = [row["error"] for row in data["results"]]
+        assert errors[:3] == ["Already following", "Cannot follow yourself", "User not found"]
+        assert errors[3] is None
+
+    def test_bulk_follow_requires_admin(self, client: TestClient, user1, user2, auth_headers_user1):
+        """Test non-admin users cannot bulk follow"""
+        batch = {"follows": [{"follower_id": str(user1.id), "followed_id": str(user2.id)}]}
+        response = client.post("/follow/bulk", json=batch, headers=auth_headers_user1)
+
+        assert response.status_code == 403
+
+
+class TestOnlineFollows:
+    """Test listing followed users who are in a channel"""
+
+    def test_online_follows(self, client: TestClient, user1, user2, user3, auth_headers_user1, session: Session):
+        """Test waiting follows come first, and users not followed are left out"""
+        stranger = User(callsign="STRANGER", hashed_password="hash")
+        session.add(stranger)
+        session.add(Follow(follower_id=user1.id, followed_id=user2.id))
+        session.add(Follow(follower_id=user1.id, followed_id=user3.id))
+        session.commit()
+
+        manager.connect(MorseConnection(AsyncMock(), user3), "222222")
+        manager.connect(MorseConnection(AsyncMock(), stranger), "222222")
+        manager.connect(MorseConnection(AsyncMock(), user2), "111111")
+
+        response = client.get("/follow/online", headers=auth_headers_user1)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [(u["callsign"], u["status"], u["in_channel"]) for u in data] == [
+            ("FOLLOWER2", "waiting", "111111"),
+            ("FOLLOWER3", "busy", "222222"),
+        ]
+
+    def test_no_online_follows(self, client: TestClient, user1, user2, auth_headers_user1, session: Session):
+        """Test followed users who are not in a channel are not listed"""
+        session.add(Follow(follower_id=user1.id, followed_id=user2.id))
+        session.commit()
+        manager.connect(MorseConnection(AsyncMock(), user1), "111111")
+
+        response = client.get("/follow/online", headers=auth_headers_user1)
+
+        assert response.status_code == 200
+        assert response.json() == []
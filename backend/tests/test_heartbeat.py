@@ -0,0 +1,195 @@
+# tests/test_heartbeat.py
+import asyncio
+import json
+import time
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.connection import MorseConnection
+from app.core.connection_manager import manager
+from app.core.heartbeat import PING, PONG, Heartbeat, TimerWheel
+from app.core.metrics import HEARTBEAT_REAPED
+from app.models import User
+from tests.conftest import make_connection
+
+
+class IdleSocket:
+    """Cheaper than a mock when thousands are needed"""
+
+    async def send_json(self, data) -> None:
+        pass
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        pass
+
+
+class TestTimerWheel:
+    """Test slot bookkeeping"""
+
+    def test_due_after_ticks(self):
+        wheel = TimerWheel(4)
+        wheel.schedule("a", 2)
+        assert wheel.advance() == set()
+        assert wheel.advance() == {"a"}
+        assert "a" not in wheel
+
+    def test_full_turn(self):
+        wheel = TimerWheel(4)
+        wheel.schedule("a", 4)
+        assert [wheel.advance() for _ in range(4)] == [set(), set(), set(), {"a"}]
+
+    def test_reschedule_moves_item(self):
+        wheel = TimerWheel(4)
+        wheel.schedule("a", 1)
+        wheel.schedule("a", 3)
+        assert len(wheel) == 1
+        assert [wheel.advance() for _ in range(3)] == [set(), set(), {"a"}]
+
+    def test_cancel(self):
+        wheel = TimerWheel(4)
+        wheel.schedule("a", 1)
+        wheel.cancel("a")
+        wheel.cancel("b")  # Unknown items are ignored
+        assert wheel.advance() == set()
+        assert len(wheel) == 0
+
+
+class TestHeartbeat:
+    """Test pinging and reaping"""
+
+    def test_pings_quiet_connections_only(self):
+        heartbeat = Heartbeat(interval=2, timeout=10, tick=1)
+        quiet, active = make_connection("QUIET"), make_connection("ACTIVE")
+        manager.connect(quiet, "123456")
+        manager.connect(active, "123456")
+        heartbeat.add(quiet, "123456")
+        heartbeat.add(active, "123456")
+
+        now = time.monotonic()
+        quiet.last_seen = now - 2
+        active.last_seen = now
+        asyncio.run(heartbeat.run_tick(now))
+        asyncio.run(heartbeat.run_tick(now))
+
+        quiet.websocket.send_json.assert_awaited_once_with(PING)
+        active.websocket.send_json.assert_not_awaited()
+        assert len(heartbeat) == 2
+
+    def test_reaps_idle_connection(self):
+        heartbeat = Heartbeat(interval=1, timeout=5, tick=1)
+        dead, partner = make_connection("DEAD"), make_connection("PARTNER")
+        channel = manager.connect(dead, "123456")
+        manager.connect(partner, "123456")
+        heartbeat.add(dead, "123456")
+        reaped = HEARTBEAT_REAPED.value()
+
+        dead.last_seen = time.monotonic() - 5
+        partner.last_seen = time.monotonic() + 5
+        asyncio.run(heartbeat.run_tick())
+
+        assert HEARTBEAT_REAPED.value() == reaped + 1
+        assert dead not in channel
+        assert not manager.is_user_active(dead.user.id)
+        assert dead.websocket.close.await_args.kwargs["code"] == 1001
+        assert partner.websocket.send_json.await_args.args[0]["event"] == "user_left"
+        assert len(heartbeat) == 0
+
+        # The relay loop's own cleanup comes later and must not undo anything
+        manager.connect(make_connection("DEAD2"), "123456")
+        assert manager.disconnect(dead, "123456") is False
+        assert manager.channels["123456"].user_count == 2
+
+    def test_stalled_partner_does_not_hold_up_reaping(self):
+        """Test the user_left notice gives up after a tick like the pings do"""
+        heartbeat = Heartbeat(interval=1, timeout=5, tick=0.05)
+        dead, partner = make_connection("DEAD"), make_connection("PARTNER")
+        manager.connect(dead, "123456")
+        manager.connect(partner, "123456")
+        heartbeat.add(dead, "123456")
+
+        async def stall(*_) -> None:
+            await asyncio.sleep(60)
+
+        partner.websocket.send_json.side_effect = stall
+
+        started = time.monotonic()
+        asyncio.run(heartbeat.reap(dead))
+        assert time.monotonic() - started < 1.0
+        assert dead.websocket.close.await_count == 1
+
+    def test_resumed_connection_keeps_its_slot(self):
+        """Test a connection moved to a new socket is still the same wheel entry"""
+        heartbeat = Heartbeat(interval=1, timeout=5, tick=1)
+        connection = make_connection("RESUMED")
+        heartbeat.add(connection, "123456")
+        connection.websocket = AsyncMock()
+
+        assert connection in heartbeat.wheel
+        heartbeat.remove(connection)
+        assert len(heartbeat) == 0 and len(heartbeat.wheel) == 0
+
+    def test_reaped_user_can_rejoin(self):
+        heartbeat = Heartbeat(interval=1, timeout=1, tick=1)
+        dead = make_connection("DEAD")
+        manager.connect(dead, "123456")
+        heartbeat.add(dead, "123456")
+        asyncio.run(heartbeat.run_tick(time.monotonic() + 2))
+
+        manager.connect(MorseConnection(AsyncMock(), dead.user), "654321")
+        assert manager.get_user_channel(dead.user.id).channel_id == "654321"
+
+    def test_removed_connections_are_not_checked(self):
+        heartbeat = Heartbeat(interval=1, timeout=1, tick=1)
+        connection = make_connection("GONE")
+        heartbeat.add(connection, "123456")
+        heartbeat.remove(connection)
+        assert asyncio.run(heartbeat.run_tick(time.monotonic() + 2)) == 0
+
+    def test_tick_cost_stays_flat_with_50k_connections(self):
+        """A tick only visits its own slot, however many connections are monitored"""
+        heartbeat = Heartbeat(interval=10, timeout=60, tick=1)
+        user = User(id=uuid.uuid4(), callsign="MANY", hashed_password="hash")
+
+        async def scenario() -> None:
+            # Connections arrive over a full interval, 5k per tick
+            for _ in range(10):
+                for _ in range(5000):
+                    heartbeat.add(MorseConnection(IdleSocket(), user), "123456")
+                await heartbeat.run_tick()
+            assert len(heartbeat) == 50_000
+
+            now = time.monotonic()
+            visited = [await heartbeat.run_tick(now) for _ in range(10)]
+            assert visited == [5000] * 10
+
+            # With everything due in one far slot, the other ticks cost almost nothing
+            crowded = Heartbeat(interval=10, timeout=60, tick=1)
+            for _ in range(50_000):
+                crowded.add(MorseConnection(IdleSocket(), user), "123456")
+            started = time.perf_counter()
+            visited = [await crowded.run_tick(now) for _ in range(9)]
+            elapsed = time.perf_counter() - started
+            assert visited == [0] * 9
+            assert elapsed / 9 < 0.001
+
+        asyncio.run(scenario())
+
+
+class TestRelayLoopHeartbeat:
+    """Test the heartbeat through the channel socket"""
+
+    @pytest.mark.timeout(10)
+    def test_pong_is_not_relayed(self, client: TestClient, tokens):
+        frame = {"type": "morse", "signal": "-"}
+        with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws1:
+            ws1.receive_json()
+            with client.websocket_connect(f"/channel/123456?token={tokens[1]}") as ws2:
+                ws2.receive_json()
+                ws1.receive_json()
+
+                ws1.send_text(PONG)
+                ws1.send_text(json.dumps(frame))
+                assert ws2.receive_json() == frame
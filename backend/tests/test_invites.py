@@ -0,0 +1,273 @@
+# tests/test_invites.py
+import asyncio
+import time
+import uuid
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.connection_manager import manager
+from app.core.invites import InviteBook, InviteError, expire_invite, invites
+from app.core.metrics import INVITES
+from app.core.presence import PresenceHub, presence
+from app.models import Follow, User
+from app.routes.user import hash_password
+
+
+def make_user(callsign: str) -> User:
+    return User(id=uuid.uuid4(), callsign=callsign, hashed_password="x")
+
+
+class TestInviteBook:
+    """Test the invite indexes and the expiry heap"""
+
+    def test_indexes(self):
+        book = InviteBook(ttl=30.0)
+        caller, callee = make_user("CALLER"), make_user("CALLEE")
+        invite = book.create(caller, callee.id, "123456", now=0.0)
+
+        assert book.get(invite.id) is invite
+        assert book.outgoing(caller.id) is invite
+        assert book.incoming(callee.id) == [invite]
+        assert invite.expires_in(now=10.0) == 20.0
+
+    def test_one_call_per_caller(self):
+        book = InviteBook(ttl=30.0)
+        caller = make_user("CALLER")
+        book.create(caller, uuid.uuid4(), "111111")
+        with pytest.raises(InviteError):
+            book.create(caller, uuid.uuid4(), "222222")
+
+    def test_expire_in_deadline_order(self):
+        book = InviteBook(ttl=30.0)
+        late = book.create(make_user("LATE"), uuid.uuid4(), "111111", now=5.0)
+        early = book.create(make_user("EARLY"), uuid.uuid4(), "222222", now=0.0)
+
+        assert book.expire(now=29.0) == []
+        assert book.expire(now=40.0) == [early, late]
+        assert len(book) == 0
+        assert book.incoming(early.callee_id) == []
+        assert book.outgoing(early.caller_id) is None
+
+    def test_discarded_invites_never_expire(self):
+        book = InviteBook(ttl=30.0)
+        invite = book.create(make_user("CALLER"), uuid.uuid4(), "123456", now=0.0)
+        book.discard(invite)
+
+        assert book.expire(now=100.0) == []
+        assert book.next_deadline() is None
+
+    def test_accept_keeps_invite_one_more_ttl(self):
+        book = InviteBook(ttl=30.0)
+        invite = book.create(make_user("CALLER"), uuid.uuid4(), "123456", now=0.0)
+        book.accept(invite, now=10.0)
+
+        assert book.incoming(invite.callee_id) == []
+        assert book.outgoing(invite.caller_id) is None
+        assert book.expire(now=35.0) == []  # Its first deadline went stale
+        assert book.expire(now=40.0) == [invite]
+        assert invite.state == "accepted"
+
+    def test_expiry_leaves_a_reused_channel_id_alone(self):
+        """Test an old invite expiring does not release a reservation made since for the same ID"""
+        book = InviteBook(ttl=30.0)
+        old = book.create(make_user("OLD"), uuid.uuid4(), "123456")
+        manager.reserve("123456", [old.caller_id, old.callee_id], owner=old.id)
+        book.accept(old)
+        manager.release("123456")  # Opened and closed: the reservation and the ID went
+
+        new = book.create(make_user("NEW"), uuid.uuid4(), "123456")
+        manager.reserve("123456", [new.caller_id, new.callee_id], owner=new.id)
+        asyncio.run(expire_invite(old))
+
+        assert manager.is_reserved("123456")
+        asyncio.run(expire_invite(new))
+        assert not manager.is_reserved("123456")
+
+    def test_stale_entries_compacted(self):
+        book = InviteBook(ttl=30.0)
+        for i in range(1000):
+            book.discard(book.create(make_user(f"C{i}"), uuid.uuid4(), str(i)))
+        assert len(book._heap) <= 64 + 1
+
+
+class TestPresenceHub:
+    """Test the per-user socket limit and the send timeout"""
+
+    def test_oldest_socket_makes_room(self):
+        hub = PresenceHub(max_sockets=2, send_timeout=1.0)
+        sockets = [AsyncMock() for _ in range(3)]
+        assert hub.add("user", sockets[0]) is None
+        assert hub.add("user", sockets[1]) is None
+        assert hub.add("user", sockets[2]) is sockets[0]
+
+        hub.remove("user", sockets[0])  # Its handler cleaning up later changes nothing
+        assert asyncio.run(hub.send("user", {"event": "test"}))
+        sockets[0].send_json.assert_not_awaited()
+        sockets[2].send_json.assert_awaited_once()
+
+    def test_stalled_socket_gives_up(self):
+        hub = PresenceHub(max_sockets=2, send_timeout=0.05)
+        stalled = AsyncMock()
+
+        async def stall(*_) -> None:
+            await asyncio.sleep(60)
+
+        stalled.send_json.side_effect = stall
+        hub.add("user", stalled)
+
+        started = time.monotonic()
+        assert asyncio.run(hub.send("user", {"event": "test"})) is False
+        assert time.monotonic() - started < 1.0
+
+        hub.add("user", AsyncMock())
+        assert asyncio.run(hub.send("user", {"event": "test"})) is True
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    invites.clear()
+    presence.clear()
+    yield
+    invites.clear()
+    presence.clear()
+
+
+@pytest.fixture
+def users(client: TestClient, session: Session) -> dict[str, tuple[User, str]]:
+    """CALLER follows CALLEE; STRANGER follows nobody. Users and their tokens"""
+    result = {}
+    for callsign in ("CALLER", "CALLEE", "STRANGER"):
+        user = User(callsign=callsign, hashed_password=hash_password("password123"))
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        response = client.post("/auth/login", json={"callsign": callsign, "password": "password123"})
+        result[callsign] = (user, response.json()["access_token"])
+    session.add(Follow(follower_id=result["CALLER"][0].id, followed_id=result["CALLEE"][0].id))
+    session.commit()
+    return result
+
+
+def headers(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def call(client: TestClient, users, caller: str = "CALLER", callee: str = "CALLEE"):
+    return client.post(
+        "/invites/", json={"callee_id": str(users[callee][0].id)}, headers=headers(users[caller][1])
+    )
+
+
+class TestInviteRoutes:
+    """Test calling, answering and expiring invites"""
+
+    def test_call_and_accept(self, client: TestClient, users):
+        caller_token, callee_token = users["CALLER"][1], users["CALLEE"][1]
+        with client.websocket_connect(f"/presence?token={caller_token}") as caller_ws, \
+                client.websocket_connect(f"/presence?token={callee_token}") as callee_ws:
+            response = call(client, users)
+            assert response.status_code == 201
+            invite = response.json()
+            assert invite["caller"]["callsign"] == "CALLER"
+            assert manager.is_reserved(invite["channel_id"])
+
+            event = callee_ws.receive_json()
+            assert event["event"] == "invite"
+            assert event["invite"]["id"] == invite["id"]
+
+            listed = client.get("/invites/", headers=headers(callee_token)).json()
+            assert [i["id"] for i in listed] == [invite["id"]]
+
+            accepted = INVITES.value(("accepted",))
+            response = client.post(f"/invites/{invite['id']}/accept", headers=headers(callee_token))
+            assert response.status_code == 200
+            assert caller_ws.receive_json()["event"] == "invite_accepted"
+            assert INVITES.value(("accepted",)) == accepted + 1
+            assert client.get("/invites/", headers=headers(callee_token)).json() == []
+
+            channel_id = invite["channel_id"]
+            with client.websocket_connect(f"/channel/{channel_id}?token={caller_token}") as a:
+                a.receive_json()
+                with client.websocket_connect(f"/channel/{channel_id}?token={callee_token}") as b:
+                    b.receive_json()
+                    assert manager.channels[channel_id].is_full
+
+    def test_reserved_channel_refuses_others(self, client: TestClient, users):
+        with client.websocket_connect(f"/presence?token={users['CALLEE'][1]}"):
+            channel_id = call(client, users).json()["channel_id"]
+
+            with pytest.raises(WebSocketDisconnect) as exc:
+                with client.websocket_connect(f"/channel/{channel_id}?token={users['STRANGER'][1]}") as ws:
+                    ws.receive_json()
+            assert exc.value.code == 1008
+            assert exc.value.reason == "Channel is reserved"
+
+            # Random matching skips it too
+            with client.websocket_connect(f"/channel/{channel_id}?token={users['CALLER'][1]}") as ws:
+                ws.receive_json()
+                assert manager.find_random_waiting_channel() is None
+
+        assert not manager.is_reserved(channel_id)
+
+    def test_only_followed_users(self, client: TestClient, users):
+        with client.websocket_connect(f"/presence?token={users['CALLER'][1]}"):
+            response = call(client, users, caller="STRANGER", callee="CALLER")
+            assert response.status_code == 403
+
+    def test_callee_must_be_present(self, client: TestClient, users):
+        assert call(client, users).status_code == 409
+
+    def test_cannot_call_yourself(self, client: TestClient, users):
+        assert call(client, users, callee="CALLER").status_code == 400
+
+    def test_one_call_at_a_time(self, client: TestClient, users):
+        with client.websocket_connect(f"/presence?token={users['CALLEE'][1]}"):
+            assert call(client, users).status_code == 201
+            assert call(client, users).status_code == 409
+
+    def test_decline(self, client: TestClient, users):
+        with client.websocket_connect(f"/presence?token={users['CALLER'][1]}") as caller_ws, \
+                client.websocket_connect(f"/presence?token={users['CALLEE'][1]}") as callee_ws:
+            invite = call(client, users).json()
+            callee_ws.receive_json()
+
+            response = client.delete(f"/invites/{invite['id']}", headers=headers(users["STRANGER"][1]))
+            assert response.status_code == 404
+            response = client.post(f"/invites/{invite['id']}/accept", headers=headers(users["CALLER"][1]))
+            assert response.status_code == 403
+
+            response = client.delete(f"/invites/{invite['id']}", headers=headers(users["CALLEE"][1]))
+            assert response.status_code == 204
+            assert caller_ws.receive_json() == {
+                "event": "invite_declined", "invite_id": invite["id"], "channel_id": invite["channel_id"]
+            }
+            assert not manager.is_reserved(invite["channel_id"])
+            assert call(client, users).status_code == 201
+
+    def test_pending_invites_sent_on_connect(self, client: TestClient, users):
+        with client.websocket_connect(f"/presence?token={users['CALLEE'][1]}") as first:
+            invite = call(client, users).json()
+            first.receive_json()
+            with client.websocket_connect(f"/presence?token={users['CALLEE'][1]}") as second:
+                event = second.receive_json()
+                assert event["invite"]["id"] == invite["id"]
+
+    def test_expiry(self, client: TestClient, users, monkeypatch):
+        monkeypatch.setattr(invites, "ttl", 0.2)
+        with client.websocket_connect(f"/presence?token={users['CALLER'][1]}") as caller_ws, \
+                client.websocket_connect(f"/presence?token={users['CALLEE'][1]}") as callee_ws:
+            invite = call(client, users).json()
+            callee_ws.receive_json()
+
+            started = time.monotonic()
+            assert caller_ws.receive_json()["event"] == "invite_expired"
+            assert callee_ws.receive_json()["event"] == "invite_expired"
+            assert time.monotonic() - started < 2.0
+            assert not manager.is_reserved(invite["channel_id"])
+            assert client.post(
+                f"/invites/{invite['id']}/accept", headers=headers(users["CALLEE"][1])
+            ).status_code == 404
@@ -0,0 +1,148 @@
+# tests/test_metrics.py
+import asyncio
+import threading
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.channel import Channel
+from app.core.metrics import (
+    DB_QUERIES,
+    RELAY_FRAMES,
+    RELAY_LATENCY,
+    RELAY_SEND_FAILURES,
+    CallbackGauge,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    registry,
+)
+from tests.conftest import make_connection
+
+
+class TestRegistry:
+    """Test metric types and text rendering"""
+
+    def test_counter_with_labels(self):
+        """Test labelled counters render one sample per label set"""
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("test_total", "A counter", ("route",)))
+        counter.inc(labels=("/a",))
+        counter.inc(2, labels=("/b",))
+
+        output = registry.render()
+        assert "# TYPE test_total counter" in output
+        assert 'test_total{route="/a"} 1.0' in output
+        assert 'test_total{route="/b"} 2.0' in output
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets accumulate and include +Inf, sum and count"""
+        registry = MetricsRegistry()
+        histogram = registry.register(Histogram("test_seconds", "A histogram", buckets=(0.1, 1.0)))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5.0)
+
+        output = registry.render()
+        assert 'test_seconds_bucket{le="0.1"} 1.0' in output
+        assert 'test_seconds_bucket{le="1.0"} 2.0' in output
+        assert 'test_seconds_bucket{le="+Inf"} 3.0' in output
+        assert "test_seconds_sum 5.55" in output
+        assert "test_seconds_count 3.0" in output
+
+    def test_updates_from_threads_are_not_lost(self):
+        counter = Counter("test_threaded_total", "Test")
+        histogram = Histogram("test_threaded_seconds", "Test", buckets=(0.1,))
+
+        def work() -> None:
+            for _ in range(10_000):
+                counter.inc()
+                histogram.observe(0.05)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.value() == 80_000
+        assert histogram.count() == 80_000
+
+    def test_callback_gauge_evaluated_on_render(self):
+        """Test callback gauges read their value at scrape time"""
+        registry = MetricsRegistry()
+        value = {(): 1.0}
+        registry.register(CallbackGauge("test_gauge", "A gauge", lambda: value))
+
+        assert "test_gauge 1.0" in registry.render()
+        value[()] = 3.0
+        assert "test_gauge 3.0" in registry.render()
+
+
+class TestRelayMetrics:
+    """Test the channel relay is instrumented"""
+
+    @pytest.mark.asyncio
+    async def test_relay_counts_frames_and_latency(self):
+        """Test a relayed frame increments the frame counter and latency histogram"""
+        channel = Channel(channel_id="123456")
+        sender, receiver = make_connection("METRIC1"), make_connection("METRIC2")
+        channel.add_user(sender)
+        channel.add_user(receiver)
+
+        frames, observed = RELAY_FRAMES.value(), RELAY_LATENCY.count()
+        await channel.relay_message('{"type": "morse", "signal": "-"}', sender)
+
+        assert RELAY_FRAMES.value() == frames + 1
+        assert RELAY_LATENCY.count() == observed + 1
+
+    @pytest.mark.asyncio
+    async def test_relay_counts_send_failures(self):
+        """Test a failing send increments the failure counter"""
+        channel = Channel(channel_id="123456")
+        sender, receiver = make_connection("METRIC1"), make_connection("METRIC2")
+        receiver.websocket.send_text.side_effect = RuntimeError("gone")
+        channel.add_user(sender)
+        channel.add_user(receiver)
+
+        failures = RELAY_SEND_FAILURES.value()
+        await channel.relay_message("plain", sender)
+
+        assert RELAY_SEND_FAILURES.value() == failures + 1
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics endpoint"""
+
+    def test_metrics_endpoint(self, client: TestClient):
+        """Test the scrape endpoint exposes the relay and connection metrics"""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "morse_active_connections 0" in response.text
+        assert 'morse_channels{users="1"}' in response.text
+        assert "# TYPE morse_relay_latency_seconds histogram" in response.text
+
+    def test_gauges_are_read_on_the_event_loop(self, client: TestClient, monkeypatch):
+        """Test scrapes read live state on the loop that mutates it, not in the threadpool"""
+        loops = []
+
+        def on_loop() -> dict:
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return {}
+
+        monkeypatch.setitem(registry._metrics, "test_on_loop", CallbackGauge("test_on_loop", "Test", on_loop))
+        assert client.get("/metrics").status_code == 200
+        assert loops and loops[0] is not None
+
+    def test_db_queries_attributed_to_route(self, client: TestClient):
+        """Test database queries are counted against the route template"""
+        before = DB_QUERIES.value(("/users/{user_id}",))
+        client.get(f"/users/{uuid.uuid4()}")
+
+        assert DB_QUERIES.value(("/users/{user_id}",)) > before
@@ -0,0 +1,102 @@
+# tests/test_migrations.py
+import pytest
+from sqlalchemy import inspect
+from sqlmodel import SQLModel, create_engine
+from sqlmodel.pool import StaticPool
+
+from app import migrations
+from app.cli import main as cli_main
+from app.core.plans import HOT_QUERIES, check_plans, is_seq_scan
+from app.db import ensure_schema
+
+
+@pytest.fixture
+def engine():
+    return create_engine("sqlite:///", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+
+
+@pytest.fixture
+def legacy_engine(engine):
+    """Tables as create_all made them before the indexes were added"""
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DROP INDEX ix_follow_followed_id")
+        connection.exec_driver_sql("DROP INDEX ix_user_last_seen")
+    return engine
+
+
+def index_names(engine, table: str) -> set[str]:
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+class TestMigrations:
+    """Test discovering and applying migrations"""
+
+    def test_discovered_in_order(self):
+        revisions = [migration.revision for migration in migrations.discover()]
+        assert revisions == sorted(revisions)
+        assert revisions[:2] == ["0001", "0002"]
+        assert migrations.head() == revisions[-1]
+
+    def test_upgrade_empty_database(self, engine):
+        applied = migrations.upgrade(engine)
+
+        assert [migration.revision for migration in applied] == [m.revision for m in migrations.discover()]
+        assert "ix_follow_followed_id" in index_names(engine, "follow")
+        assert migrations.pending(engine) == []
+        assert migrations.upgrade(engine) == []
+
+    def test_concurrent_upgrade_skips_applied_revisions(self, engine, monkeypatch):
+        """Test a worker that saw a revision as pending after another applied it does not fail"""
+        migrations.upgrade(engine)
+        monkeypatch.setattr(migrations, "pending", lambda engine: migrations.discover())
+
+        assert migrations.upgrade(engine) == []
+        assert len(migrations.applied(engine)) == len(migrations.discover())
+
+    def test_upgrade_adds_indexes_to_existing_tables(self, legacy_engine):
+        assert "ix_user_last_seen" not in index_names(legacy_engine, "user")
+
+        migrations.upgrade(legacy_engine)
+
+        assert "ix_follow_followed_id" in index_names(legacy_engine, "follow")
+        assert "ix_user_last_seen" in index_names(legacy_engine, "user")
+
+    def test_ensure_schema_migrates(self, legacy_engine):
+        assert ensure_schema(legacy_engine) is True
+        assert migrations.pending(legacy_engine) == []
+        assert "ix_user_last_seen" in index_names(legacy_engine, "user")
+
+
+class TestPlans:
+    """Test spotting sequential scans of the hot queries"""
+
+    def test_flags_missing_indexes(self, legacy_engine):
+        flagged = {check.query.name for check in check_plans(legacy_engine) if check.seq_scan}
+        assert flagged == {"followers", "online users", "recently seen callsigns"}
+
+        migrations.upgrade(legacy_engine)
+        assert not any(check.seq_scan for check in check_plans(legacy_engine))
+
+    def test_postgres_only_queries_skipped(self, engine):
+        migrations.upgrade(engine)
+        assert "callsign search" not in {check.query.name for check in check_plans(engine)}
+
+    def test_postgres_plan(self):
+        search = next(query for query in HOT_QUERIES if query.name == "callsign search")
+        assert is_seq_scan(['Seq Scan on "user"  (cost=10000000000.00..10000000001.01 rows=1 width=16)'], search, "postgresql")
+        assert not is_seq_scan(
+            ['Bitmap Heap Scan on "user"  (cost=12.00..16.01 rows=1 width=16)',
+             '  ->  Bitmap Index Scan on ix_user_callsign_trgm  (cost=0.00..12.00 rows=1 width=0)'],
+            search, "postgresql",
+        )
+
+    def test_cli_exit_code(self, legacy_engine, monkeypatch, capsys):
+        monkeypatch.setattr("app.db.get_engine", lambda: legacy_engine)
+
+        assert cli_main(["check-plans"]) == 1
+        assert "SEQ SCAN  followers" in capsys.readouterr().out
+
+        assert cli_main(["migrate"]) == 0
+        assert "Applied 0002" in capsys.readouterr().out
+        assert cli_main(["check-plans"]) == 0
@@ -0,0 +1,94 @@
+# tests/test_morse.py
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import morse
+
+
+class TestCodec:
+    """Test text <-> Morse encoding"""
+
+    def test_encode(self):
+        """Test letters are space separated and words slash separated"""
+        assert morse.encode("cq de k") == "-.-. --.- / -.. . / -.-"
+
+    def test_encode_skips_unknown_characters(self):
+        """Test characters without a code are dropped"""
+        assert morse.encode("A~B") == ".- -..."
+
+    def test_round_trip(self):
+        """Test decoding an encoding returns the upper-cased text"""
+        text = "Hello, World! 73 de DL1ABC"
+        assert morse.decode(morse.encode(text)) == text.upper()
+
+    def test_decode_typographic_dots(self):
+        """Test the dots sent by the frontend decode like ASCII dots"""
+        assert morse.decode("•••") == "S"
+
+    def test_decode_unknown_code(self):
+        """Test unknown code groups decode to the placeholder"""
+        assert morse.decode("........") == morse.UNKNOWN_CHAR
+
+
+class TestTimingDecoder:
+    """Test decoding key-down/key-up durations"""
+
+    def test_perfect_timing(self):
+        """Test perfectly timed keying decodes exactly"""
+        timings = morse.text_to_timings("PARIS PARIS", morse.unit_from_wpm(20))
+        assert morse.decode_timings(timings) == "PARIS PARIS"
+
+    def test_estimates_unit(self):
+        """Test the unit length is recovered from the buffer"""
+        timings = morse.text_to_timings("CQ CQ DE TEST", 80)
+        assert morse.estimate_unit(timings) == pytest.approx(80)
+
+    def test_jittered_timing(self):
+        """Test human-like timing jitter still decodes"""
+        rng = random.Random(42)
+        timings = [d * rng.uniform(0.8, 1.2) for d in morse.text_to_timings("THE QUICK BROWN FOX", 60)]
+        assert morse.decode_timings(timings) == "THE QUICK BROWN FOX"
+
+    def test_all_dahs_uses_element_gaps(self):
+        """Test a buffer of only dahs is not mistaken for dits"""
+        assert morse.decode_timings([180, -60, 180, -60, 180]) == "O"
+
+    def test_no_marks(self):
+        """Test a buffer without key-down durations is rejected"""
+        with pytest.raises(ValueError):
+            morse.estimate_unit([-100, -200])
+
+
+class TestMorseRoutes:
+    """Test the Morse API endpoints"""
+
+    def test_encode_endpoint(self, client: TestClient):
+        """Test encoding through the API"""
+        response = client.post("/morse/encode", json={"text": "SOS"})
+
+        assert response.status_code == 200
+        assert response.json() == {"text": "SOS", "morse": "... --- ..."}
+
+    def test_decode_endpoint(self, client: TestClient):
+        """Test decoding through the API"""
+        response = client.post("/morse/decode", json={"morse": "... --- ..."})
+
+        assert response.status_code == 200
+        assert response.json()["text"] == "SOS"
+
+    def test_decode_timings_endpoint(self, client: TestClient):
+        """Test decoding timings reports the estimated speed"""
+        timings = morse.text_to_timings("PARIS", morse.unit_from_wpm(15))
+        response = client.post("/morse/decode/timings", json={"durations": timings})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["text"] == "PARIS"
+        assert data["wpm"] == pytest.approx(15)
+
+    def test_decode_timings_without_marks(self, client: TestClient):
+        """Test a buffer without marks is a client error"""
+        response = client.post("/morse/decode/timings", json={"durations": [-100]})
+        assert response.status_code == 400
@@ -0,0 +1,151 @@
+# tests/test_practice.py
+import random
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core import morse, practice
+from app.models import User
+
+
+@pytest.fixture(autouse=True)
+def clear_callsigns():
+    practice.callsigns.clear()
+    yield
+    practice.callsigns.clear()
+
+
+class TestLessons:
+    """Test precomputed Koch lessons"""
+
+    def test_first_lesson(self):
+        """Test lesson 1 teaches K and M"""
+        lesson = practice.get_lesson(1)
+        assert lesson.chars == "KM"
+        assert lesson.new_char == "M"
+        assert lesson.words == ()
+
+    def test_words_use_lesson_chars(self):
+        """Test lesson words only use characters taught so far"""
+        lesson = practice.get_lesson(12)
+        assert lesson.words
+        assert all(set(word) <= set(lesson.chars) for word in lesson.words)
+
+    def test_every_koch_char_has_a_code(self):
+        """Test the Koch order only contains encodable characters"""
+        assert all(char in morse.MORSE_CODE for char in practice.KOCH_ORDER)
+        assert len(set(practice.KOCH_ORDER)) == len(practice.KOCH_ORDER)
+
+    def test_lessons_are_cached(self):
+        """Test a lesson is computed once"""
+        assert practice.get_lesson(5) is practice.get_lesson(5)
+
+    def test_invalid_lesson(self):
+        """Test lessons outside the order are rejected"""
+        with pytest.raises(ValueError):
+            practice.get_lesson(0)
+        with pytest.raises(ValueError):
+            practice.get_lesson(practice.MAX_LESSON + 1)
+
+
+class TestDrills:
+    """Test drill generation"""
+
+    def test_groups(self):
+        """Test groups have the requested shape and only lesson characters"""
+        lesson = practice.get_lesson(3)
+        text = practice.drill(random.Random(1), lesson, "groups", length=4, group_size=6)
+        groups = text.split()
+        assert len(groups) == 4
+        assert all(len(g) == 6 and set(g) <= set(lesson.chars) for g in groups)
+
+    def test_new_char_is_weighted(self):
+        """Test the newest character comes up more often than the others"""
+        lesson = practice.get_lesson(9)
+        text = practice.drill(random.Random(2), lesson, "groups", length=400)
+        assert text.count(lesson.new_char) > 2 * text.count(lesson.chars[0])
+
+    def test_words_fall_back_to_groups(self):
+        """Test word drills work before the lesson can spell any word"""
+        lesson = practice.get_lesson(1)
+        text = practice.drill(random.Random(3), lesson, "words", length=3)
+        assert set(text.replace(" ", "")) <= {"K", "M"}
+
+    def test_batches_are_reproducible(self):
+        """Test the same seed and page give the same drills and pages differ"""
+        lesson = practice.get_lesson(20)
+        first = practice.drill_batch(lesson, "mixed", seed=42, page=0, page_size=5, length=5)
+        assert practice.drill_batch(lesson, "mixed", seed=42, page=0, page_size=5, length=5) == first
+        assert practice.drill_batch(lesson, "mixed", seed=42, page=1, page_size=5, length=5) != first
+
+    def test_drill_is_fast(self):
+        """Test a drill takes well under a millisecond"""
+        lesson = practice.get_lesson(40)
+        rng = random.Random(4)
+        started = time.perf_counter()
+        for _ in range(1000):
+            practice.drill(rng, lesson, "mixed", length=5, callsigns=("DL1ABC", "K1ABC"))
+        assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+class TestCallsignCorpus:
+    """Test callsigns pulled from the user table"""
+
+    def test_filters_by_lesson(self, session: Session):
+        """Test only callsigns spellable with the lesson characters are returned"""
+        session.add_all([User(callsign=c, hashed_password="x") for c in ("KMK", "kmm", "DL1ABC")])
+        session.commit()
+
+        assert set(practice.callsigns.for_lesson(session, practice.get_lesson(1))) == {"KMK", "KMM"}
+
+    def test_reloads_after_refresh_interval(self, session: Session):
+        """Test new users show up once the corpus is stale"""
+        corpus = practice.CallsignCorpus(refresh_seconds=0)
+        lesson = practice.get_lesson(1)
+        assert corpus.for_lesson(session, lesson) == ()
+
+        session.add(User(callsign="MMK", hashed_password="x"))
+        session.commit()
+        assert corpus.for_lesson(session, lesson) == ("MMK",)
+
+
+class TestPracticeEndpoints:
+    """Test the practice API"""
+
+    def test_list_lessons(self, client: TestClient):
+        response = client.get("/practice/lessons")
+
+        assert response.status_code == 200
+        lessons = response.json()["lessons"]
+        assert len(lessons) == practice.MAX_LESSON
+        assert lessons[0] == {"number": 1, "chars": "KM", "new_char": "M", "word_count": 0}
+
+    def test_lesson_not_found(self, client: TestClient):
+        assert client.get("/practice/lessons/0").status_code == 404
+        assert client.get("/practice/lessons/999/drills").status_code == 404
+
+    def test_drill_pages(self, client: TestClient):
+        """Test drills are paginated by seed"""
+        response = client.get("/practice/lessons/10/drills", params={"page_size": 3, "farnsworth_wpm": 10})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["drills"]) == 3
+        assert data["next_page"] == 1
+        assert data["farnsworth_wpm"] == 10
+        assert all(morse.decode(d["morse"]) == d["text"] for d in data["drills"])
+
+        again = client.get("/practice/lessons/10/drills", params={"page_size": 3, "seed": data["seed"]})
+        assert again.json()["drills"] == data["drills"]
+
+    def test_callsign_drills(self, client: TestClient, session: Session):
+        """Test callsign drills use registered callsigns"""
+        session.add(User(callsign="KMMK", hashed_password="x"))
+        session.commit()
+
+        response = client.get("/practice/lessons/1/drills", params={"kind": "callsigns", "length": 2})
+
+        assert response.status_code == 200
+        assert all(d["text"] == "KMMK KMMK" for d in response.json()["drills"])
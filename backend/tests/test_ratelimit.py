@@ -0,0 +1,237 @@
+# tests/test_ratelimit.py
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from starlette.websockets import WebSocketDisconnect
+
+from app.config import settings
+from app.core import ratelimit
+from app.core.connection_manager import manager
+from app.core.metrics import BCRYPT_LATENCY, HTTP_RATE_LIMITED, RELAY_FLOOD_DISCONNECTS, RELAY_REJECTED
+from app.core.ratelimit import MemoryStore, TokenBucket
+from app.models import User
+from app.routes.user import hash_password
+
+
+class TestTokenBucket:
+    """Test the token bucket arithmetic"""
+
+    def test_burst_then_empty(self):
+        bucket = TokenBucket(rate=1.0, burst=3)
+        assert [bucket.allow(10.0) for _ in range(4)] == [True, True, True, False]
+
+    def test_refills_at_rate(self):
+        bucket = TokenBucket(rate=10.0, burst=2)
+        bucket.allow(0.0)
+        bucket.allow(0.0)
+        assert not bucket.allow(0.05)
+        assert bucket.allow(0.15)
+
+    def test_refill_is_capped_at_burst(self):
+        bucket = TokenBucket(rate=100.0, burst=2)
+        bucket.allow(0.0)
+        assert [bucket.allow(1000.0) for _ in range(3)] == [True, True, False]
+
+    def test_no_per_instance_dict(self):
+        """Test buckets use slots, so a check cannot allocate attribute storage"""
+        assert not hasattr(TokenBucket(1, 1), "__dict__")
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    """Tiny per-connection bucket and a fresh global one"""
+    monkeypatch.setattr(settings, "relay_rate", 0.001)
+    monkeypatch.setattr(settings, "relay_burst", 3.0)
+    monkeypatch.setattr(ratelimit, "global_bucket", TokenBucket(1000.0, 1000.0))
+    monkeypatch.setattr("app.routes.channel.global_bucket", ratelimit.global_bucket)
+
+
+class TestRelayFloodProtection:
+    """Test limits in the channel relay loop"""
+
+    @pytest.mark.timeout(10)
+    def test_excess_frames_are_dropped(self, client: TestClient, tokens):
+        frame = {"type": "morse", "signal": "-"}
+        rejected = RELAY_REJECTED.value(("rate_limited",))
+
+        with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws1:
+            ws1.receive_json()
+            with client.websocket_connect(f"/channel/123456?token={tokens[1]}") as ws2:
+                ws2.receive_json()
+                ws1.receive_json()
+                for _ in range(5):
+                    ws1.send_text(json.dumps(frame))
+
+                wait_for(lambda: RELAY_REJECTED.value(("rate_limited",)) == rejected + 2)
+                assert [ws2.receive_json() for _ in range(3)] == [frame] * 3
+
+                # The connection stays open
+                ws2.send_text(json.dumps(frame))
+                assert ws1.receive_json() == frame
+
+    @pytest.mark.timeout(10)
+    def test_oversized_frames_are_dropped(self, client: TestClient, tokens, monkeypatch):
+        monkeypatch.setattr(settings, "relay_max_frame_size", 16)
+        rejected = RELAY_REJECTED.value(("too_large",))
+
+        with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws1:
+            ws1.receive_json()
+            ws1.send_text("x" * 17)
+            wait_for(lambda: RELAY_REJECTED.value(("too_large",)) == rejected + 1)
+
+    @pytest.mark.timeout(10)
+    def test_disconnect_action(self, client: TestClient, tokens, monkeypatch):
+        monkeypatch.setattr(settings, "relay_flood_action", "disconnect")
+        disconnects = RELAY_FLOOD_DISCONNECTS.value()
+
+        with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws1:
+            ws1.receive_json()
+            for _ in range(4):
+                ws1.send_text("{}")
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws1.receive_json()
+
+        assert exc_info.value.code == 1008
+        assert RELAY_FLOOD_DISCONNECTS.value() == disconnects + 1
+        assert "123456" not in manager.channels
+
+    @pytest.mark.timeout(10)
+    def test_global_limit(self, client: TestClient, tokens, monkeypatch):
+        """Test the worker-wide bucket applies across connections"""
+        monkeypatch.setattr(settings, "relay_burst", 100.0)
+        ratelimit.global_bucket.tokens = 2.0
+        ratelimit.global_bucket.rate = 0.001
+        rejected = RELAY_REJECTED.value(("rate_limited",))
+
+        with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws1:
+            ws1.receive_json()
+            for _ in range(3):
+                ws1.send_text("{}")
+            wait_for(lambda: RELAY_REJECTED.value(("rate_limited",)) == rejected + 1)
+
+
+class TestMemoryStore:
+    """Test the sliding-window counters"""
+
+    def hits(self, store: MemoryStore, key: str, count: int, now: float, limit: int = 3) -> list[bool]:
+        return [asyncio.run(store.hit(key, limit, 60.0, now)) for _ in range(count)]
+
+    def test_limit_within_window(self):
+        store = MemoryStore(max_keys=10)
+        assert self.hits(store, "a", 4, now=600.0) == [True, True, True, False]
+        assert self.hits(store, "b", 1, now=600.0) == [True]
+
+    def test_previous_window_is_weighted(self):
+        store = MemoryStore(max_keys=10)
+        self.hits(store, "a", 3, now=650.0)
+        # 3/4 of the previous window still overlaps: 3 * 0.75 + 1 reaches the limit
+        assert self.hits(store, "a", 2, now=675.0) == [True, False]
+        # 1/4 overlaps: 3 * 0.25 + 1 leaves room for two more
+        assert self.hits(store, "a", 3, now=705.0) == [True, True, False]
+
+    def test_old_windows_expire(self):
+        store = MemoryStore(max_keys=10)
+        self.hits(store, "a", 3, now=600.0)
+        assert self.hits(store, "a", 3, now=720.0) == [True, True, True]
+
+    def test_evicts_least_recently_used(self):
+        store = MemoryStore(max_keys=2)
+        self.hits(store, "a", 3, now=600.0)
+        self.hits(store, "b", 3, now=600.0)
+        self.hits(store, "a", 1, now=600.0)  # "a" is now the most recent
+        self.hits(store, "c", 1, now=600.0)
+
+        assert len(store) == 2
+        assert self.hits(store, "a", 1, now=600.0) == [False]
+        assert self.hits(store, "b", 1, now=600.0) == [True]  # Forgotten, starts over
+
+
+class TestAuthRateLimit:
+    """Test the login and registration limits"""
+
+    @pytest.fixture(autouse=True)
+    def auth_limits(self, monkeypatch):
+        monkeypatch.setattr(settings, "auth_rate_limit_ip", 5)
+        monkeypatch.setattr(settings, "auth_rate_limit_callsign", 2)
+
+    def test_login_limited_per_callsign(self, client: TestClient, session: Session):
+        session.add(User(callsign="BRUTE", hashed_password=hash_password("password123")))
+        session.commit()
+        checks = BCRYPT_LATENCY.count(("verify",))
+        rejected = HTTP_RATE_LIMITED.value(("/auth/login", "callsign"))
+
+        for _ in range(2):
+            response = client.post("/auth/login", json={"callsign": "BRUTE", "password": "guess"})
+            assert response.status_code == 401
+
+        response = client.post("/auth/login", json={"callsign": "brute", "password": "guess"})
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "60"
+        assert BCRYPT_LATENCY.count(("verify",)) == checks + 2
+        assert HTTP_RATE_LIMITED.value(("/auth/login", "callsign")) == rejected + 1
+
+        # Other callsigns are unaffected
+        response = client.post("/auth/login", json={"callsign": "OTHER", "password": "guess"})
+        assert response.status_code == 401
+
+    def test_login_limited_per_ip(self, client: TestClient):
+        statuses = [
+            client.post("/auth/login", json={"callsign": f"SPRAY{i}", "password": "guess"}).status_code
+            for i in range(6)
+        ]
+        assert statuses == [401] * 5 + [429]
+
+    def test_registration_rejected_before_hashing(self, client: TestClient):
+        for i in range(5):
+            response = client.post("/users/", json={"callsign": f"NEW{i}", "password": "password123"})
+            assert response.status_code == 201
+
+        hashes = BCRYPT_LATENCY.count(("hash",))
+        response = client.post("/users/", json={"callsign": "NEW5", "password": "password123"})
+        assert response.status_code == 429
+        assert BCRYPT_LATENCY.count(("hash",)) == hashes
+
+    def test_rejections_carry_cors_headers(self, client: TestClient):
+        """Test a browser can read the 429, since CORS wraps the limiter"""
+        headers = {"Origin": "http://localhost:3000"}
+        for i in range(5):
+            client.post("/auth/login", json={"callsign": f"CORS{i}", "password": "guess"}, headers=headers)
+        response = client.post("/auth/login", json={"callsign": "CORS5", "password": "guess"}, headers=headers)
+        assert response.status_code == 429
+        assert "access-control-allow-origin" in response.headers
+
+    def test_long_body_left_unread(self):
+        """Test only the first few KB of a body are read, and all of it is replayed"""
+        chunks = [b"x" * 3000] * 10
+        received = []
+
+        async def receive():
+            received.append(chunks[len(received)])
+            return {"type": "http.request", "body": received[-1], "more_body": len(received) < len(chunks)}
+
+        async def run():
+            body, replay = await ratelimit._buffer_body(receive, ratelimit.MAX_INSPECTED_BODY)
+            assert body == b"" and len(received) == 2
+            replayed = []
+            while True:
+                message = await replay()
+                replayed.append(message["body"])
+                if not message["more_body"]:
+                    return replayed
+
+        assert b"".join(asyncio.run(run())) == b"".join(chunks)
+
+    def test_other_routes_not_limited(self, client: TestClient):
+        for _ in range(10):
+            assert client.get("/health").status_code == 200
@@ -0,0 +1,253 @@
+# tests/test_recording.py
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import recording as recording_module
+from app.core.channel import Channel
+from app.core.connection import MorseConnection
+from app.core.connection_manager import manager
+from app.core.recording import FRAME, JOIN, LEAVE, Recorder, RecordingReader, recorder
+from app.models import User
+
+
+@pytest.fixture(autouse=True)
+def recordings_dir(tmp_path, monkeypatch):
+    """Write recordings to a temporary directory and flush them quickly"""
+    monkeypatch.setattr(recorder, "directory", tmp_path)
+    monkeypatch.setattr(recorder.writer, "flush_interval", 0.0)
+    yield tmp_path
+    recorder.flush()
+
+
+def make_user(callsign: str) -> User:
+    return User(id=uuid.uuid4(), callsign=callsign, hashed_password="x",
+                created_at=datetime.utcnow(), last_seen=datetime.utcnow())
+
+
+class TestRecordingFile:
+    """Test the binary log and its reader"""
+
+    def test_round_trip(self, tmp_path):
+        """Test records come back in order with offsets from the start"""
+        local = Recorder(str(tmp_path), flush_interval=0.0)
+        user = make_user("REC1")
+        rec = local.start("123456")
+        rec.join(0, user)
+        rec.frame(0, '{"type": "morse", "signal": "-"}', at=rec._start + 0.25)
+        rec.frame(0, '{"type": "morse", "signal": " "}', at=rec._start + 0.5)
+        rec.leave(0, user)
+        rec.close()
+        local.flush()
+
+        with local.open(rec.id) as reader:
+            records = list(reader)
+
+        assert [r.kind for r in records] == [JOIN, FRAME, FRAME, LEAVE]
+        assert records[1].offset_ms == 250
+        assert records[2].offset_ms == 500
+        assert json.loads(records[2].payload) == {"type": "morse", "signal": " "}
+        assert json.loads(records[0].payload)["callsign"] == "REC1"
+
+        meta = local.metadata(rec.id)
+        assert meta["frames"] == 2
+        assert meta["closed"] is True
+        assert meta["participants"] == [{"id": str(user.id), "callsign": "REC1"}]
+
+    def test_partial_record_is_skipped(self, tmp_path):
+        """Test a record cut off mid-write is not returned"""
+        local = Recorder(str(tmp_path), flush_interval=0.0)
+        rec = local.start("123456")
+        rec.frame(0, "first")
+        rec.frame(0, "second")
+        local.flush()
+
+        with open(rec.path, "r+b") as file:
+            file.truncate(rec.path.stat().st_size - 3)
+
+        with RecordingReader(rec.path) as reader:
+            assert [r.payload for r in reader] == ["first"]
+
+    def test_not_a_recording(self, tmp_path):
+        path = tmp_path / "bogus.mrec"
+        path.write_bytes(b"NOPE" + bytes(20))
+        with pytest.raises(ValueError):
+            RecordingReader(path)
+
+    def test_invalid_ids(self, tmp_path):
+        """Test ids that could escape the directory are rejected"""
+        local = Recorder(str(tmp_path), flush_interval=0.0)
+        assert local.metadata("../etc/passwd") is None
+        with pytest.raises(ValueError):
+            local.open("../../secret")
+
+    def test_metadata_is_indexed(self, tmp_path):
+        """Test sidecars are read once and later updates come from memory"""
+        first = Recorder(str(tmp_path), flush_interval=0.0)
+        old = first.start("111111")
+        old.close()
+        first.flush()
+
+        local = Recorder(str(tmp_path), flush_interval=0.0)
+        assert [meta["id"] for meta in local.list()] == [old.id]
+        rec = local.start("222222")
+        rec.join(0, make_user("REC1"))
+        (tmp_path / f"{old.id}.json").unlink()
+
+        assert [meta["id"] for meta in local.list()] == [rec.id, old.id]
+        assert local.metadata(rec.id)["participants"][0]["callsign"] == "REC1"
+        local.flush()
+
+    def test_retention(self, tmp_path):
+        """Test closed recordings past the retention period are deleted"""
+        local = Recorder(str(tmp_path), flush_interval=0.0, retention_days=1.0)
+        done = local.start("111111")
+        done.close()
+        running = local.start("222222")
+        local.flush()
+
+        assert local.prune() == 0
+        assert local.prune(now=time.time() + 2 * 86400) == 1
+        local.flush()
+        assert [meta["id"] for meta in local.list()] == [running.id]
+        assert not done.path.exists() and not done.meta_path.exists()
+        assert running.path.exists()
+
+    def test_start_leaves_disk_to_the_writer(self, tmp_path, monkeypatch):
+        """Test starting a recording reads nothing itself; the writer creates the directory and sweeps"""
+        local = Recorder(str(tmp_path / "new"), flush_interval=0.0, retention_days=1.0)
+        threads = []
+        load = local._load
+
+        def tracked_load():
+            threads.append(threading.current_thread().name)
+            load()
+
+        monkeypatch.setattr(local, "_load", tracked_load)
+        rec = local.start("111111")
+        rec.close()
+        local.flush()
+        assert threads == ["recording-writer"]
+        assert rec.path.exists() and rec.meta_path.exists()
+
+    def test_writes_are_batched(self, tmp_path, monkeypatch):
+        """Test many queued records reach the file in one write"""
+        writes = []
+        original = recording_module.RecordingWriter._write_batch
+        monkeypatch.setattr(
+            recording_module.RecordingWriter, "_write_batch",
+            staticmethod(lambda batch, files: (writes.append(len(batch)), original(batch, files))),
+        )
+        local = Recorder(str(tmp_path), flush_interval=0.2)
+        rec = local.start("123456")
+        for i in range(100):
+            rec.frame(0, str(i))
+        local.flush()
+
+        assert len(writes) == 1
+        with local.open(rec.id) as reader:
+            assert len(list(reader)) == 100
+
+
+class TestChannelRecording:
+    """Test recording hooks in Channel"""
+
+    @pytest.mark.asyncio
+    async def test_relayed_frames_are_recorded(self):
+        channel = Channel(channel_id="123456")
+        sender = MorseConnection(AsyncMock(), make_user("REC1"))
+        receiver = MorseConnection(AsyncMock(), make_user("REC2"))
+        channel.add_user(sender)
+        channel.start_recording(recorder.start("123456"))
+        channel.add_user(receiver)
+
+        await channel.relay_message('{"type": "morse", "signal": "-"}', receiver)
+        channel.remove_user(sender)
+        recorder.flush()
+
+        with recorder.open(channel.recording.id) as reader:
+            records = [(r.kind, r.slot) for r in reader]
+        assert records == [(JOIN, 0), (JOIN, 1), (FRAME, 1), (LEAVE, 0)]
+
+    @pytest.mark.asyncio
+    async def test_slots_stay_put_when_a_user_leaves(self):
+        """Test a frame relayed after the other user left keeps its sender's slot"""
+        channel = Channel(channel_id="123456")
+        first = MorseConnection(AsyncMock(), make_user("REC1"))
+        second = MorseConnection(AsyncMock(), make_user("REC2"))
+        third = MorseConnection(AsyncMock(), make_user("REC3"))
+        channel.add_user(first)
+        channel.add_user(second)
+        channel.start_recording(recorder.start("123456"))
+
+        channel.remove_user(first)
+        channel.add_user(third)
+        await channel.relay_message("-", second)
+        recorder.flush()
+
+        assert (second.slot, third.slot) == (1, 0)
+        with recorder.open(channel.recording.id) as reader:
+            records = [(r.kind, r.slot) for r in reader]
+        assert records == [(JOIN, 0), (JOIN, 1), (LEAVE, 0), (JOIN, 0), (FRAME, 1)]
+
+
+@pytest.fixture
+def callsigns() -> tuple[str, ...]:
+    return ("RECORD1", "RECORD2", "OUTSIDER")
+
+
+class TestRecordingRoutes:
+    """Test recording a session and replaying it"""
+
+    @pytest.mark.timeout(10)
+    def test_record_and_replay(self, client: TestClient, tokens):
+        token1, token2, outsider = tokens
+        frames = [{"type": "morse", "signal": s} for s in ["•", "-", " "]]
+
+        with client.websocket_connect(f"/channel/123456?token={token1}&record=true") as ws1:
+            ws1.receive_json()  # user_joined
+            recording_id = ws1.receive_json()["recording_id"]
+            with client.websocket_connect(f"/channel/123456?token={token2}") as ws2:
+                ws2.receive_json()
+                ws1.receive_json()
+                for frame in frames:
+                    ws1.send_text(json.dumps(frame))
+                    assert ws2.receive_json() == frame
+
+        recorder.flush()
+
+        headers = {"Authorization": f"Bearer {token2}"}
+        listing = client.get("/recordings/", headers=headers).json()
+        assert listing["count"] == 1
+        assert listing["recordings"][0]["frames"] == 3
+        assert listing["recordings"][0]["closed"] is True
+        assert [p["callsign"] for p in listing["recordings"][0]["participants"]] == ["RECORD1", "RECORD2"]
+
+        with client.websocket_connect(f"/recordings/{recording_id}/replay?token={token2}&speed=100") as ws:
+            messages = []
+            while True:
+                message = ws.receive_json()
+                messages.append(message)
+                if message.get("event") == "replay_finished":
+                    break
+
+        assert messages[0] == {"event": "replay_started", "recording_id": recording_id}
+        assert [m.get("event") for m in messages[1:3]] == ["user_joined", "user_joined"]
+        assert messages[3:6] == frames
+        assert [m.get("event") for m in messages[6:]] == ["user_left", "user_left", "replay_finished"]
+
+        outsider_headers = {"Authorization": f"Bearer {outsider}"}
+        assert client.get("/recordings/", headers=outsider_headers).json()["count"] == 0
+        assert client.get(f"/recordings/{recording_id}", headers=outsider_headers).status_code == 404
+
+    @pytest.mark.timeout(10)
+    def test_not_recorded_by_default(self, client: TestClient, tokens):
+        with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as ws:
+            ws.receive_json()
+            assert manager.channels["123456"].recording is None
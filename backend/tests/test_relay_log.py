@@ -0,0 +1,106 @@
+# tests/test_relay_log.py
+import json
+import logging
+
+import pytest
+
+from app.core.relay_log import RelayLog, StructuredFormatter, logger, setup_relay_logging
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def captured():
+    """Capture relay records at DEBUG level"""
+    handler = ListHandler()
+    previous_level, previous_handlers = logger.level, logger.handlers
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    yield handler.records
+    logger.handlers = previous_handlers
+    logger.setLevel(previous_level)
+
+
+class TestRelayLog:
+    """Test sampling and rate limiting of per-frame events"""
+
+    def test_skipped_when_debug_disabled(self, captured):
+        """Test nothing is logged when DEBUG is off"""
+        logger.setLevel(logging.INFO)
+        relay_log = RelayLog(sample_every=1, channel_rate=100)
+
+        relay_log.frame("frame received", "123456", "USER1", 10)
+
+        assert captured == []
+
+    def test_sampling(self, captured):
+        """Test only one in N frames is logged"""
+        relay_log = RelayLog(sample_every=10, channel_rate=1000)
+        for _ in range(100):
+            relay_log.frame("frame received", "123456", "USER1", 10)
+
+        assert len(captured) == 10
+
+    def test_per_channel_rate_limit(self, captured):
+        """Test a burst on one channel is capped without starving another"""
+        relay_log = RelayLog(sample_every=1, channel_rate=3)
+        for _ in range(50):
+            relay_log.frame("frame received", "111111", "USER1", 10)
+        relay_log.frame("frame received", "222222", "USER2", 10)
+
+        channels = [record.channel_id for record in captured]
+        assert channels.count("111111") == 3
+        assert channels.count("222222") == 1
+
+    def test_structured_fields(self, captured):
+        """Test frame events carry structured fields"""
+        RelayLog(sample_every=1).frame("frame received", "123456", "USER1", 42)
+
+        [record] = captured
+        assert record.getMessage() == "frame received"
+        assert (record.channel_id, record.callsign, record.bytes) == ("123456", "USER1", 42)
+
+
+class TestStructuredFormatter:
+    """Test the JSON line formatter"""
+
+    def test_formats_extra_fields(self):
+        """Test records render as JSON including extra fields"""
+        record = logging.LogRecord("morse.relay", logging.DEBUG, __file__, 1, "frame received", None, None)
+        record.channel_id = "123456"
+
+        entry = json.loads(StructuredFormatter().format(record))
+
+        assert entry["event"] == "frame received"
+        assert entry["level"] == "DEBUG"
+        assert entry["channel_id"] == "123456"
+
+
+class TestQueueLogging:
+    """Test records are written off the calling thread"""
+
+    def test_listener_writes_records(self, tmp_path, monkeypatch):
+        """Test records go through the queue listener to the log file"""
+        log_file = tmp_path / "relay.log"
+        monkeypatch.setattr("app.core.relay_log.settings.relay_log_file", str(log_file))
+        monkeypatch.setattr("app.core.relay_log.settings.relay_log_level", "DEBUG")
+        previous_handlers, previous_level = logger.handlers, logger.level
+
+        listener = setup_relay_logging()
+        try:
+            RelayLog(sample_every=1).frame("frame received", "123456", "USER1", 5)
+        finally:
+            listener.stop()  # Flushes the queue
+            for handler in listener.handlers:
+                handler.close()
+            logger.handlers, logger.level = previous_handlers, previous_level
+
+        entry = json.loads(log_file.read_text().splitlines()[0])
+        assert entry["channel_id"] == "123456"
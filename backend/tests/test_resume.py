@@ -0,0 +1,190 @@
+# tests/test_resume.py
+import json
+import time
+from contextlib import ExitStack
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.connection_manager import manager
+from app.core.resume import FrameRing, resumer
+
+
+class TestFrameRing:
+    """Test the replay buffer"""
+
+    def test_since(self):
+        ring = FrameRing(4)
+        for frame in "abc":
+            ring.push(frame)
+        assert ring.since(0) == (["a", "b", "c"], 0)
+        assert ring.since(2) == (["c"], 0)
+        assert ring.since(3) == ([], 0)
+
+    def test_wraps_and_counts_overwritten(self):
+        ring = FrameRing(3)
+        for frame in "abcdef":
+            ring.push(frame)
+        assert ring.seq == 6
+        assert ring.since(1) == (["d", "e", "f"], 2)
+        assert ring.since(4) == (["e", "f"], 0)
+
+    def test_out_of_range_seq(self):
+        ring = FrameRing(3)
+        ring.push("a")
+        assert ring.since(-5) == (["a"], 0)
+        assert ring.since(10) == ([], 0)
+
+    def test_preallocated(self):
+        ring = FrameRing(8)
+        assert len(ring.frames) == 8
+        for i in range(20):
+            ring.push(str(i))
+        assert len(ring.frames) == 8
+        assert not hasattr(ring, "__dict__")
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def grace(monkeypatch):
+    monkeypatch.setattr(resumer, "grace", 5.0)
+
+
+@pytest.fixture
+def callsigns() -> tuple[str, ...]:
+    return ("MOBILE", "FIXED")
+
+
+def frame(signal: str) -> dict:
+    return {"type": "morse", "signal": signal}
+
+
+def receive(ws) -> dict:
+    """Next message, skipping the decoder's text events"""
+    while (message := ws.receive_json()).get("event") == "decoded":
+        pass
+    return message
+
+
+class TestResume:
+    """Test holding the slot of a dropped connection and resuming it"""
+
+    @pytest.fixture
+    def pair(self, client: TestClient, tokens: list[str]):
+        """Resumable MOBILE and plain FIXED in one channel, and MOBILE's resume token"""
+        with ExitStack() as stack:
+            mobile = stack.enter_context(client.websocket_connect(f"/channel/123456?token={tokens[0]}&resumable=true"))
+            session = mobile.receive_json()
+            assert session["event"] == "session"
+            mobile.receive_json()  # user_joined
+            fixed = stack.enter_context(client.websocket_connect(f"/channel/123456?token={tokens[1]}"))
+            fixed.receive_json()
+            mobile.receive_json()
+            yield mobile, fixed, session["resume_token"]
+
+    @pytest.mark.timeout(10)
+    def test_resume_replays_missed_frames(self, client: TestClient, tokens, pair):
+        mobile, fixed, resume_token = pair
+
+        fixed.send_text(json.dumps(frame("-")))
+        assert receive(mobile) == frame("-")
+
+        # Network drop: no clean close
+        mobile.close(code=1006)
+        event = receive(fixed)
+        assert event["event"] == "user_reconnecting"
+        assert event["user"]["callsign"] == "MOBILE"
+        assert manager.channels["123456"].user_count == 2
+
+        fixed.send_text(json.dumps(frame("•")))
+        fixed.send_text(json.dumps(frame(" ")))
+
+        with client.websocket_connect(
+                f"/channel/resume?token={tokens[0]}&resume_token={resume_token}&last_seq=1") as resumed:
+            event = receive(resumed)
+            assert event["event"] == "resumed"
+            assert (event["seq"], event["missed"]) == (3, 0)
+            assert [u["callsign"] for u in event["users"]] == ["MOBILE", "FIXED"]
+            assert [receive(resumed) for _ in range(2)] == [frame("•"), frame(" ")]
+
+            assert receive(fixed)["event"] == "user_resumed"
+            receive(resumed)  # Its own user_resumed
+
+            fixed.send_text(json.dumps(frame("-")))
+            assert receive(resumed) == frame("-")
+            resumed.send_text(json.dumps(frame("•")))
+            assert receive(fixed) == frame("•")
+
+    @pytest.mark.timeout(10)
+    def test_slot_released_after_grace(self, client: TestClient, tokens, pair, monkeypatch):
+        monkeypatch.setattr(resumer, "grace", 0.2)
+        mobile, fixed, resume_token = pair
+
+        mobile.close(code=1006)
+        assert fixed.receive_json()["event"] == "user_reconnecting"
+        event = fixed.receive_json()
+        assert event["event"] == "user_left"
+        assert event["user"]["callsign"] == "MOBILE"
+        assert manager.channels["123456"].user_count == 1
+
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(
+                    f"/channel/resume?token={tokens[0]}&resume_token={resume_token}") as ws:
+                ws.receive_json()
+        assert exc_info.value.code == 1008
+
+    @pytest.mark.timeout(10)
+    def test_clean_close_leaves_immediately(self, client: TestClient, tokens, pair):
+        mobile, fixed, _ = pair
+
+        mobile.close(code=1000)
+        assert fixed.receive_json()["event"] == "user_left"
+
+    @pytest.mark.timeout(10)
+    def test_not_resumable_by_default(self, client: TestClient, tokens):
+        with client.websocket_connect(f"/channel/123456?token={tokens[1]}") as fixed:
+            fixed.receive_json()
+            with client.websocket_connect(f"/channel/123456?token={tokens[0]}") as plain:
+                assert plain.receive_json()["event"] == "user_joined"
+                fixed.receive_json()
+                plain.close(code=1006)
+                assert fixed.receive_json()["event"] == "user_left"
+
+    @pytest.mark.timeout(10)
+    def test_token_belongs_to_its_user(self, client: TestClient, tokens, pair):
+        mobile, fixed, resume_token = pair
+        mobile.close(code=1006)
+        fixed.receive_json()
+
+        with pytest.raises(WebSocketDisconnect) as exc_info:
+            with client.websocket_connect(
+                    f"/channel/resume?token={tokens[1]}&resume_token={resume_token}") as ws:
+                ws.receive_json()
+        assert exc_info.value.code == 1008
+
+    @pytest.fixture
+    def small_buffer(self, monkeypatch):
+        monkeypatch.setattr(resumer, "buffer_size", 2)
+
+    @pytest.mark.timeout(10)
+    def test_missed_frames_beyond_buffer(self, client: TestClient, tokens, small_buffer, pair):
+        mobile, fixed, resume_token = pair
+        mobile.close(code=1006)
+        fixed.receive_json()
+
+        for signal in "-•-•":
+            fixed.send_text(json.dumps(frame(signal)))
+        wait_for(lambda: manager.channels["123456"].user_connections[0].ring.seq == 4)
+
+        with client.websocket_connect(
+                f"/channel/resume?token={tokens[0]}&resume_token={resume_token}") as resumed:
+            event = resumed.receive_json()
+            assert (event["seq"], event["missed"]) == (4, 2)
+            assert [resumed.receive_json() for _ in range(2)] == [frame("-"), frame("•")]
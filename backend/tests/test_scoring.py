@@ -0,0 +1,158 @@
+# tests/test_scoring.py
+import random
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core import morse, scoring
+from app.models import PracticeStats
+
+
+def full_distance(a: str, b: str) -> int:
+    """Reference Levenshtein distance over the whole matrix"""
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        row = [i]
+        for j, cb in enumerate(b, 1):
+            row.append(min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        prev = row
+    return prev[-1]
+
+
+def apply(edits: list[scoring.Edit]) -> tuple[str, str]:
+    return "".join(e.expected for e in edits), "".join(e.actual for e in edits)
+
+
+class TestAlign:
+    """Test banded alignment"""
+
+    def test_exact_copy(self):
+        score = scoring.align("CQ DE K", "CQ DE K")
+        assert score.distance == 0
+        assert score.accuracy == 1.0
+        assert all(e.op == "match" for e in score.edits)
+
+    def test_edit_kinds(self):
+        """Test substitutions, missed and extra characters are told apart"""
+        score = scoring.align("ABCDEF", "AXCEFG")
+        assert score.distance == 3
+        assert [e.op for e in score.edits] == ["match", "sub", "match", "del", "match", "match", "ins"]
+
+    def test_empty(self):
+        assert scoring.align("", "").accuracy == 1.0
+        assert scoring.align("ABC", "").distance == 3
+        assert scoring.align("", "ABC").distance == 3
+
+    def test_band_grows(self):
+        """Test distances beyond the initial band are still exact"""
+        expected = "THE QUICK BROWN FOX"
+        actual = "A LAZY DOG JUMPS OVER IT"
+        assert scoring.align(expected, actual, band=1).distance == full_distance(expected, actual)
+
+    def test_matches_full_matrix(self):
+        """Test random pairs against the unbanded reference, including the edit script"""
+        rng = random.Random(5)
+        alphabet = "ABCDE "
+        for _ in range(300):
+            a = "".join(rng.choices(alphabet, k=rng.randint(0, 30)))
+            b = list(a)
+            for _ in range(rng.randint(0, 10)):
+                position = rng.randint(0, len(b))
+                action = rng.choice("sid")
+                if action == "i":
+                    b.insert(position, rng.choice(alphabet))
+                elif b and position < len(b):
+                    if action == "s":
+                        b[position] = rng.choice(alphabet)
+                    else:
+                        del b[position]
+            b = "".join(b)
+
+            score = scoring.align(a, b, band=2)
+            assert score.distance == full_distance(a, b)
+            assert apply(score.edits) == (a, b)
+            assert sum(e.op != "match" for e in score.edits) == score.distance
+
+    def test_unrelated_texts_fall_back_to_full_matrix(self):
+        """Test texts with nothing in common stop widening the band"""
+        expected, actual = "A" * 300, "B" * 600
+        score = scoring.align(expected, actual)
+        assert score.distance == 600
+        assert apply(score.edits) == (expected, actual)
+        assert sum(e.op == "sub" for e in score.edits) == 300
+
+        rng = random.Random(7)
+        for _ in range(50):
+            a = "".join(rng.choices("AB ", k=rng.randint(0, 12)))
+            b = "".join(rng.choices("AB ", k=rng.randint(0, 12)))
+            score = scoring.align(a, b, band=1)
+            assert score.distance == full_distance(a, b)
+            assert apply(score.edits) == (a, b)
+
+    def test_char_stats(self):
+        """Test per-character counts, ignoring spaces and extra characters"""
+        score = scoring.align("SOS SOS", "S0S SOSE")
+        assert score.char_stats() == {"S": [4, 0], "O": [2, 1]}
+        assert score.insertions == 1
+        assert score.confusions() == {("O", "0"): 1}
+
+
+class TestScoreEndpoint:
+    """Test scoring and the stored aggregate"""
+
+    def test_score_and_stats(self, client: TestClient, session: Session, admin_user, admin_headers):
+        """Test scores accumulate into one row per user"""
+        response = client.post(
+            "/practice/score", json={"expected": "kmm km", "actual": "KMK  KM"}, headers=admin_headers
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["expected"] == "KMM KM"
+        assert data["actual"] == "KMK KM"
+        assert data["distance"] == 1
+        assert data["chars"] == [{"char": "K", "total": 2, "errors": 0}, {"char": "M", "total": 3, "errors": 1}]
+
+        client.post("/practice/score", json={"expected": "K", "actual": "KK"}, headers=admin_headers)
+
+        stats = client.get("/practice/stats", headers=admin_headers).json()
+        assert stats["drills"] == 2
+        assert stats["chars"] == 7
+        assert stats["errors"] == 1
+        assert stats["insertions"] == 1
+        assert stats["per_char"] == [{"char": "K", "total": 3, "errors": 0}, {"char": "M", "total": 3, "errors": 1}]
+
+        assert session.get(PracticeStats, admin_user.id).drills == 2
+
+    def test_concurrent_first_score(self, session: Session, admin_user, monkeypatch):
+        """Test a first score that loses the insert race is folded into the winner's row"""
+        session.add(PracticeStats(user_id=admin_user.id, drills=1, chars=4))
+        session.commit()
+        get = session.get
+        calls = []
+
+        def stale_get(*args, **kwargs):
+            # The first read misses the row the other request just inserted
+            calls.append(args)
+            return None if len(calls) == 1 else get(*args, **kwargs)
+
+        monkeypatch.setattr(session, "get", stale_get)
+        stats = scoring.record_score(session, admin_user.id, scoring.align("PARIS", "PARIS"))
+        assert (stats.drills, stats.chars) == (2, 9)
+
+    def test_score_morse(self, client: TestClient, admin_headers):
+        """Test Morse input is decoded before scoring"""
+        response = client.post(
+            "/practice/score",
+            json={"expected": morse.encode("CQ"), "actual": "-.-. --.-", "format": "morse"},
+            headers=admin_headers,
+        )
+        assert response.json()["accuracy"] == 1.0
+
+    def test_empty_stats(self, client: TestClient, admin_headers):
+        stats = client.get("/practice/stats", headers=admin_headers).json()
+        assert stats["drills"] == 0
+        assert stats["accuracy"] == 1.0
+        assert stats["updated_at"] is None
+
+    def test_requires_auth(self, client: TestClient):
+        assert client.post("/practice/score", json={"expected": "A", "actual": "A"}).status_code in (401, 403)
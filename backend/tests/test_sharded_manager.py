@@ -0,0 +1,137 @@
+# tests/test_sharded_manager.py
+import random
+import threading
+import uuid
+
+import pytest
+
+from app.core.connection_manager import (
+    ChannelFull,
+    ChannelReserved,
+    ConnectionManager,
+    UserAlreadyActive,
+    create_manager,
+)
+from app.core.sharded_manager import ShardedConnectionManager
+from tests.conftest import make_connection
+
+
+@pytest.fixture
+def manager():
+    return ShardedConnectionManager(8)
+
+
+class TestShardedConnectionManager:
+    """Test the sharded manager behaves like ConnectionManager"""
+
+    def test_connect_and_disconnect(self, manager):
+        first, second = make_connection("USER1"), make_connection("USER2")
+        channel = manager.connect(first, "123456")
+        assert manager.connect(second, "123456") is channel
+        assert manager.channels["123456"] is channel
+        assert "123456" in manager.channels
+        assert manager.get_user_channel(first.user.id) is channel
+        assert manager.is_user_active(str(second.user.id))
+
+        assert manager.disconnect(first, "123456")
+        assert not manager.disconnect(first, "123456")
+        assert not manager.is_user_active(first.user.id)
+        assert manager.disconnect(second, "123456")
+        assert "123456" not in manager.channels
+        assert len(manager.channels) == 0
+
+    def test_refusals(self, manager):
+        first, second, third = (make_connection(f"USER{i}") for i in range(3))
+        with pytest.raises(ValueError):
+            manager.connect(first, "abc")
+
+        manager.connect(first, "123456")
+        with pytest.raises(UserAlreadyActive):
+            manager.connect(first, "654321")
+        manager.connect(second, "123456")
+        with pytest.raises(ChannelFull):
+            manager.connect(third, "123456")
+
+        manager.reserve("111111", [second.user.id])
+        assert manager.is_reserved("111111")
+        with pytest.raises(ChannelReserved):
+            manager.connect(third, "111111")
+        manager.release("111111")
+        assert not manager.is_reserved("111111")
+
+    def test_aggregates_merge_shards(self, manager):
+        connections = [make_connection(f"USER{i}") for i in range(40)]
+        for i, connection in enumerate(connections):
+            manager.connect(connection, str(200000 + i // 2 * 7919))
+
+        assert len({shard.index for shard in manager.shards if shard.channels}) > 1
+        assert len(manager.get_all_channels()) == 20
+        assert {user.id for user in manager.active_users} == {c.user.id for c in connections}
+        assert manager.find_random_waiting_channel() is None
+
+        manager.disconnect(connections[0], "200000")
+        assert manager.find_random_waiting_channel() == "200000"
+
+    def test_active_index(self, manager):
+        connections = [make_connection(f"USER{i}") for i in range(10)]
+        for i, connection in enumerate(connections):
+            manager.connect(connection, str(300000 + i))
+        ids = [connection.user.id for connection in connections]
+
+        first = manager.snapshot()
+        assert len(first.channels) == 10
+        assert manager.snapshot() is first
+        assert set(manager.filter_active(ids[:3] + [uuid.uuid4()])) == set(ids[:3])
+
+        manager.disconnect(connections[0], "300000")
+        assert connections[0].user not in manager.active_users
+        assert manager.snapshot().version > first.version
+        assert str(ids[0]) not in manager.snapshot().channels
+
+        manager.clear()
+        assert manager.active_users == [] and len(manager.channels) == 0
+
+    def test_random_channel_ids(self, manager):
+        channel_id = manager.create_random_channel()
+        connection = make_connection("USER1")
+        manager.connect(connection, channel_id)
+        assert channel_id in manager._ids
+        manager.disconnect(connection, channel_id)
+        assert channel_id not in manager._ids
+
+    def test_concurrent_storm(self, manager):
+        """Threads joining and leaving shared channels leave nothing behind"""
+        errors = []
+
+        def storm(seed: int) -> None:
+            rng = random.Random(seed)
+            connections = [make_connection(f"T{seed}U{i}") for i in range(20)]
+            try:
+                for _ in range(200):
+                    connection = rng.choice(connections)
+                    channel_id = str(100000 + rng.randrange(30))
+                    try:
+                        manager.connect(connection, channel_id)
+                    except (ChannelFull, UserAlreadyActive):
+                        continue
+                    assert manager.get_user_channel(connection.user.id).channel_id == channel_id
+                    assert manager.disconnect(connection, channel_id)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=storm, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(manager.channels) == 0
+        assert all(not shard.user_channels and not shard.user_connections for shard in manager.shards)
+        assert len(manager._ids) == 0
+
+    def test_create_manager(self):
+        assert type(create_manager(1)) is ConnectionManager
+        sharded = create_manager(4)
+        assert isinstance(sharded, ShardedConnectionManager)
+        assert len(sharded.shards) == 4
@@ -0,0 +1,90 @@
+# tests/test_startup.py
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, Integer, Table
+from sqlmodel import Session, SQLModel, create_engine, select
+from sqlmodel.pool import StaticPool
+
+from app import db
+from app.cli import build_parser, server_config
+from app.cli import main as cli_main
+from app.config import settings
+from app.models import User
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    yield engine
+    SQLModel.metadata.drop_all(engine)
+
+
+class TestSchemaMarker:
+    """Test skipping table creation when the schema is current"""
+
+    def test_creates_then_skips(self, engine):
+        assert db.ensure_schema(engine) is True
+        assert db.ensure_schema(engine) is False
+
+        with engine.connect() as connection:
+            assert connection.execute(select(db.schema_version.c.fingerprint)).scalar() == db.schema_fingerprint()
+
+    def test_force_recreates(self, engine):
+        db.ensure_schema(engine)
+        assert db.ensure_schema(engine, force=True) is True
+
+    def test_model_change_recreates(self, engine):
+        db.ensure_schema(engine)
+        fingerprint = db.schema_fingerprint()
+
+        table = Table("startup_probe", SQLModel.metadata, Column("id", Integer, primary_key=True))
+        try:
+            assert db.schema_fingerprint() != fingerprint
+            assert db.ensure_schema(engine) is True
+            assert db.ensure_schema(engine) is False
+        finally:
+            SQLModel.metadata.remove(table)
+
+
+class TestCreateAdmin:
+    """Test the admin bootstrap outside of startup"""
+
+    def test_create_once(self, engine):
+        db.ensure_schema(engine)
+        admin_user = db.create_admin(engine, "secret")
+        assert admin_user.callsign == "admin"
+        assert db.create_admin(engine, "other") is None
+
+    def test_cli(self, engine, monkeypatch, capsys):
+        monkeypatch.setattr("app.db.get_engine", lambda: engine)
+
+        assert cli_main(["create-admin", "--password", "secret"]) == 0
+        assert "Admin user created" in capsys.readouterr().out
+        assert cli_main(["create-admin", "--password", "secret"]) == 1
+
+        with Session(engine) as session:
+            assert session.exec(select(User).where(User.callsign == "admin")).one()
+
+
+def test_serve_limits_websocket_messages(monkeypatch):
+    """Test uvicorn refuses WebSocket messages longer than a relay frame can be"""
+    monkeypatch.setattr(settings, "relay_max_frame_size", 512)
+    config = server_config(build_parser().parse_args(["serve", "--port", "9000"]))
+    assert config.ws_max_size == 2048
+    assert config.port == 9000
+
+
+def test_import_does_not_connect():
+    """Importing the app leaves the engine, and the database driver, for first use"""
+    code = "import sys, app.main, app.db; print('psycopg' in sys.modules, app.db.get_engine.cache_info().currsize)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, "ENV_FILE": "/dev/null", "BACKEND_DATABASE_URL": "postgresql://nobody@localhost/none"},
+    )
+    assert result.stdout.split() == ["False", "0"]
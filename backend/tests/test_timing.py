@@ -0,0 +1,133 @@
+# tests/test_timing.py
+import random
+
+from app.core import morse
+from app.core.timing import MAX_SYMBOL_LENGTH, TimingAnalyzer
+
+
+def feed(analyzer: TimingAnalyzer, durations: list[float]) -> str:
+    """Feed signed durations through mark/space and flush the last letter"""
+    decoded = ""
+    for d in durations:
+        if d > 0:
+            analyzer.mark(d)
+        else:
+            decoded += analyzer.space(-d)
+    return decoded + analyzer.end_letter()
+
+
+def keyed_frames(text: str, unit: float, start: float = 100.0):
+    """(signal, duration_ms, arrival time) frames for `text`, sent on key release"""
+    now = start
+    for d in morse.text_to_timings(text, unit):
+        now += abs(d) / 1000
+        if d > 0:
+            yield ("•" if d < 2 * unit else "-"), d, now
+
+
+class TestTimingAnalyzer:
+    """Test streaming dit/dah/gap classification"""
+
+    def test_perfect_timing(self):
+        """Test perfectly timed keying decodes and the unit settles on the dit length"""
+        analyzer = TimingAnalyzer()
+        unit = morse.unit_from_wpm(20)
+        assert feed(analyzer, morse.text_to_timings("PARIS PARIS", unit)) == "PARIS PARIS"
+        assert analyzer.text == "PARIS PARIS"
+        assert analyzer.wpm == 20
+
+    def test_leading_dah_is_reclassified(self):
+        """Test marks classified against a dah-based estimate are corrected by a later dit"""
+        analyzer = TimingAnalyzer()
+        assert feed(analyzer, morse.text_to_timings("M E", 60)) == "M E"
+
+    def test_tracks_speed_change(self):
+        """Test the estimate follows a sender who speeds up"""
+        analyzer = TimingAnalyzer()
+        feed(analyzer, morse.text_to_timings("PARIS " * 3, morse.unit_from_wpm(10)))
+        assert analyzer.wpm < 11
+
+        decoded = feed(analyzer, morse.text_to_timings("PARIS " * 3, morse.unit_from_wpm(18)))
+        assert decoded.endswith("PARIS")
+        assert analyzer.wpm > 16
+
+    def test_jittered_timing(self):
+        """Test keying with +-20% jitter still decodes"""
+        rng = random.Random(7)
+        timings = morse.text_to_timings("CQ CQ DE DL1ABC", 80)
+        jittered = [d * rng.uniform(0.8, 1.2) for d in timings]
+        assert feed(TimingAnalyzer(), jittered) == "CQ CQ DE DL1ABC"
+
+    def test_key_bounce_is_ignored(self):
+        """Test marks far shorter than a dit neither decode nor reset the speed"""
+        analyzer = TimingAnalyzer()
+        unit = morse.unit_from_wpm(20)
+        timings = morse.text_to_timings("PARIS", unit)
+        # Bounces after the first element of P and inside the S
+        glitched = timings[:1] + [-2, 3, -2] + timings[1:-2] + [8, -4] + timings[-2:]
+        assert feed(analyzer, glitched) == "PARIS"
+        assert analyzer.wpm == 20
+        assert analyzer.mark(5) == ""
+
+    def test_symbol_buffer_is_bounded(self):
+        """Test an endless run of dits decodes to the placeholder without growing the buffer"""
+        analyzer = TimingAnalyzer()
+        for _ in range(1000):
+            analyzer.mark(60)
+            analyzer.space(60)
+        assert len(analyzer._symbol) == MAX_SYMBOL_LENGTH + 1
+        assert analyzer.end_letter() == morse.UNKNOWN_CHAR
+
+    def test_transcript_is_bounded(self):
+        """Test the transcript keeps only the most recent characters"""
+        analyzer = TimingAnalyzer(transcript_size=5)
+        feed(analyzer, morse.text_to_timings("PARIS PARIS", 60))
+        assert analyzer.text == "PARIS"
+
+
+class TestObserveFrames:
+    """Test feeding relayed frames"""
+
+    def test_client_signals(self):
+        """Test frames without durations use the client's classification and spaces"""
+        analyzer = TimingAnalyzer()
+        decoded = ""
+        for signal in ["-", "•", "-", "•", " ", "-", "-", "•", "-", " ", " "]:
+            decoded += analyzer.observe(signal, None, 0.0)
+        assert decoded == "CQ "
+        assert analyzer.wpm is None
+
+    def test_timed_frames(self):
+        """Test frames with durations are classified and split by arrival gaps"""
+        analyzer = TimingAnalyzer()
+        decoded = ""
+        for signal, duration, now in keyed_frames("CQ DE", 100):
+            decoded += analyzer.observe(signal, duration, now)
+        decoded += analyzer.end_letter()
+        assert decoded == "CQ DE"
+        assert analyzer.wpm == 12
+
+    def test_timed_frames_override_client_threshold(self):
+        """Test slow dits are not taken as dahs because of the client's fixed threshold"""
+        analyzer = TimingAnalyzer(wpm=4)
+        for _, duration, now in keyed_frames("S", 320):
+            analyzer.observe("-", duration, now)
+        assert analyzer.end_letter() == "S"
+
+    def test_bounce_frame_is_ignored(self):
+        """Test a bounce frame does not split the letter it lands in"""
+        analyzer = TimingAnalyzer()
+        decoded = ""
+        for signal, duration, now in keyed_frames("CQ", 100):
+            decoded += analyzer.observe(signal, duration, now)
+            decoded += analyzer.observe("•", 4, now + 0.005)
+        decoded += analyzer.end_letter()
+        assert decoded == "CQ"
+        assert analyzer.wpm == 12
+
+    def test_ignores_other_signals(self):
+        """Test unknown signals are ignored"""
+        analyzer = TimingAnalyzer()
+        assert analyzer.observe("x", 100, 1.0) == ""
+        assert analyzer.observe(None, None, 1.0) == ""
+        assert analyzer.end_letter() == ""
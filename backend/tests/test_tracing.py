@@ -0,0 +1,100 @@
+# tests/test_tracing.py
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.channel import Channel
+from app.core.tracing import RelayTracer, tracer
+from tests.conftest import make_connection
+
+
+@pytest.fixture
+def full_tracing():
+    """Trace every frame for the duration of a test"""
+    previous = tracer.sample_rate
+    tracer.sample_rate = 1.0
+    tracer.clear()
+    yield tracer
+    tracer.sample_rate = previous
+    tracer.clear()
+
+
+class TestRelayTracer:
+    """Test the rolling percentile tracer"""
+
+    def test_disabled_by_default(self):
+        """Test a zero sample rate disables tracing"""
+        assert not RelayTracer().enabled
+
+    def test_percentiles(self):
+        """Test percentiles are computed over the recorded samples"""
+        tracer = RelayTracer(sample_rate=1.0)
+        for ms in range(1, 101):
+            tracer.record("123456", 0.0, ms / 1000)
+
+        [stats] = tracer.stats()
+        assert stats.channel_id == "123456"
+        assert stats.samples == 100
+        assert stats.p50_ms == pytest.approx(51)
+        assert stats.p99_ms == pytest.approx(100)
+        assert stats.max_ms == pytest.approx(100)
+
+    def test_window_is_bounded(self):
+        """Test only the most recent samples are kept"""
+        tracer = RelayTracer(sample_rate=1.0, window=10)
+        for ms in range(100):
+            tracer.record("123456", 0.0, ms / 1000)
+
+        [stats] = tracer.stats()
+        assert stats.samples == 10
+        assert stats.p50_ms >= 90
+
+    def test_sampling_rate(self):
+        """Test a partial sample rate only traces a fraction of frames"""
+        tracer = RelayTracer(sample_rate=0.1)
+        sampled = sum(tracer.should_sample() for _ in range(10_000))
+        assert 500 < sampled < 1500
+
+    def test_discard(self):
+        """Test discarding a closed channel drops its samples"""
+        tracer = RelayTracer(sample_rate=1.0)
+        tracer.record("123456", 0.0, 0.001)
+        tracer.discard("123456")
+        assert tracer.stats() == []
+
+
+class TestRelayTracing:
+    """Test relayed frames are traced"""
+
+    @pytest.mark.asyncio
+    async def test_relay_records_sample(self, full_tracing):
+        """Test a relayed frame is stamped and recorded for its channel"""
+        channel = Channel(channel_id="123456")
+        sender, receiver = make_connection("TRACE1"), make_connection("TRACE2")
+        channel.add_user(sender)
+        channel.add_user(receiver)
+
+        await channel.relay_message('{"type": "morse", "signal": "-"}', sender)
+
+        [stats] = full_tracing.stats()
+        assert stats.channel_id == "123456"
+        assert stats.samples == 1
+
+    def test_admin_trace_endpoint(self, client: TestClient, admin_headers, full_tracing):
+        """Test the admin endpoint reports per-channel percentiles"""
+        full_tracing.record("654321", 0.0, 0.002)
+
+        response = client.get("/admin/trace/relay", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["sample_rate"] == 1.0
+        assert data["channels"][0]["channel_id"] == "654321"
+        assert data["channels"][0]["p50_ms"] == pytest.approx(2)
+
+    def test_admin_set_sample_rate(self, client: TestClient, admin_headers, full_tracing):
+        """Test the sample rate can be changed at runtime"""
+        response = client.put("/admin/trace/relay?sample_rate=0.25", headers=admin_headers)
+
+        assert response.status_code == 200
+        assert full_tracing.sample_rate == 0.25
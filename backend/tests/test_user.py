@@ -268,4 +268,70 @@ class TestUserDataIntegrity:
 
         # IDs should be valid UUIDs
         uuid.UUID(user1_id)
-        uuid.UUID(user2_id)
\ No newline at end of file
+        uuid.UUID(user2_id)
+
+class TestBulkCreateUsers:
+    """Test the bulk user import endpoint"""
+
+    def test_bulk_create_users(self, client: TestClient, admin_headers, session: Session):
+        """Test creating a batch of users"""
+        batch = {"users": [
+            {"callsign": f"CLUB{i:02d}", "password": "password123"} for i in range(5)
+        ]}
+        response = client.post("/users/bulk", json=batch, headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 5
+        assert data["failed"] == 0
+        assert all(row["ok"] and row["id"] for row in data["results"])
+
+        # Created users can log in with their own password
+        login = client.post("/auth/login", json={"callsign": "CLUB03", "password": "password123"})
+        assert login.status_code == 200
+
+    def test_bulk_create_reports_per_row_errors(self, client: TestClient, admin_headers, created_user):
+        """Test collisions are reported per row without failing the batch"""
+        batch = {"users": [
+            {"callsign": "FRESH1", "password": "password123"},
+            {"callsign": created_user.callsign, "password": "password123"},
+            {"callsign": "FRESH1", "password": "password123"},
+        ]}
+        response = client.post("/users/bulk", json=batch, headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 2
+        results = data["results"]
+        assert results[0]["ok"] is True
+        assert "already registered" in results[1]["error"].lower()
+        assert "duplicate" in results[2]["error"].lower()
+
+    def test_bulk_create_reports_invalid_rows(self, client: TestClient, admin_headers):
+        """Test a row failing validation does not fail the batch"""
+        batch = {"users": [
+            {"callsign": "FRESH2", "password": "password123"},
+            {"callsign": "AB", "password": "password123"},
+            {"callsign": "FRESH3"},
+        ]}
+        response = client.post("/users/bulk", json=batch, headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["created"], data["failed"]) == (1, 2)
+        results = data["results"]
+        assert results[0]["ok"] is True
+        assert results[1]["error"].startswith("callsign:")
+        assert results[2]["error"].startswith("password:")
+
+    def test_bulk_create_requires_admin(self, client: TestClient, created_user, sample_user_data):
+        """Test non-admin users cannot bulk import"""
+        token = client.post("/auth/login", json=sample_user_data).json()["access_token"]
+        response = client.post(
+            "/users/bulk",
+            json={"users": [{"callsign": "NOPE01", "password": "password123"}]},
+            headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 403
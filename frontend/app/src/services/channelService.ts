@@ -173,7 +173,10 @@ class ChannelService {
                 try {
                     const data = JSON.parse(event.data);
 
-                    if (data.event === 'user_joined') {
+                    if (data.event === 'ping') {
+                        // Keeps the server from dropping us as idle
+                        ws.send(JSON.stringify({ type: 'pong' }));
+                    } else if (data.event === 'user_joined') {
                         console.log('User joined event:', data);
 
                         // Update channel ID if provided (for random channels)